@@ -2,3 +2,11 @@ from .employee import Employee  # noqa: F401
 from .team import Team  # noqa: F401
 from .query_base import QueryBase  # noqa: F401
 from .sql_execution import *  # noqa: F403, F401
+from .statements import registered_statements  # noqa: F401
+from .schema import migrate, check_query_plans  # noqa: F401
+from .summaries import refresh_summaries  # noqa: F401
+from .scoring import score_all, RiskScores, ScoreTable  # noqa: F401
+from .memo import request_scope, memo_stats, configure_memo  # noqa: F401
+from .directory import NameDirectory, name_directory  # noqa: F401
+from .timing import timed, timing_scope  # noqa: F401
+from .ingest import ingest_events, read_events, IngestError  # noqa: F401
@@ -0,0 +1,80 @@
+import argparse
+import sqlite3
+from contextlib import closing
+
+from employee_events.connection_pool import enable_wal
+from employee_events.ingest import ingest_events, read_events
+from employee_events.schema import check_query_plans, migrate
+from employee_events.sql_execution import db_path
+from employee_events.statements import registered_statements
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(prog='python -m employee_events')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    # python -m employee_events migrate [path/to/employee_events.db]
+    # migrates the database and verifies every query plan
+    migrate_parser = commands.add_parser(
+        'migrate',
+        help='apply pending schema migrations and check query plans',
+    )
+    migrate_parser.add_argument('database', nargs='?', default=db_path)
+    migrate_parser.add_argument(
+        '--wal', action='store_true',
+        help='also switch the file to write-ahead logging',
+    )
+
+    # python -m employee_events ingest events.csv [more.jsonl ...]
+    # upserts event batches and refreshes the summaries
+    ingest_parser = commands.add_parser(
+        'ingest',
+        help='upsert CSV or JSON Lines event batches into the database',
+    )
+    ingest_parser.add_argument(
+        'files', nargs='+', help="event files, '-' for standard input"
+    )
+    ingest_parser.add_argument('--database', default=db_path)
+    ingest_parser.add_argument(
+        '--format', choices=['csv', 'jsonl'], default=None,
+        help='format of the files, by default from their extension',
+    )
+    ingest_parser.add_argument('--batch-size', type=int, default=10_000)
+    ingest_parser.add_argument(
+        '--defer-indexes', action='store_true',
+        help='rebuild the event indexes once after a large load',
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'migrate':
+        version = migrate(args.database)
+        print(f'{args.database}: schema version {version}')
+        check_query_plans(args.database)
+        print(f'{len(registered_statements())} statements checked')
+        if args.wal:
+            with closing(sqlite3.connect(args.database)) as connection:
+                print(f'journal mode {enable_wal(connection)}')
+
+    if args.command == 'ingest':
+        for file in args.files:
+            stats = ingest_events(
+                read_events(file, format=args.format),
+                args.database,
+                batch_size=args.batch_size,
+                defer_indexes=args.defer_indexes,
+                progress=print_progress,
+            )
+            print(
+                f'{file}: {stats.rows:,} events in {stats.seconds:.3f}s '
+                f'({stats.rows_per_second:,.0f}/s)'
+            )
+
+
+def print_progress(stats):
+    print(f'  {stats.rows:,} events ({stats.rows_per_second:,.0f}/s)')
+
+
+if __name__ == '__main__':
+    main()
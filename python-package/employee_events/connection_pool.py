@@ -0,0 +1,334 @@
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+from pathlib import Path
+
+
+# Applied to every pooled connection as it is opened
+CONNECTION_PRAGMAS = {
+    # Read pages through a memory map of the file
+    # instead of copying each one into the page cache
+    'mmap_size': 256 * 1024 * 1024,
+    # 16 MiB of page cache per connection, in KiB
+    'cache_size': -16 * 1024,
+    # Sorts and temporary indexes stay off the disk
+    'temp_store': 'MEMORY',
+}
+
+# Applied to the connections of read-only pools
+READER_PRAGMAS = {**CONNECTION_PRAGMAS, 'query_only': 'ON'}
+
+
+def apply_pragmas(connection, pragmas):
+    for name, value in pragmas.items():
+        connection.execute(f'PRAGMA {name} = {value}')
+
+
+def enable_wal(connection):
+    """
+    Switch the connection's database file to write-ahead
+    logging and return the journal mode now in effect.
+
+    The mode is stored in the file, so it is set once for
+    every later connection. In WAL mode a writer no longer
+    blocks readers: they keep reading the last committed
+    data until the write commits.
+    """
+    return connection.execute('PRAGMA journal_mode = WAL').fetchone()[0]
+
+
+class PoolTimeout(TimeoutError):
+    """
+    Raised when no pooled connection becomes
+    available within the pool's timeout
+    """
+
+
+class ConnectionPool:
+    """
+    A bounded pool of SQLite connections.
+
+    Connections are opened lazily, up to `max_size`, and are
+    handed out exclusively: a connection checked out by one thread
+    is never visible to another until it is returned. That is what
+    makes `check_same_thread=False` safe here. Nested checkouts from
+    the same thread reuse the connection the thread already holds,
+    so a query that runs another query cannot deadlock the pool.
+
+    Idle connections are kept on a LIFO stack, so under light load
+    a thread keeps getting the same warm connection back.
+    """
+
+    def __init__(
+        self,
+        database,
+        max_size=8,
+        timeout=5.0,
+        read_only=True,
+        health_check=True,
+        cached_statements=128,
+        pragmas=None,
+        wal=False,
+    ):
+        self.database = Path(database).resolve()
+        self.max_size = max_size
+        self.timeout = timeout
+        self.read_only = read_only
+        self.health_check = health_check
+        self.cached_statements = cached_statements
+
+        # None applies the defaults for the pool's
+        # mode, pass {} to leave SQLite's own
+        if pragmas is None:
+            pragmas = READER_PRAGMAS if read_only else CONNECTION_PRAGMAS
+        self.pragmas = dict(pragmas)
+
+        # Switch the file to WAL before the first
+        # connection opens. This needs write access
+        # to the file even when the pool is read-only
+        self.wal = wal
+        self._wal_pending = wal
+        self._wal_lock = threading.Lock()
+
+        self._idle = []
+        self._open = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._local = threading.local()
+        self._tables = None
+
+        # Connections given to threads by `hold`,
+        # outside the `max_size` limit
+        self._held = []
+
+        # A connection outside the pool, used only to
+        # read `PRAGMA data_version`. The pragma's value
+        # is specific to a connection, so it has to be
+        # the same connection every time
+        self._watcher = None
+        self._watcher_lock = threading.Lock()
+        self._data_version = None
+
+        self.hits = 0
+        self.misses = 0
+        self.timeouts = 0
+        self.discarded = 0
+
+    def _enable_wal(self):
+        with self._wal_lock:
+            if self._wal_pending:
+                with closing(sqlite3.connect(self.database)) as connection:
+                    enable_wal(connection)
+                self._wal_pending = False
+
+    def _connect(self):
+
+        if self._wal_pending:
+            self._enable_wal()
+
+        if self.read_only:
+            # mode=ro refuses writes at the SQLite level,
+            # independent of what the query text does
+            connection = sqlite3.connect(
+                f'{self.database.as_uri()}?mode=ro',
+                uri=True,
+                check_same_thread=False,
+                cached_statements=self.cached_statements,
+            )
+        else:
+            connection = sqlite3.connect(
+                self.database,
+                check_same_thread=False,
+                cached_statements=self.cached_statements,
+            )
+
+        apply_pragmas(connection, self.pragmas)
+        return connection
+
+    def _healthy(self, connection):
+        try:
+            connection.execute('SELECT 1').fetchone()
+        except sqlite3.Error:
+            return False
+        return True
+
+    def _new_connection(self):
+        # The slot for this connection is already
+        # reserved, give it back if opening fails
+        try:
+            return self._connect()
+        except BaseException:
+            with self._condition:
+                self._open -= 1
+                self._condition.notify()
+            raise
+
+    def _acquire(self):
+
+        deadline = time.monotonic() + self.timeout
+        connection = None
+
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise sqlite3.ProgrammingError(
+                        'Cannot use a closed connection pool.'
+                    )
+
+                if self._idle:
+                    connection = self._idle.pop()
+                    self.hits += 1
+                    break
+
+                if self._open < self.max_size:
+                    self._open += 1
+                    self.misses += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeout(
+                        f'No connection to {self.database.name} became '
+                        f'available within {self.timeout} seconds.'
+                    )
+                self._condition.wait(remaining)
+
+        if connection is None:
+            return self._new_connection()
+
+        if self.health_check and not self._healthy(connection):
+            with self._condition:
+                self.discarded += 1
+            connection.close()
+            return self._new_connection()
+
+        return connection
+
+    def _release(self, connection):
+
+        if connection.in_transaction:
+            connection.rollback()
+
+        with self._condition:
+            if self._closed:
+                self._open -= 1
+                connection.close()
+            else:
+                self._idle.append(connection)
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self):
+        """
+        Check a connection out of the pool
+        for the duration of a `with` block
+        """
+        held = getattr(self._local, 'connection', None)
+
+        if held is not None:
+            with self._condition:
+                self.hits += 1
+            yield held
+            return
+
+        connection = self._acquire()
+        self._local.connection = connection
+        try:
+            yield connection
+        finally:
+            self._local.connection = None
+            self._release(connection)
+
+    def hold(self):
+        """
+        Give the calling thread a connection of its own for
+        as long as the pool is open. Every later checkout from
+        the thread returns it, so the thread never waits for
+        the pool and never takes a connection from other threads.
+
+        The connection does not count towards `max_size`. Use
+        it for the threads of a fixed-size executor, such as
+        `sql_execution.query_executor`, as its initializer.
+        """
+        connection = self._connect()
+
+        with self._condition:
+            if self._closed:
+                connection.close()
+                raise sqlite3.ProgrammingError(
+                    'Cannot use a closed connection pool.'
+                )
+            self._held.append(connection)
+
+        self._local.connection = connection
+
+    def tables(self):
+        """
+        Return the names of the tables in the
+        database, probed once per pool
+        """
+        if self._tables is None:
+            with self.connection() as connection:
+                rows = connection.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table'"
+                ).fetchall()
+            self._tables = frozenset(row[0] for row in rows)
+
+        return self._tables
+
+    def data_version(self):
+        """
+        Return SQLite's `PRAGMA data_version` as seen by the
+        pool's watcher connection. It changes whenever another
+        connection, in this process or another, commits a write.
+        """
+        with self._watcher_lock:
+            if self._watcher is None:
+                self._watcher = self._connect()
+
+            version = self._watcher.execute(
+                'PRAGMA data_version'
+            ).fetchone()[0]
+
+            if version != self._data_version:
+                # A write may have changed the schema too
+                self._tables = None
+                self._data_version = version
+
+        return version
+
+    def stats(self):
+        with self._condition:
+            return {
+                'max_size': self.max_size,
+                'open': self._open,
+                'idle': len(self._idle),
+                'in_use': self._open - len(self._idle),
+                'hits': self.hits,
+                'misses': self.misses,
+                'timeouts': self.timeouts,
+                'discarded': self.discarded,
+                'held': len(self._held),
+            }
+
+    def close(self):
+        """
+        Close every idle and held connection. Connections that
+        are checked out are closed as soon as they are returned.
+        Stop the threads holding connections first.
+        """
+        with self._condition:
+            self._closed = True
+            while self._idle:
+                self._idle.pop().close()
+                self._open -= 1
+            while self._held:
+                self._held.pop().close()
+            self._condition.notify_all()
+
+        with self._watcher_lock:
+            if self._watcher is not None:
+                self._watcher.close()
+                self._watcher = None
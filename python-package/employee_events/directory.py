@@ -0,0 +1,109 @@
+import bisect
+import re
+import threading
+
+from employee_events.sql_execution import get_pool
+
+
+class NameDirectory:
+    """
+    The names and ids of every employee or team, kept in
+    memory and reloaded after any write is committed to
+    the database, as seen by `PRAGMA data_version`.
+
+    `entries` lists them in the order `names()` returns.
+    `search` finds names by prefix: a name matches when
+    any of its words starts with the prefix, so
+    "smi" finds "Jane Smith".
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self._lock = threading.Lock()
+        self._state = None
+
+    def _current(self):
+
+        # The pragma changes with every commit by another
+        # connection, but restarts with each pool
+        pool = get_pool()
+        version = (pool.serial, pool.data_version())
+        state = self._state
+
+        if state is None or state[0] != version:
+            with self._lock:
+                state = self._state
+                if state is None or state[0] != version:
+                    state = (version, *self._load())
+                    self._state = state
+
+        return state
+
+    def _load(self):
+
+        entries = [(name, id) for name, id in self.model.names()]
+
+        # One key per word of every name: the rest of
+        # the name from that word on, in lower case,
+        # sorted so a prefix is found by bisection
+        keys = sorted(
+            (name.lower()[match.start():], position)
+            for position, (name, _) in enumerate(entries)
+            for match in re.finditer(r'\w+', name)
+        )
+
+        return entries, keys
+
+    # Drop the loaded names, the next read loads them again
+    def clear(self):
+        with self._lock:
+            self._state = None
+
+    @property
+    def version(self):
+        return self._current()[0]
+
+    def entries(self):
+        return self._current()[1]
+
+    def __len__(self):
+        return len(self.entries())
+
+    def search(self, prefix, limit=20):
+        """
+        Return up to `limit` (name, id) entries with a word
+        starting with `prefix`, in alphabetical order of
+        the matching words
+        """
+        _, entries, keys = self._current()
+        prefix = prefix.strip().lower()
+
+        if not prefix:
+            return entries[:limit]
+
+        found = []
+        start = bisect.bisect_left(keys, (prefix,))
+        for key, position in keys[start:]:
+            if not key.startswith(prefix) or len(found) == limit:
+                break
+            if entries[position] not in found:
+                found.append(entries[position])
+
+        return found
+
+
+_directories = {}
+_directories_lock = threading.Lock()
+
+
+def name_directory(model):
+    """
+    Return the shared NameDirectory of `model`'s class
+    """
+    with _directories_lock:
+        directory = _directories.get(model.name)
+        if directory is None:
+            directory = NameDirectory(model)
+            _directories[model.name] = directory
+
+    return directory
@@ -4,6 +4,48 @@ from employee_events.query_base import QueryBase
 # Import dependencies needed for sql execution
 # from the `sql_execution` module
 from employee_events.sql_execution import QueryMixin  # noqa: F401, F403
+from employee_events.statements import register
+
+
+# Query 3
+# Select two columns
+# 1. The employee's full name
+# 2. The employee's id
+# for all employees in the database.
+# `||` is used rather than CONCAT, which
+# older SQLite builds do not provide
+register('employee.names', """
+    SELECT first_name || ' ' || last_name AS full_name
+         , employee_id
+    FROM employee
+""", full_scan=True)
+
+# Query 4
+# Select an employee's first and last name,
+# filtered by the id bound to the placeholder
+register('employee.username', """
+    SELECT first_name, last_name
+    FROM employee
+    WHERE employee_id = ?
+""")
+
+# The data needed for the machine learning model,
+# read from the lifetime totals when they exist
+register('employee.model_data', """
+    SELECT SUM(positive_events) positive_events
+         , SUM(negative_events) negative_events
+    FROM employee
+    JOIN employee_event_totals
+        USING(employee_id)
+    WHERE employee.employee_id = ?
+""", requires=['employee_event_totals'], fallback="""
+    SELECT SUM(positive_events) positive_events
+         , SUM(negative_events) negative_events
+    FROM employee
+    JOIN employee_events
+        USING(employee_id)
+    WHERE employee.employee_id = ?
+""")
 
 
 # Define a subclass of QueryBase
@@ -20,19 +62,7 @@ class Employee(QueryBase):
     # from an sql execution
     def names(self):
 
-        # Query 3
-        # Write an SQL query
-        # that selects two columns
-        # 1. The employee's full name
-        # 2. The employee's id
-        # This query should return the data
-        # for all employees in the database
-        query = f"""
-                    SELECT CONCAT(first_name, ' ', last_name)
-                    AS full_name, employee_id
-                    FROM {self.name}
-                """
-        return self.query(query)
+        return self.query(self.statement('names'))
 
     # Define a method called `username`
     # that receives an `id` argument
@@ -40,35 +70,14 @@ class Employee(QueryBase):
     # from an sql execution
     def username(self, id):
 
-        # Query 4
-        # Write an SQL query
-        # that selects an employees full name
-        # Use f-string formatting and a WHERE filter
-        # to only return the full name of the employee
-        # with an id equal to the id argument
-        query = f"""
-                    SELECT first_name, last_name
-                    FROM {self.name}
-                    WHERE employee_id = {id}
-                """
-        return self.query(query)[0]
+        return self.query(self.statement('username'), (id,))[0]
 
     # Below is method with an SQL query
     # This SQL query generates the data needed for
     # the machine learning model.
-    # Without editing the query, alter this method
-    # so when it is called, a pandas dataframe
-    # is returns containing the execution of
+    # When it is called, a pandas dataframe
+    # is returned containing the execution of
     # the sql query
     def model_data(self, id):
 
-        query = f"""
-                    SELECT SUM(positive_events) positive_events
-                            , SUM(negative_events) negative_events
-                    FROM {self.name}
-                    JOIN employee_events
-                        USING({self.name}_id)
-                    WHERE {self.name}.{self.name}_id = {id}
-                """
-
-        return self.pandas_query(query)
+        return self.pandas_query(self.statement('model_data'), (id,))
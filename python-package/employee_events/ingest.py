@@ -0,0 +1,236 @@
+import csv
+import io
+import json
+import sqlite3
+import sys
+import time
+from collections import namedtuple
+from collections.abc import Mapping
+from datetime import date
+from itertools import islice
+from pathlib import Path
+
+from employee_events.connection_pool import enable_wal
+from employee_events.schema import migrate
+from employee_events.summaries import refresh_summaries
+
+
+# The columns of an event record. `team_id` may be left
+# out, the employee's current team is used instead
+EVENT_COLUMNS = (
+    'event_date',
+    'employee_id',
+    'team_id',
+    'positive_events',
+    'negative_events',
+)
+
+# An event restates an employee's counts for a day:
+# a second record for the same day replaces the first.
+# The unique index of migration 4 finds the conflict
+UPSERT_EVENT = """
+    INSERT INTO employee_events (
+        event_date, employee_id, team_id,
+        positive_events, negative_events
+    )
+    VALUES (
+        :event_date,
+        :employee_id,
+        :team_id,
+        :positive_events,
+        :negative_events
+    )
+    ON CONFLICT (employee_id, event_date) DO UPDATE SET
+        team_id = excluded.team_id,
+        positive_events = excluded.positive_events,
+        negative_events = excluded.negative_events
+"""
+
+IngestStats = namedtuple(
+    'IngestStats', ['rows', 'batches', 'seconds', 'rows_per_second']
+)
+
+
+class IngestError(ValueError):
+    """
+    Raised for an event record that cannot be
+    ingested. Nothing from its batch file is kept
+    """
+
+
+def _event(record, line, teams):
+    # Check and convert one record. CSV gives every
+    # value as a string, JSON may give numbers. A
+    # missing team_id is looked up in `teams`, the
+    # current team of every employee
+    if not isinstance(record, Mapping):
+        raise IngestError(
+            f'record {line}: expected an object, '
+            f'got {type(record).__name__}'
+        )
+
+    try:
+        team_id = record.get('team_id')
+        event = {
+            'event_date': date.fromisoformat(
+                str(record['event_date'])
+            ).isoformat(),
+            'employee_id': int(record['employee_id']),
+            'team_id': None if team_id in (None, '') else int(team_id),
+            'positive_events': int(record['positive_events']),
+            'negative_events': int(record['negative_events']),
+        }
+    except (KeyError, TypeError, ValueError) as error:
+        raise IngestError(f'record {line}: {error!r}') from error
+
+    if event['team_id'] is None:
+        event['team_id'] = teams.get(event['employee_id'])
+        if event['team_id'] is None:
+            raise IngestError(
+                f'record {line}: no team_id, and employee '
+                f'{event["employee_id"]} has no team'
+            )
+
+    return event
+
+
+def read_events(source, format=None):
+    """
+    Yield the event records of a CSV file with a
+    header row, or of a JSON Lines file. `source`
+    is a path, or '-' for standard input. The format
+    comes from the file extension unless given.
+    """
+    if format is None:
+        suffix = Path(str(source)).suffix.lower()
+        format = 'csv' if suffix == '.csv' else 'jsonl'
+
+    if str(source) == '-':
+        file = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8')
+    else:
+        file = open(source, newline='', encoding='utf-8')
+
+    with file:
+        if format == 'csv':
+            yield from csv.DictReader(file)
+        else:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _deferred_indexes(connection):
+    # The indexes on employee_events that an upsert
+    # does not need, as (name, sql) pairs
+    return connection.execute(
+        """
+        SELECT name, sql FROM sqlite_master
+        WHERE type = 'index'
+          AND tbl_name = 'employee_events'
+          AND name != 'ux_employee_events_day'
+          AND sql IS NOT NULL
+        """
+    ).fetchall()
+
+
+def ingest_events(
+    records,
+    database,
+    batch_size=10_000,
+    defer_indexes=False,
+    progress=None,
+):
+    """
+    Upsert event records into `database` and bring
+    the summary tables up to date. Return IngestStats.
+
+    `records` is any iterable of mappings with the
+    EVENT_COLUMNS, such as `read_events(path)`. They are
+    written `batch_size` at a time with executemany, all
+    in one transaction: readers keep seeing the previous
+    data until it commits, and a bad record leaves the
+    database as it was. The database is switched to WAL
+    mode so those readers are never blocked.
+
+    Set `defer_indexes` for backfills larger than the table
+    already is: the secondary indexes on employee_events are
+    dropped for the load and built again once, in the same
+    transaction. For smaller loads keeping them is faster.
+
+    `progress`, when given, is called with the
+    IngestStats so far after every batch.
+    """
+    migrate(database)
+
+    connection = sqlite3.connect(database, isolation_level=None)
+
+    try:
+        enable_wal(connection)
+        connection.execute('PRAGMA synchronous = NORMAL')
+        connection.execute('PRAGMA cache_size = -65536')
+
+        started = time.perf_counter()
+        rows = batches = 0
+        earliest = None
+
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            teams = dict(connection.execute(
+                'SELECT employee_id, team_id FROM employee'
+            ))
+
+            indexes = _deferred_indexes(connection) if defer_indexes else []
+            for name, _ in indexes:
+                connection.execute(f'DROP INDEX {name}')
+
+            numbered = enumerate(records, start=1)
+            while True:
+                batch = [
+                    _event(record, line, teams)
+                    for line, record in islice(numbered, batch_size)
+                ]
+                if not batch:
+                    break
+
+                # In index order, the writes to the employee
+                # indexes land on neighbouring pages. The sort
+                # is stable, so the last record of a day wins
+                batch.sort(key=_index_order)
+                connection.executemany(UPSERT_EVENT, batch)
+
+                first = min(event['event_date'] for event in batch)
+                earliest = first if earliest is None else min(earliest, first)
+                rows += len(batch)
+                batches += 1
+
+                if progress is not None:
+                    progress(_stats(rows, batches, started))
+
+            for _, sql in indexes:
+                connection.execute(sql)
+
+            # Rebuild the summaries from the earliest day
+            # received, which may be before the last refresh
+            if rows:
+                refresh_summaries(connection, since=earliest)
+
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+        return _stats(rows, batches, started)
+
+    finally:
+        connection.close()
+
+
+def _index_order(event):
+    return event['employee_id'], event['event_date']
+
+
+def _stats(rows, batches, started):
+    seconds = time.perf_counter() - started
+    return IngestStats(
+        rows, batches, seconds, rows / seconds if seconds else 0.0
+    )
@@ -0,0 +1,153 @@
+import contextvars
+import copy
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+
+from employee_events.sql_execution import data_version, get_pool
+
+
+# Results of the query methods, memoized by method,
+# arguments and data version at two levels:
+#
+# - per request, inside `request_scope()`. Every query a
+#   page repeats runs once, and nothing outlives the page
+# - process-wide for `ttl` seconds, when `configure_memo`
+#   sets one, so back-to-back requests share results too
+#
+# A key includes the data version, which changes with
+# every committed write to the tables the queries read,
+# so no level ever returns a result from before a write
+_request_results = contextvars.ContextVar('request_results', default=None)
+
+_lock = threading.Lock()
+_ttl = 0
+_max_entries = 1024
+_shared_results = OrderedDict()
+_stats = {'request_hits': 0, 'shared_hits': 0, 'misses': 0}
+
+
+def configure_memo(ttl=0, max_entries=1024):
+    """
+    Keep query results process-wide for `ttl` seconds,
+    at most `max_entries` of them. A ttl of 0 turns the
+    process-wide level off and empties it.
+
+    Return the previous settings, so a caller can put
+    them back with `configure_memo(**previous)`.
+    """
+    global _ttl, _max_entries
+
+    with _lock:
+        previous = {'ttl': _ttl, 'max_entries': _max_entries}
+        _ttl = ttl
+        _max_entries = max_entries
+        _shared_results.clear()
+
+    return previous
+
+
+@contextmanager
+def request_scope():
+    """
+    Memoize the query methods called inside the block.
+    Threads started with a copy of the context, as
+    CombinedComponent does, share the same results.
+    """
+    token = _request_results.set({})
+    try:
+        yield
+    finally:
+        _request_results.reset(token)
+
+
+def memo_stats():
+    """
+    Return the hit and miss counts and the hit rate
+    """
+    with _lock:
+        stats = dict(_stats, entries=len(_shared_results))
+
+    calls = stats['request_hits'] + stats['shared_hits'] + stats['misses']
+    stats['hit_rate'] = (calls - stats['misses']) / calls if calls else 0.0
+    return stats
+
+
+def _count(name):
+    with _lock:
+        _stats[name] += 1
+
+
+def _shared_get(key):
+
+    with _lock:
+        entry = _shared_results.get(key)
+        if entry is None:
+            return None
+
+        expires, value = entry
+        if expires < time.monotonic():
+            del _shared_results[key]
+            return None
+
+        _shared_results.move_to_end(key)
+        return entry
+
+
+def _shared_set(key, value):
+
+    with _lock:
+        _shared_results[key] = (time.monotonic() + _ttl, value)
+        _shared_results.move_to_end(key)
+        while len(_shared_results) > _max_entries:
+            _shared_results.popitem(last=False)
+
+
+def memoized(method):
+    """
+    Decorate a query method of QueryBase so its results
+    are memoized while a request scope is active or
+    a ttl is configured. Callers get a copy of the result,
+    so changing it does not change what others receive.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+
+        results = _request_results.get()
+        if results is None and not _ttl:
+            return method(self, *args, **kwargs)
+
+        # The database is part of the key because a copy
+        # of a database has the same data version
+        key = (
+            str(get_pool().database),
+            self.name,
+            method.__qualname__,
+            args,
+            tuple(sorted(kwargs.items())),
+            data_version(),
+        )
+
+        if results is not None and key in results:
+            _count('request_hits')
+            return copy.deepcopy(results[key])
+
+        entry = _shared_get(key) if _ttl else None
+        if entry is not None:
+            _count('shared_hits')
+            value = entry[1]
+        else:
+            _count('misses')
+            value = method(self, *args, **kwargs)
+            if _ttl:
+                _shared_set(key, value)
+
+        if results is not None:
+            results[key] = value
+
+        return copy.deepcopy(value)
+
+    wrapper.memoized = True
+    return wrapper
@@ -2,23 +2,211 @@
 import pandas as pd  # noqa: F401
 import numpy as np  # noqa: F401
 import random, pickle, json  # noqa: E401, F401
+from collections import namedtuple
 from sqlite3 import connect  # noqa: F401
 from datetime import timedelta, date  # noqa: F401
-from employee_events.sql_execution import QueryMixin
+from employee_events.memo import memoized
+from employee_events.search import search_terms
+from employee_events.sql_execution import (
+    AsyncQueryMixin,
+    QueryMixin,
+    database_tables,
+)
+from employee_events.statements import register, statement
+
+
+# QUERY 1
+# Group by `event_date` and sum the number
+# of positive and negative events for one entity.
+# `{name}` is filled in once per subclass, the id
+# is bound through the `?` placeholder.
+# The daily summary table already holds one row
+# per day (per team, for employees), so this is
+# an index range read rather than an aggregation
+EVENT_COUNTS = """
+    SELECT event_date
+         , SUM(positive_events) AS positive_events
+         , SUM(negative_events) AS negative_events
+    FROM {name}_daily_events
+    WHERE {name}_id = ?
+    GROUP BY event_date
+    ORDER BY event_date
+"""
+
+# The same result from the raw events, for
+# databases without the summary tables
+EVENT_COUNTS_FALLBACK = """
+    SELECT event_date
+         , SUM(positive_events) AS positive_events
+         , SUM(negative_events) AS negative_events
+    FROM employee_events
+    WHERE {name}_id = ?
+    GROUP BY event_date
+    ORDER BY event_date
+"""
+
+# Running totals of the daily counts for one entity,
+# computed by SQLite with a window function
+CUMULATIVE_EVENT_COUNTS = """
+    SELECT event_date
+         , SUM(SUM(positive_events)) OVER (ORDER BY event_date)
+         , SUM(SUM(negative_events)) OVER (ORDER BY event_date)
+    FROM {table}
+    WHERE {name}_id = ?
+    GROUP BY event_date
+    ORDER BY event_date
+"""
+
+# The arrays returned by `cumulative_event_counts`
+CumulativeCounts = namedtuple(
+    'CumulativeCounts',
+    ['event_date', 'positive_events', 'negative_events'],
+)
+
+# QUERY 2
+# Return `note_date` and `note` from the `notes`
+# table for one entity. Many notes share a date, so
+# rowid breaks the ties: every window of NOTES_PAGE
+# then sees the same order and no note is skipped
+# or repeated between windows
+NOTES = """
+    SELECT note_date, note
+    FROM notes
+    WHERE {name}_id = ?
+    ORDER BY note_date, rowid
+"""
+
+# One window of NOTES. A negative LIMIT means no limit
+NOTES_PAGE = NOTES + """\
+    LIMIT ? OFFSET ?
+"""
+
+# The notes after a (note_date, rowid) key, in key order.
+# Each page starts where the last one ended, so reading
+# a page costs the same however deep it is
+NOTES_AFTER = """
+    SELECT note_date, note, rowid AS note_id
+    FROM notes
+    WHERE {name}_id = ?
+      AND (note_date, rowid) > (?, ?)
+    ORDER BY note_date, rowid
+    LIMIT ?
+"""
+
+# NOTES_AFTER restricted to the notes matching
+# a full-text query, looked up in `notes_fts`
+NOTES_SEARCH = """
+    SELECT notes.note_date, notes.note, notes.rowid AS note_id
+    FROM notes_fts
+    JOIN notes ON notes.rowid = notes_fts.rowid
+    WHERE notes.{name}_id = ?
+      AND notes_fts MATCH ?
+      AND (notes.note_date, notes.rowid) > (?, ?)
+    ORDER BY notes.note_date, notes.rowid
+    LIMIT ?
+"""
+
+# The same with a LIKE pattern, for
+# databases without the full-text index
+NOTES_SEARCH_FALLBACK = """
+    SELECT note_date, note, rowid AS note_id
+    FROM notes
+    WHERE {name}_id = ?
+      AND note LIKE ? ESCAPE '\\'
+      AND (note_date, rowid) > (?, ?)
+    ORDER BY note_date, rowid
+    LIMIT ?
+"""
+
+# A page of notes, and the key to pass as `after`
+# for the next page, None on the last page
+NotesPage = namedtuple('NotesPage', ['notes', 'after'])
+
+# The key before the first note
+FIRST_NOTE = ('', 0)
 
 
 # Define a class called QueryBase
 # Use inheritance to add methods
 # for querying the employee_events database.
 # Need the QueryMixin to execute SQL queries for notes and event_counts
-class QueryBase(QueryMixin):
+class QueryBase(QueryMixin, AsyncQueryMixin):
 
     # Create a class attribute called `name`
     # set the attribute to an empty string
     name = ''
 
+    # Methods whose results are memoized per request
+    # (see employee_events.memo), including the
+    # versions subclasses define
+    memoized_methods = (
+        'names',
+        'username',
+        'team_name',
+        'model_data',
+        'event_counts',
+        'cumulative_event_counts',
+        'notes',
+        'paged_notes',
+        'search_notes',
+    )
+
+    # Register the shared statements for every
+    # subclass as soon as it is defined, using
+    # the subclass's `name` attribute
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        for method_name in cls.memoized_methods:
+            method = cls.__dict__.get(method_name)
+            if method is not None and not hasattr(method, 'memoized'):
+                setattr(cls, method_name, memoized(method))
+
+        if cls.name:
+            register(
+                f'{cls.name}.event_counts',
+                EVENT_COUNTS.format(name=cls.name),
+                requires=[f'{cls.name}_daily_events'],
+                fallback=EVENT_COUNTS_FALLBACK.format(name=cls.name),
+            )
+            register(
+                f'{cls.name}.cumulative_event_counts',
+                CUMULATIVE_EVENT_COUNTS.format(
+                    table=f'{cls.name}_daily_events',
+                    name=cls.name,
+                ),
+                requires=[f'{cls.name}_daily_events'],
+                fallback=CUMULATIVE_EVENT_COUNTS.format(
+                    table='employee_events',
+                    name=cls.name,
+                ),
+            )
+            register(f'{cls.name}.notes', NOTES.format(name=cls.name))
+            register(
+                f'{cls.name}.notes_page',
+                NOTES_PAGE.format(name=cls.name),
+            )
+            register(
+                f'{cls.name}.notes_after',
+                NOTES_AFTER.format(name=cls.name),
+            )
+            register(
+                f'{cls.name}.notes_search',
+                NOTES_SEARCH.format(name=cls.name),
+                requires=['notes_fts'],
+                fallback=NOTES_SEARCH_FALLBACK.format(name=cls.name),
+            )
+
+    # Return the registered sql for `key`
+    # scoped to this class's `name`, falling back
+    # to the raw-table variant when the database
+    # has no summary tables
+    def statement(self, key):
+        return statement(f'{self.name}.{key}', tables=database_tables())
+
     # Define a `names` method that receives
     # no passed arguments
+    @memoized
     def names(self):
 
         # Return an empty list
@@ -32,47 +220,81 @@ class QueryBase(QueryMixin):
     # Define an `event_counts` method
     # that receives an `id` argument
     # This method should return a pandas dataframe
+    @memoized
     def event_counts(self, id):
 
-        # QUERY 1
-        # Write an SQL query that groups by `event_date`
-        # and sums the number of positive and negative events
-        # Use f-string formatting to set the FROM {table}
-        # to the `name` class attribute
-        # Use f-string formatting to set the name
-        # of id columns used for joining
-        # order by the event_date column
-        table = 'employee_events'
-        query = f"""
-            SELECT event_date
-                 , SUM(positive_events) AS positive_events
-                 , SUM(negative_events) AS negative_events
-            FROM {table}
-            WHERE {self.name}_id = {id}
-            GROUP BY event_date
-            ORDER BY event_date;
-        """
-
         # Return the result of the pandas_query method
-        return self.pandas_query(query)
+        return self.pandas_query(self.statement('event_counts'), (id,))
+
+    # Return the running totals of positive and
+    # negative events for one entity as NumPy
+    # arrays, in `event_date` order
+    @memoized
+    def cumulative_event_counts(self, id):
+
+        event_date, positive, negative = self.numpy_query(
+            self.statement('cumulative_event_counts'),
+            (id,),
+            dtypes=['datetime64[D]', np.int64, np.int64],
+        )
+
+        return CumulativeCounts(event_date, positive, negative)
 
     # Define a `notes` method that receives an id argument
-    # This function should return a pandas dataframe
-    def notes(self, id):
-
-        # QUERY 2
-        # Write an SQL query that returns `note_date`, and `note`
-        # from the `notes` table
-        # Set the joined table names and id columns
-        # with f-string formatting
-        # so the query returns the notes
-        # for the table name in the `name` class attribute
-        query = f"""
-            SELECT note_date, note
-            FROM notes
-            WHERE {self.name}_id = {id}
-            ORDER BY note_date;
-        """
+    # This function should return a pandas dataframe.
+    # `limit` and `offset` select a window of the notes
+    # in SQL, so a page never reads the rest of them
+    @memoized
+    def notes(self, id, limit=None, offset=0):
 
-        # Return the result of the pandas_query method
-        return self.pandas_query(query)
+        if limit is None and not offset:
+            # Return the result of the pandas_query method
+            return self.pandas_query(self.statement('notes'), (id,))
+
+        return self.pandas_query(
+            self.statement('notes_page'),
+            (id, -1 if limit is None else limit, offset),
+        )
+
+    # Return a NotesPage of up to `limit` notes
+    # following the key `after`, from the first note
+    # when `after` is None. Pass the page's `after`
+    # back in to read the next page
+    @memoized
+    def paged_notes(self, id, limit=20, after=None):
+        return self._notes_page('notes_after', (id,), limit, after)
+
+    # `paged_notes` for the notes containing every word
+    # of `text`, searched in the full-text index. Databases
+    # without one scan the entity's notes for the words
+    # in the order given
+    @memoized
+    def search_notes(self, id, text, limit=20, after=None):
+
+        if 'notes_fts' in database_tables():
+            pattern = search_terms(text)
+        else:
+            words = text.replace('\\', '\\\\').replace('%', '\\%')
+            words = words.replace('_', '\\_').split()
+            pattern = '%' + '%'.join(words) + '%' if words else None
+
+        if pattern is None:
+            return self.paged_notes(id, limit, after)
+
+        return self._notes_page('notes_search', (id, pattern), limit, after)
+
+    def _notes_page(self, key, params, limit, after):
+
+        # Read one row past the page to
+        # learn whether another page follows
+        notes = self.pandas_query(
+            self.statement(key),
+            (*params, *(after or FIRST_NOTE), limit + 1),
+        )
+
+        if len(notes) <= limit:
+            return NotesPage(notes, None)
+
+        notes = notes.iloc[:limit]
+        last = notes.iloc[-1]
+        return NotesPage(notes, (last.note_date, int(last.note_id)))
@@ -0,0 +1,255 @@
+import re
+import sqlite3
+
+from employee_events.statements import (
+    allows_full_scan,
+    registered_statements,
+    statement,
+)
+from employee_events.search import create_notes_search
+from employee_events.summaries import CREATE_SUMMARY_TABLES, refresh_summaries
+
+
+# A random id for the database file, so that two databases
+# with the same content still have different data versions,
+# and a revision bumped by every insert, update and delete
+# on the tables the dashboard reads, so a commit by any
+# connection, in this process or another, changes the
+# token returned by `sql_execution.data_version`.
+#
+# employee_events is left out: the dashboard reads events
+# through the summary tables, which only change when
+# `refresh_summaries` runs, and that bumps the summary
+# revision once per transaction. A row trigger on it
+# would slow every ingest down by a third or more
+TRACKED_TABLES = ('notes', 'employee', 'team')
+
+CREATE_DATA_REVISION = [
+    """
+    CREATE TABLE IF NOT EXISTS data_revision (
+        id INTEGER PRIMARY KEY CHECK (id = 0),
+        database_id TEXT NOT NULL,
+        revision INTEGER NOT NULL
+    )
+    """,
+    """
+    INSERT OR IGNORE INTO data_revision (id, database_id, revision)
+    VALUES (0, lower(hex(randomblob(8))), 0)
+    """,
+    *(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_revision_{operation.lower()}
+        AFTER {operation} ON {table} BEGIN
+            UPDATE data_revision SET revision = revision + 1 WHERE id = 0;
+        END
+        """
+        for table in TRACKED_TABLES
+        for operation in ('INSERT', 'UPDATE', 'DELETE')
+    ),
+]
+
+
+# Schema migrations, applied in order.
+# `PRAGMA user_version` records how many
+# have already run against a database file.
+# Each migration is a list of steps; a step is
+# either an sql string or a callable that
+# receives the open connection.
+MIGRATIONS = [
+
+    # 1. Covering indexes for every per-entity lookup,
+    # so the `WHERE {name}_id = ?` filters in QueryBase
+    # become index searches instead of table scans
+    [
+        """
+        CREATE INDEX IF NOT EXISTS ix_employee_events_employee
+        ON employee_events (
+            employee_id, event_date, positive_events, negative_events
+        )
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS ix_employee_events_team
+        ON employee_events (
+            team_id, employee_id, event_date,
+            positive_events, negative_events
+        )
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS ix_notes_employee
+        ON notes (employee_id, note_date)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS ix_notes_team
+        ON notes (team_id, note_date)
+        """,
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_employee
+        ON employee (employee_id)
+        """,
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_team
+        ON team (team_id)
+        """,
+        'ANALYZE',
+    ],
+
+    # 2. Daily and lifetime summary tables, filled
+    # from the events already in the database
+    [
+        *CREATE_SUMMARY_TABLES,
+        refresh_summaries,
+        'ANALYZE',
+    ],
+
+    # 3. A full-text index over the notes, when
+    # SQLite has FTS5, for searching them
+    [
+        create_notes_search,
+    ],
+
+    # 4. One row per employee and day, so ingested
+    # events can be upserted on that pair
+    [
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_employee_events_day
+        ON employee_events (employee_id, event_date)
+        """,
+    ],
+
+    # 5. An id for the database and a revision counter
+    # bumped by writes to the tables the dashboard reads
+    CREATE_DATA_REVISION,
+]
+
+
+class QueryPlanError(AssertionError):
+    """
+    Raised when a registered statement falls back
+    to a full table scan or cannot be planned
+    """
+
+
+def schema_version(connection):
+    return connection.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(database):
+    """
+    Apply every pending migration to `database`
+    and return the resulting schema version.
+
+    Each migration runs in its own transaction,
+    so a failure leaves the file at the last
+    fully applied version.
+    """
+    connection = sqlite3.connect(database, isolation_level=None)
+
+    try:
+        version = schema_version(connection)
+
+        for number, steps in enumerate(MIGRATIONS, start=1):
+            if number <= version:
+                continue
+
+            connection.execute('BEGIN')
+            try:
+                for step in steps:
+                    if callable(step):
+                        step(connection)
+                    else:
+                        connection.execute(step)
+                connection.execute(f'PRAGMA user_version = {number}')
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+            connection.execute('COMMIT')
+            version = number
+
+        return version
+
+    finally:
+        connection.close()
+
+
+def _tables(connection):
+    rows = connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table'"
+    ).fetchall()
+    return {row[0] for row in rows}
+
+
+def query_plan(connection, sql):
+    """
+    Return the `EXPLAIN QUERY PLAN` detail lines for `sql`.
+    Placeholders are bound to NULL; the plan does not
+    depend on the values.
+    """
+    params = [None] * sql.count('?')
+    rows = connection.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+    return [row[-1] for row in rows.fetchall()]
+
+
+def find_table_scans(connection):
+    """
+    Return {statement name: [plan lines]} for every
+    registered statement whose plan scans a table.
+
+    Statements with a fallback are checked in the variant
+    that would run against this database. A statement
+    SQLite cannot plan, such as one naming a missing
+    table or column, is returned with the error instead.
+    """
+    tables = _tables(connection)
+    scans = {}
+
+    for name in sorted(registered_statements()):
+        if name.endswith('.fallback') or allows_full_scan(name):
+            continue
+
+        sql = statement(name, tables=tables)
+
+        try:
+            plan = query_plan(connection, sql)
+        except sqlite3.OperationalError as error:
+            # It would fail the same way when run
+            scans[name] = [f'cannot be planned: {error}']
+            continue
+
+        offending = []
+        for detail in plan:
+            match = re.match(r'SCAN (\w+)', detail)
+            if match and match.group(1) in tables:
+                # A virtual table given constraints, such as
+                # a full-text MATCH, answers from its own index
+                if re.search(r'VIRTUAL TABLE INDEX \d+:\S', detail):
+                    continue
+                offending.append(detail)
+
+        if offending:
+            scans[name] = offending
+
+    return scans
+
+
+def check_query_plans(database):
+    """
+    Raise QueryPlanError if any registered statement
+    runs a full table scan against `database`
+    """
+    connection = sqlite3.connect(database)
+
+    try:
+        scans = find_table_scans(connection)
+    finally:
+        connection.close()
+
+    if scans:
+        lines = [
+            f'  {name}: {"; ".join(details)}'
+            for name, details in scans.items()
+        ]
+        raise QueryPlanError(
+            'Registered statements fall back to a table scan '
+            'or cannot be planned:\n'
+            + '\n'.join(lines)
+        )
@@ -0,0 +1,159 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from employee_events.sql_execution import (
+    QueryMixin,
+    data_version,
+    database_tables,
+    get_pool,
+)
+from employee_events.statements import register, statement
+from employee_events.timing import timed
+
+
+# Lifetime event totals for every employee,
+# one row per employee and team, in one query
+register('model_data.all', """
+    SELECT employee_id, team_id, positive_events, negative_events
+    FROM employee_event_totals
+    ORDER BY employee_id, team_id
+""", full_scan=True, requires=['employee_event_totals'], fallback="""
+    SELECT employee_id
+         , team_id
+         , SUM(positive_events)
+         , SUM(negative_events)
+    FROM employee_events
+    GROUP BY employee_id, team_id
+    ORDER BY employee_id, team_id
+""")
+
+
+class RiskScores:
+    """
+    Model scores for every employee and team,
+    computed together at one data version
+    """
+
+    def __init__(self, version, employee_ids, employee_scores,
+                 team_ids, team_scores):
+        self.version = version
+        self.ids = {'employee': employee_ids, 'team': team_ids}
+        self.scores = {'employee': employee_scores, 'team': team_scores}
+        self._lookup = {
+            name: dict(zip(ids.tolist(), self.scores[name].tolist()))
+            for name, ids in self.ids.items()
+        }
+
+    def score(self, name, id):
+        """
+        Return the score of one employee or team,
+        or None if it has no events
+        """
+        return self._lookup[name].get(int(id))
+
+    def ranking(self, name):
+        """
+        Return [(id, score)] for every employee or
+        team, highest score first
+        """
+        order = np.argsort(-self.scores[name], kind='stable')
+        return list(zip(
+            self.ids[name][order].tolist(),
+            self.scores[name][order].tolist(),
+        ))
+
+
+def _version():
+    # Scores are kept per database file as well as per
+    # data version, like the memoized query results
+    return (str(get_pool().database), data_version())
+
+
+def _group_sum(keys, *columns):
+    # Sum each column per distinct key: returns
+    # the sorted keys, the per-row group index
+    # and one array of sums per column
+    groups, inverse = np.unique(keys, return_inverse=True)
+    sums = [
+        np.bincount(inverse, weights=column, minlength=len(groups))
+        for column in columns
+    ]
+    return groups, inverse, sums
+
+
+@timed('model')
+def score_all(predictor, column=1):
+    """
+    Score every employee and team with `predictor`.
+
+    The lifetime totals come from one query and are
+    scored in a single `predict_proba` call: one row per
+    employee, as in `Employee.model_data`, followed by one
+    row per employee and team, as in `Team.model_data`.
+    A team's score is the mean of its rows' scores, and
+    `column` selects the `predict_proba` column to keep.
+    """
+    version = _version()
+
+    employee_ids, team_ids, positive, negative = QueryMixin.numpy_query(
+        statement('model_data.all', tables=database_tables()),
+        dtypes=[np.int64, np.int64, np.int64, np.int64],
+    )
+
+    employees, _, (employee_positive, employee_negative) = _group_sum(
+        employee_ids, positive, negative
+    )
+
+    features = pd.DataFrame({
+        'positive_events': np.concatenate([employee_positive, positive]),
+        'negative_events': np.concatenate([employee_negative, negative]),
+    }).astype(np.int64)
+
+    if len(features):
+        probabilities = predictor.predict_proba(features)[:, column]
+    else:
+        probabilities = np.empty(0)
+
+    employee_scores = probabilities[:len(employees)]
+    row_scores = probabilities[len(employees):]
+
+    teams, team_rows, (team_totals,) = _group_sum(team_ids, row_scores)
+    team_scores = team_totals / np.bincount(team_rows, minlength=len(teams))
+
+    return RiskScores(version, employees, employee_scores, teams, team_scores)
+
+
+class ScoreTable:
+    """
+    Holds the latest RiskScores for a predictor and
+    recomputes them, in one batch, the first time they
+    are read after the data version or the pooled
+    database changes
+    """
+
+    def __init__(self, predictor, column=1):
+        self.predictor = predictor
+        self.column = column
+        self._scores = None
+        self._lock = threading.Lock()
+
+    def current(self):
+
+        version = _version()
+        scores = self._scores
+
+        if scores is None or scores.version != version:
+            with self._lock:
+                scores = self._scores
+                if scores is None or scores.version != version:
+                    scores = score_all(self.predictor, self.column)
+                    self._scores = scores
+
+        return scores
+
+    # Drop the scores, the next read computes them again
+    def clear(self):
+        with self._lock:
+            self._scores = None
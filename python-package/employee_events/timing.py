@@ -0,0 +1,92 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+
+# Time spent per category ('query', 'model', ...) while a
+# `timing_scope()` is active, e.g. for one request of a load
+# test. Outside a scope `timed` costs one context lookup.
+#
+# A block nested in another is counted under its own
+# category only: the outer block is charged for the time
+# outside it. Blocks in threads started with a copy of the
+# context, as CombinedComponent does, add to the same
+# totals. Their time can overlap the block that started
+# them, whose own time is then never counted below zero
+_timings = contextvars.ContextVar('timings', default=None)
+
+# The innermost open block of this context, as a
+# one-item list holding the time spent in its children
+_frame = contextvars.ContextVar('timing_frame', default=None)
+
+_lock = threading.Lock()
+
+
+@contextmanager
+def timing_scope():
+    """
+    Collect the time of every `timed` block inside this
+    one and yield it as {category: seconds}
+    """
+    timings = {}
+    token = _timings.set(timings)
+    frame_token = _frame.set(None)
+    try:
+        yield timings
+    finally:
+        _frame.reset(frame_token)
+        _timings.reset(token)
+
+
+class timed:
+    """
+    Count the time of a block, or of every call of a
+    decorated function, under `category`:
+
+        with timed('serialization'):
+            ...
+
+        @timed('query')
+        def query(...):
+            ...
+    """
+
+    def __init__(self, category):
+        self.category = category
+
+    def __call__(self, func):
+        category = self.category
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _timings.get() is None:
+                return func(*args, **kwargs)
+            with timed(category):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def __enter__(self):
+        self._timings = _timings.get()
+        if self._timings is not None:
+            self._parent = _frame.get()
+            self._children = [0.0]
+            self._token = _frame.set(self._children)
+            self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._timings is None:
+            return
+
+        elapsed = time.perf_counter() - self._started
+        _frame.reset(self._token)
+
+        with _lock:
+            timings = self._timings
+            own = max(0.0, elapsed - self._children[0])
+            timings[self.category] = timings.get(self.category, 0.0) + own
+            if self._parent is not None:
+                self._parent[0] += elapsed
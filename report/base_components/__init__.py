@@ -3,3 +3,4 @@ from .dropdown import Dropdown  # noqa: F401
 from .radio import Radio  # noqa: F401
 from .matplotlib_viz import MatplotlibViz  # noqa: F401
 from .data_table import DataTable  # noqa: F401
+from .cache import LRUCache, chart_cache  # noqa: F401
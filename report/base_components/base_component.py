@@ -1,5 +1,13 @@
+from fasthtml.common import NotStr, to_xml
+
+
 class BaseComponent:
 
+    # Set to True on components whose output depends only
+    # on `static_key`. They are rendered to HTML once per
+    # key and the string is reused on every later call
+    static = False
+
     def build_component(self, entity_id, model):
         raise NotImplementedError
 
@@ -9,8 +17,29 @@ class BaseComponent:
     def component_data(self, entity_id, model):
         raise NotImplementedError
 
+    def static_key(self, entity_id, model):
+        return model.name
+
     def __call__(self, entity_id, model):
 
+        if self.static:
+            return self.compiled(entity_id, model)
+
         component = self.build_component(entity_id, model)
 
         return self.outer_div(component)
+
+    # Return the component's HTML for its static key,
+    # rendering it on the first call for that key
+    def compiled(self, entity_id, model):
+
+        fragments = self.__dict__.setdefault('_fragments', {})
+        key = self.static_key(entity_id, model)
+
+        html = fragments.get(key)
+        if html is None:
+            component = self.build_component(entity_id, model)
+            html = to_xml(self.outer_div(component))
+            fragments[key] = html
+
+        return NotStr(html)
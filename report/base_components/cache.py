@@ -0,0 +1,141 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+
+class LRUCache:
+    """
+    A thread-safe least-recently-used cache of bytes values,
+    bounded by entry count and by total size.
+
+    With a `directory`, every cached value is also written
+    to disk and read back on a memory miss, so the cache
+    survives restarts. Entries evicted from memory are
+    removed from disk as well, so the same bounds apply.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=64 * 2**20, directory=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = Path(directory) if directory else None
+
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key):
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()
+        return self.directory / f'{digest}.bin'
+
+    def _read_disk(self, key):
+        try:
+            return self._path(key).read_bytes()
+        except OSError:
+            return None
+
+    def _write_disk(self, key, value):
+        path = self._path(key)
+        temporary = path.with_suffix(f'.{threading.get_ident()}.tmp')
+        try:
+            temporary.write_bytes(value)
+            os.replace(temporary, path)
+        except OSError:
+            temporary.unlink(missing_ok=True)
+
+    def _insert(self, key, value):
+        # Caller holds the lock. Returns the
+        # keys evicted to make room for `value`
+        if key in self._entries:
+            self._bytes -= len(self._entries.pop(key))
+
+        self._entries[key] = value
+        self._bytes += len(value)
+
+        evicted = []
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries
+            or self._bytes > self.max_bytes
+        ):
+            old_key, old_value = self._entries.popitem(last=False)
+            self._bytes -= len(old_value)
+            self.evictions += 1
+            evicted.append(old_key)
+
+        return evicted
+
+    def _remove_disk(self, keys):
+        for key in keys:
+            self._path(key).unlink(missing_ok=True)
+
+    def get(self, key):
+        """
+        Return the cached value for `key`, or None
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        if self.directory is not None:
+            value = self._read_disk(key)
+            if value is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    evicted = self._insert(key, value)
+                self._remove_disk(evicted)
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, value):
+
+        with self._lock:
+            evicted = self._insert(key, value)
+
+        if self.directory is not None:
+            self._write_disk(key, value)
+            self._remove_disk(evicted)
+
+    def clear(self):
+
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+        if self.directory is not None:
+            for path in self.directory.glob('*.bin'):
+                path.unlink(missing_ok=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+# Rendered charts shared by every MatplotlibViz.
+# Set CHART_CACHE_DIR to keep them across restarts
+chart_cache = LRUCache(
+    max_entries=int(os.environ.get('CHART_CACHE_ENTRIES', 512)),
+    max_bytes=int(os.environ.get('CHART_CACHE_BYTES', 64 * 2**20)),
+    directory=os.environ.get('CHART_CACHE_DIR'),
+)
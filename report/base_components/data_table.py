@@ -1,28 +1,73 @@
 from .base_component import BaseComponent
-from fasthtml.common import Table, Tr, Th, Td
+from fasthtml.common import Table, Tr, Th, Td, to_xml
 
 
 class DataTable(BaseComponent):
+    '''
+    Renders the DataFrame returned by `component_data`
+    as a table, one row per DataFrame row.
 
-    def build_component(self, entity_id, model):
+    Set `limit` to show a window of at most that many rows.
+    `component_data` receives `limit` and `offset` keyword
+    arguments so it can select the window in its query. Its
+    rows need a total order, ties included, or consecutive
+    windows may skip or repeat rows.
+    '''
+
+    # Rows per page; None shows every row
+    limit = None
+
+    # Rows per chunk when streaming the table
+    chunk_size = 500
+
+    def build_component(self, entity_id, model, offset=0):
 
         if model.name:
 
-            data = self.component_data(entity_id, model)
+            data = self.component_data(
+                entity_id, model, limit=self.limit, offset=offset
+            )
+
+            # Build every row in one pass and attach them
+            # together. `itertuples` keeps each column's own
+            # type instead of coercing the rows to one array
+            return Table(
+                self.header_row(data),
+                *self.table_rows(data),
+            )
+
+    def header_row(self, data):
+        return Tr(
+            Th(column) for column in data.columns
+        )
+
+    def table_rows(self, data):
+        return [
+            Tr(Td(val) for val in data_row)
+            for data_row in data.itertuples(index=False, name=None)
+        ]
+
+    def stream(self, entity_id, model):
+        '''
+        Yield the whole table as HTML, `chunk_size` rows
+        at a time, reading one window of rows per chunk
+        so a long table is never held in memory at once
+        '''
+        offset = 0
+        yield '<table>'
 
-            table = Table(
-                Tr(
-                    Th(column) for column in data.columns
-                )
+        while True:
+            data = self.component_data(
+                entity_id, model, limit=self.chunk_size, offset=offset
             )
 
-            for data_row in data.to_numpy():
+            if offset == 0:
+                yield to_xml(self.header_row(data))
 
-                table_row = Tr(
-                    Td(val) for val in data_row
-                )
+            yield ''.join(to_xml(row) for row in self.table_rows(data))
 
-                children = (*table.children, table_row)
-                table.children = children
+            offset += len(data)
+            if len(data) < self.chunk_size:
+                break
 
-            return table
+        yield '</table>'
@@ -1,3 +1,5 @@
+from html import escape
+
 from .base_component import BaseComponent
 from fasthtml.common import Select, Label, Div, Option
 
@@ -15,7 +17,7 @@ class Dropdown(BaseComponent):
             option = Option(
                 text,
                 value=value,
-                selected="selected" if str(value) == entity_id else ""
+                selected="selected" if str(value) == str(entity_id) else ""
             )
             options.append(option)
 
@@ -33,10 +35,32 @@ class Dropdown(BaseComponent):
 
         return selector
 
-    def outer_div(self, component):
+    # The same <option> elements as one HTML string, built
+    # without an element per option, for long lists
+    def options_html(self, data, entity_id):
+        selected = str(entity_id)
+        return ''.join(
+            f'<option value="{escape(str(value))}"'
+            f'{" selected" if str(value) == selected else ""}>'
+            f'{escape(str(text))}</option>'
+            for text, value in data
+        )
+
+    # The label is worked out per call rather than
+    # stored on the instance, which every request shares
+    def __call__(self, entity_id, model):
+
+        component = self.build_component(entity_id, model)
+
+        return self.outer_div(component, self.component_label(model))
+
+    def component_label(self, model):
+        return self.label
+
+    def outer_div(self, component, label=None):
 
         return Div(
-            Label(self.label, _for=self.id),
+            Label(self.label if label is None else label, _for=self.id),
             component,
             id=self.id,
         )
@@ -1,25 +1,44 @@
 from .base_component import BaseComponent
+from .cache import chart_cache
 
-import matplotlib.pyplot
 from fasthtml.common import Img
-import matplotlib.pylab as plt
-import matplotlib
 import io
 import base64
+import functools
+import hashlib
+import threading
+from employee_events import data_version, timed
 
-# This is necessary to prevent matplotlib from causing memory leaks
-# https://stackoverflow.com/questions/31156578/matplotlib-doesnt-release-memory-after-savefig-and-close
-matplotlib.use('Agg')
-matplotlib.rcParams['savefig.transparent'] = True
-matplotlib.rcParams['savefig.format'] = 'png'
 
+# matplotlib takes longer to import than the rest of
+# the dashboard together, so it is only imported
+# when the first chart is drawn, or by a warm-up
+@functools.cache
+def load_matplotlib():
+    '''
+    Import and configure matplotlib. pyplot is
+    left to the renderer that uses it
+    '''
+    import matplotlib
 
-def matplotlib2fasthtml(func):
+    # This is necessary to prevent matplotlib from causing memory leaks
+    # https://stackoverflow.com/questions/31156578/matplotlib-doesnt-release-memory-after-savefig-and-close
+    matplotlib.use('Agg')
+    matplotlib.rcParams['savefig.transparent'] = True
+    matplotlib.rcParams['savefig.format'] = 'png'
+
+    return matplotlib
+
+
+def matplotlib2png(func):
     '''
-    Copy of https://github.com/koaning/fh-matplotlib, which is currently
-    hardcoding the image format as jpg. png or svg is needed here.
+    Run a function that draws with pyplot
+    and return the resulting figure as PNG bytes
     '''
     def wrapper(*args, **kwargs):
+        load_matplotlib()
+        import matplotlib.pyplot as plt
+
         # Reset the figure to prevent accumulation.
         # Maybe we need a setting for this?
         fig = plt.figure()
@@ -27,28 +46,197 @@ def matplotlib2fasthtml(func):
         # Run function as normal
         func(*args, **kwargs)
 
-        # Store it as base64 and put it into an image.
         my_stringIObytes = io.BytesIO()
         plt.savefig(my_stringIObytes)
-        my_stringIObytes.seek(0)
-        my_base64_jpgData = base64.b64encode(my_stringIObytes.read()).decode()
 
         # Close the figure to prevent memory leaks
         plt.close(fig)
         plt.close('all')
-        return Img(src=f'data:image/jpg;base64, {my_base64_jpgData}')
+        return my_stringIObytes.getvalue()
+    return wrapper
+
+
+def png2fasthtml(png, media_type='image/jpg'):
+    # Store it as base64 and put it into an image.
+    my_base64_jpgData = base64.b64encode(png).decode()
+    return Img(src=f'data:{media_type};base64, {my_base64_jpgData}')
+
+
+# Media types for the supported `image_format` values
+media_types = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
+
+
+def matplotlib2fasthtml(func):
+    '''
+    Copy of https://github.com/koaning/fh-matplotlib, which is currently
+    hardcoding the image format as jpg. png or svg is needed here.
+    '''
+    render = matplotlib2png(func)
+
+    def wrapper(*args, **kwargs):
+        return png2fasthtml(render(*args, **kwargs))
     return wrapper
 
 
 class MatplotlibViz(BaseComponent):
+    '''
+    Base class for charts.
+
+    By default a subclass overrides `visualization` and draws
+    with pyplot. A subclass that sets `draws_artists = True`
+    overrides `create_artists` and `update_artists` instead,
+    to use the object-oriented renderer: each thread keeps its
+    own Figure, built once by `create_artists`, and every render
+    only updates the data of the artists it returned. That
+    renderer never touches pyplot's global figure manager, so
+    charts can be drawn from several threads at once, and it
+    can produce SVG as well as PNG.
+    '''
+
+    # Draw with `create_artists` and `update_artists`
+    # instead of `visualization`
+    draws_artists = False
+
+    # Rendered charts are cached by component, model,
+    # entity and data version, so a chart is only drawn
+    # again after the underlying events change.
+    # Set to None on a subclass to disable caching
+    chart_cache = chart_cache
+
+    # Figure settings for the object-oriented renderer
+    figsize = (6.4, 4.8)
+    image_format = 'png'
+
+    # With inline=False the component emits an <img> that
+    # points at `chart_url` instead of embedding the image,
+    # and the app serves the image from its own route
+    def __init__(self, inline=True):
+        self.inline = inline
+        self._templates = threading.local()
+
+    # The name of the chart in its image url
+    @property
+    def kind(self):
+        return type(self).__name__.lower()
 
-    @matplotlib2fasthtml
     def build_component(self, entity_id, model):
+
+        if not self.inline:
+            return Img(src=self.chart_url(entity_id, model))
+
+        return png2fasthtml(
+            self.render(entity_id, model),
+            media_type=self.media_type,
+        )
+
+    @property
+    def media_type(self):
+        return media_types[self.image_format]
+
+    # The content version in the query string gives every
+    # version of a chart its own url, so browsers can
+    # cache the image for as long as the url is current
+    def chart_url(self, entity_id, model):
+        return (
+            f'/chart/{self.kind}/{model.name}/{entity_id}.{self.image_format}'
+            f'?v={self.content_version(entity_id, model)}'
+        )
+
+    # A hash of the cache key: it changes with anything
+    # a subclass adds to the key, such as the model file,
+    # and can be checked without rendering
+    def content_version(self, entity_id, model):
+        key = repr(self.cache_key(entity_id, model)).encode()
+        return hashlib.sha256(key).hexdigest()[:32]
+
+    # A strong ETag for the chart, the content version
+    def etag(self, entity_id, model):
+        return f'"{self.content_version(entity_id, model)}"'
+
+    def cache_key(self, entity_id, model):
+        return (
+            type(self).__name__,
+            model.name,
+            str(entity_id),
+            self.image_format,
+            data_version(),
+        )
+
+    def render(self, entity_id, model):
+
+        if self.chart_cache is None:
+            return self.render_image(entity_id, model)
+
+        key = self.cache_key(entity_id, model)
+        image = self.chart_cache.get(key)
+
+        if image is None:
+            image = self.render_image(entity_id, model)
+            self.chart_cache.set(key, image)
+
+        return image
+
+    # Draw the chart with whichever renderer
+    # the subclass implements
+    @timed('chart')
+    def render_image(self, entity_id, model):
+
+        if not self.draws_artists:
+            return self.render_png(entity_id, model)
+
+        fig, ax, artists = self.figure_template()
+        self.update_artists(ax, artists, entity_id, model)
+
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=self.image_format)
+        return buffer.getvalue()
+
+    # Return this thread's (figure, axis, artists),
+    # building them the first time
+    def figure_template(self):
+
+        templates = self._templates
+
+        if not hasattr(templates, 'figure'):
+            load_matplotlib()
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+            fig = Figure(figsize=self.figsize)
+            FigureCanvasAgg(fig)
+            ax = fig.add_subplot()
+            templates.figure = (fig, ax, self.create_artists(ax))
+
+        return templates.figure
+
+    @matplotlib2png
+    def render_png(self, entity_id, model):
         return self.visualization(entity_id, model)
 
     def visualization(self, entity_id, model):
         pass
 
+    # Draw the parts of the chart that never change and
+    # return the artists `update_artists` will update.
+    # Both are required when `draws_artists` is set,
+    # and never called otherwise
+    def create_artists(self, ax):
+        raise NotImplementedError(
+            f'{type(self).__name__} sets draws_artists '
+            'but does not implement create_artists'
+        )
+
+    # Set the entity's data on the artists. `ax` still
+    # shows the previous chart drawn by this thread
+    def update_artists(self, ax, artists, entity_id, model):
+        raise NotImplementedError(
+            f'{type(self).__name__} sets draws_artists '
+            'but does not implement update_artists'
+        )
+
     def set_axis_styling(self, ax, bordercolor='white', fontcolor='white'):
 
         ax.title.set_color(fontcolor)
@@ -4,6 +4,10 @@ from fasthtml.common import Input, Label, Div
 
 class Radio(BaseComponent):
 
+    # The buttons only depend on which model is
+    # checked, so they are rendered once per model
+    static = True
+
     def __init__(self, values, name, hx_get="", hx_target="", selected=""):
         self.values = values
         self.name = name
@@ -1,2 +1,5 @@
-from .combined_component import CombinedComponent  # noqa: F401
+from .combined_component import (  # noqa: F401
+    CombinedComponent,
+    placeholder_scope,
+)
 from .form_group import FormGroup  # noqa: F401
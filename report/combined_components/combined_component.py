@@ -1,38 +1,213 @@
+import contextvars
+import os
+import threading
+import time
+from concurrent import futures
+from contextlib import contextmanager
+
 from fastcore.xml import FT
-from fasthtml.common import Div
+from fasthtml.common import Div, NotStr, to_xml
+
+
+# The thread pool shared by every CombinedComponent that
+# renders its children concurrently. It is created on
+# first use; set RENDER_WORKERS to change its size
+_executor = None
+_executor_lock = threading.Lock()
+
+# Marks the pool's threads while they render a child.
+# A component rendered there calls its own children in
+# place, so a parent never waits on a pool its own
+# children may need to run
+_rendering = threading.local()
+
+
+def render_executor():
+
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = futures.ThreadPoolExecutor(
+                    max_workers=int(os.environ.get('RENDER_WORKERS', 8)),
+                    thread_name_prefix='render',
+                )
+
+    return _executor
+
+
+# The children replaced by a placeholder while a
+# `placeholder_scope()` is active, e.g. for one page
+_placeholders = contextvars.ContextVar('placeholders', default=None)
+
+
+@contextmanager
+def placeholder_scope():
+    """
+    Yield a list of the children that timed out and were
+    replaced by a placeholder inside the block. A page
+    with any of them is incomplete and must not be cached
+    """
+    replaced = []
+    token = _placeholders.set(replaced)
+    try:
+        yield replaced
+    finally:
+        _placeholders.reset(token)
+
+
+# Stands in for the children while a shell is rendered
+_CHILDREN = '<!--children-->'
+
+
+def _render_child(context, started, call, *args):
+    # Run `call` in the caller's context, so context
+    # variables set for the request are seen by the child.
+    # `started` receives the time the child began running
+    started.set_result(time.monotonic())
+    _rendering.active = True
+    try:
+        return context.run(call, *args)
+    finally:
+        _rendering.active = False
 
 
 class CombinedComponent:
 
     outer_div_type = Div(cls='container')
 
+    # Render the children on the shared thread pool at the
+    # same time instead of one after another. The page then
+    # takes about as long as its slowest child
+    concurrent = False
+
+    # Seconds a child may run when rendering concurrently,
+    # counted from when it starts rather than from when it
+    # was queued, so a busy pool does not time pages out.
+    # A child still running after that is replaced by its
+    # `placeholder`. None waits for all
+    child_timeout = None
+
+    # Set to True when `outer_div` and `div_args` depend
+    # only on `static_key`. The wrapper around the children
+    # is then rendered to HTML once per key, and each call
+    # only renders the children into it
+    static_shell = False
+
     def __call__(self, userid, model):
 
         called_children = self.call_children(userid, model)
+
+        if self.static_shell:
+            prefix, suffix = self.shell(userid, model)
+            return NotStr(
+                prefix
+                + ''.join(to_xml(child) for child in called_children)
+                + suffix
+            )
+
         div_args = self.div_args(userid, model)
 
         return self.outer_div(called_children, div_args)
 
+    def static_key(self, userid, model):
+        return model.name
+
+    # Return the HTML before and after the children
+    # for this call's static key, rendering it once
+    def shell(self, userid, model):
+
+        shells = self.__dict__.setdefault('_shells', {})
+        key = self.static_key(userid, model)
+
+        shell = shells.get(key)
+        if shell is None:
+            wrapper = self.outer_div(
+                [NotStr(_CHILDREN)], self.div_args(userid, model)
+            )
+            shell = tuple(to_xml(wrapper).split(_CHILDREN))
+            shells[key] = shell
+
+        return shell
+
     def call_children(self, userid, model):
 
+        if self.concurrent and not getattr(_rendering, 'active', False):
+            return self.call_children_concurrently(userid, model)
+
         called = []
         for child in self.children:
-            if isinstance(child, FT):
-                called.append(child())
+            called.append(self.call_child(child, userid, model))
+
+        return called
+
+    def call_child(self, child, userid, model):
+
+        if isinstance(child, FT):
+            return child()
+
+        return child(userid, model)
 
-            else:
-                called.append(child(userid, model))
+    def call_children_concurrently(self, userid, model):
+
+        executor = render_executor()
+        submitted = []
+        for child in self.children:
+            started = futures.Future()
+            future = executor.submit(
+                _render_child,
+                contextvars.copy_context(), started,
+                self.call_child, child, userid, model,
+            )
+            submitted.append((future, started))
+
+        # Collect the results in the order of `children`.
+        # Each child's deadline counts from its own start:
+        # time spent queued behind other pages' children
+        # is not held against it
+        called = []
+        for child, (future, started) in zip(self.children, submitted):
+
+            remaining = None
+            if self.child_timeout is not None:
+                deadline = started.result() + self.child_timeout
+                remaining = max(0, deadline - time.monotonic())
+
+            try:
+                called.append(future.result(timeout=remaining))
+            except futures.TimeoutError:
+                # The child finishes in the background
+                called.append(self.placeholder(child, userid, model))
+
+                replaced = _placeholders.get()
+                if replaced is not None:
+                    replaced.append(child)
 
         return called
 
+    # Shown in place of a child that did not
+    # finish rendering within `child_timeout`
+    def placeholder(self, child, userid, model):
+        return Div(
+            'This section is taking longer than expected to load.',
+            cls='placeholder',
+        )
+
     def div_args(self, userid, model):
         return {}
 
+    # `outer_div_type` is a template shared by every call:
+    # calling an FT adds to it in place, so each call
+    # wraps its children in a fresh copy instead
     def outer_div(self, children, div_args):
 
-        self.outer_div_type.children = ()
+        template = self.outer_div_type
+        outer = FT(
+            template.tag, (), dict(template.attrs), void_=template.void_
+        )
 
-        return self.outer_div_type(
+        return outer(
             *children,
             **div_args
         )
@@ -1,12 +1,19 @@
 from fasthtml.common import *  # type: ignore # noqa: F401, F403, E261
-import matplotlib.pyplot as plt
+import hashlib
+import os
+from pathlib import Path
+from urllib.parse import urlencode
 import numpy as np
+import pandas as pd
 
 # Import QueryBase, Employee, Team from employee_events
-from employee_events import QueryBase, Employee, Team
+from employee_events import QueryBase, Employee, Team, data_version
+from employee_events import ScoreTable, database_tables
+from employee_events import configure_memo, request_scope
+from employee_events import name_directory, timed
 
 # import the load_model function from the utils.py file
-from utils import load_model  # type: ignore
+from utils import lazy_attribute, load_model, model_path  # type: ignore
 
 """
 Below, we import the parent classes
@@ -17,16 +24,27 @@ from base_components import (
     BaseComponent,
     Radio,
     MatplotlibViz,
-    DataTable
+    DataTable,
+    LRUCache,
     )
 
 from combined_components import FormGroup, CombinedComponent
+from combined_components import placeholder_scope
 
 
 # Create a subclass of base_components/dropdown
 # called `ReportDropdown`
 class ReportDropdown(Dropdown):
 
+    # Above this many names the dropdown lists only the
+    # selected one, and a type-ahead search box fills it
+    # from the `/names` route
+    max_options = 500
+
+    # Rendered <option> lists, by model,
+    # selected id and name directory version
+    option_cache = LRUCache(max_entries=64, max_bytes=8 * 2**20)
+
     # Overwrite the build_component method
     # ensuring it has the same parameters
     # as the Report parent class's method
@@ -36,13 +54,51 @@ class ReportDropdown(Dropdown):
         model: QueryBase,
         **kwargs
     ):
-        #  Set the `label` attribute so it is set
-        #  to the `name` attribute for the model
-        self.label = model.name
+        directory = name_directory(model)
+
+        if len(directory) > self.max_options:
+            return self.type_ahead(entity_id, model, directory)
+
+        key = (model.name, str(entity_id), directory.version)
+        options = self.option_cache.get(key)
+
+        if options is None:
+            options = self.options_html(
+                self.component_data(entity_id, model), entity_id
+            ).encode()
+            self.option_cache.set(key, options)
+
+        return Select(NotStr(options.decode()), name=self.name)  # noqa: F405
+
+    # Label the dropdown with the `name` attribute
+    # for the model. It is returned rather than set on
+    # `self.label`, as one instance serves every request
+    def component_label(self, model):
+        return model.name
+
+    # A search box and a list holding only
+    # the selected entity, if there is one
+    def type_ahead(self, entity_id, model, directory):
 
-        # Return the output from the
-        # parent class's build_component method
-        return super().build_component(entity_id, model, **kwargs)
+        selected = [
+            (name, id) for name, id in directory.entries()
+            if str(id) == str(entity_id)
+        ]
+
+        return Div(  # noqa: F405
+            Input(  # noqa: F405
+                type='search',
+                name='q',
+                placeholder=f'Search {model.name}s',
+                hx_get=f'/names/{model.name}',
+                hx_trigger='input changed delay:200ms',
+                hx_target=f'#{self.id} select',
+            ),
+            Select(  # noqa: F405
+                NotStr(self.options_html(selected, entity_id)),  # noqa: F405
+                name=self.name,
+            ),
+        )
 
     # Overwrite the `component_data` method
     # Ensure the method uses the same parameters
@@ -56,8 +112,10 @@ class ReportDropdown(Dropdown):
         # Using the model argument
         # call the employee_events method
         # that returns the user-type's
-        # names and ids
-        data = model.names()
+        # names and ids.
+        # The name directory keeps them in memory
+        # until the database changes
+        data = name_directory(model).entries()
 
         # Return a list of tuples
         # containing the name and id
@@ -68,6 +126,10 @@ class ReportDropdown(Dropdown):
 # called `Header`
 class Header(BaseComponent):
 
+    # The header only shows the model's name,
+    # so it is rendered once per model
+    static = True
+
     # Overwrite the `build_component` method
     # Ensure the method has the same parameters
     # as the parent class
@@ -88,50 +150,24 @@ class Header(BaseComponent):
 # called `LineChart`
 class LineChart(MatplotlibViz):
 
-    # Overwrite the parent class's `visualization`
-    # method. Use the same parameters as the parent
-    def visualization(self, entity_id: int, model: QueryBase, **kwargs):
-
-        # Pass the `asset_id` argument to
-        # the model's `event_counts` method to
-        # receive the x (Day) and y (event count)
-        event_counts = model.event_counts(entity_id)
-
-        # Use the pandas .fillna method to fill nulls with 0
-        event_counts = event_counts.fillna(0)
-
-        # User the pandas .set_index method to set
-        # the date column as the index
-        event_counts = event_counts.set_index('event_date')
-
-        # Sort the index
-        event_counts = event_counts.sort_index()
-
-        # Use the .cumsum method to change the data
-        # in the dataframe to cumulative counts
-        cumulative_counts = event_counts.cumsum()
-
-        # Set the dataframe columns to the list
-        # ['Positive', 'Negative']
-        cumulative_counts = cumulative_counts.rename(
-            columns={
-                'positive_events': 'Positive',
-                'negative_events': 'Negative'
-            }
-        )
+    # Set the figure size to 10 by 5 inches
+    figsize = (10, 5)
 
-        # Initialize a matplotlib figure and axis
-        # using the `plt.subplots` method
-        # Set the figure size to 10 by 5 inches
+    # Draw with the object-oriented renderer
+    draws_artists = True
 
-        # Initialize a pandas subplot
-        # and assign the figure and axis
-        # to variables
-        fig, ax = plt.subplots(figsize=(10, 5))
+    # Overwrite the parent class's `create_artists`
+    # method. It runs once per thread and draws
+    # everything except the data
+    def create_artists(self, ax):
 
-        # call the .plot method for the
-        # cumulative counts dataframe
-        cumulative_counts.plot(ax=ax, kind='line')
+        # The x axis holds dates
+        ax.xaxis_date()
+
+        # Create one empty line per event type
+        positive, = ax.plot([], [], label='Positive')
+        negative, = ax.plot([], [], label='Negative')
+        ax.legend()
 
         # pass the axis variable
         # to the `.set_axis_styling`
@@ -147,61 +183,129 @@ class LineChart(MatplotlibViz):
         ax.set_xlabel('Date')
         ax.set_ylabel('Cumulative Count')
 
+        return positive, negative
+
+    # Overwrite the parent class's `update_artists`
+    # method. Use the same parameters as the parent
+    def update_artists(self, ax, artists, entity_id: int, model: QueryBase):
+
+        # Pass the `entity_id` argument to the model's
+        # `cumulative_event_counts` method to receive
+        # the dates (x) and running event totals (y).
+        # The totals are computed in SQL and come back
+        # as NumPy arrays already sorted by date
+        from matplotlib import dates as mdates
+
+        counts = model.cumulative_event_counts(entity_id)
+        dates = mdates.date2num(counts.event_date)
+
+        # Replace the data of each line and
+        # rescale the axes to fit it
+        positive, negative = artists
+        positive.set_data(dates, counts.positive_events)
+        negative.set_data(dates, counts.negative_events)
+
+        # `relim` skips empty lines, which would leave the
+        # limits of this thread's previous chart in place.
+        # Without data, go back to matplotlib's defaults
+        if len(dates):
+            ax.relim()
+            ax.autoscale_view()
+        else:
+            ax.set_xlim(0, 1)
+            ax.set_ylim(0, 1)
+
 
 # Create a subclass of base_components/MatplotlibViz
 # called `BarChart`
 class BarChart(MatplotlibViz):
 
+    figsize = (5, 2)
+    draws_artists = True
+
     # Create a `predictor` class attribute
     # assign the attribute to the output
-    # of the `load_model` utils function
-    predictor = load_model()
+    # of the `load_model` utils function.
+    # The model is loaded on first use, not on import
+    predictor = lazy_attribute(lambda cls: load_model())
+
+    # The `predict_proba` column this chart shows
+    risk_column = 0
+
+    # Scores for every employee and team, computed in
+    # one batch and recomputed when the data changes,
+    # so a render is a dictionary lookup
+    scores = lazy_attribute(
+        lambda cls: ScoreTable(cls.predictor, column=cls.risk_column)
+    )
+
+    # The prediction depends on the model file as well
+    # as the data, so a retrained model must not be
+    # served charts cached for the previous one
+    def cache_key(self, entity_id, model):
+        return (
+            *super().cache_key(entity_id, model),
+            model_path.stat().st_mtime_ns,
+        )
+
+    # Overwrite the parent class `create_artists` method
+    def create_artists(self, ax):
+
+        # A single bar, its width is set per entity
+        bars = ax.barh([''], [0])
+        ax.set_xlim(0, 1)
+        ax.set_title('Predicted Recruitment Risk', fontsize=20)
+
+        # pass the axis variable
+        # to the `.set_axis_styling`
+        # method
+        self.set_axis_styling(ax)
+
+        return bars
 
-    # Overwrite the parent class `visualization` method
+    # Overwrite the parent class `update_artists` method
     # Use the same parameters as the parent
-    def visualization(self, entity_id: int, model: QueryBase, **kwargs):
+    def update_artists(self, ax, artists, entity_id: int, model: QueryBase):
+
+        # Look up the entity's score in the batch
+        # computed for every employee and team
+        pred = self.scores.current().score(model.name, entity_id)
+
+        # Entities without events are not in the batch,
+        # score them on their own as a fallback
+        if pred is None:
+            pred = self.predict(entity_id, model)
 
-        # Using the model and asset_id arguments
-        # pass the `asset_id` to the `.model_data` method
+        # Set the bar to the prediction
+        artists[0].set_width(pred)
+
+    @timed('model')
+    def predict(self, entity_id: int, model: QueryBase):
+
+        # Using the model and entity_id arguments
+        # pass the `entity_id` to the `.model_data` method
         # to receive the data that can be passed to the machine
         # learning model
         data = model.model_data(entity_id)
 
+        # An employee without events gets one row of NULL
+        # sums and a team without events gets no rows.
+        # There is nothing to score, so show no risk
+        # rather than handing NaN to the predictor
+        data = data.dropna()
+        if data.empty:
+            return 0.0
+
         # Using the predictor class attribute
         # pass the data to the `predict_proba` method
         # to receive the model's prediction
         predict_proba = self.predictor.predict_proba(data)
 
-        # Index the second column of predict_proba output
-        # The shape should be (<number of records>, 1)
-
-        # Below, create a `pred` variable set to
-        # the number we want to visualize
-        #
-        # If the model's name attribute is "team"
-        # We want to visualize the mean of the predict_proba output
-
-        # Otherwise set `pred` to the first value
-        # of the predict_proba output
-
         # We'll take the column wise mean of the predictions
         # to get the average prediction for the team
         # or employee. If Employee, there is only 1 row and mean of a
         # single number is the number itself.
-        pred = np.mean(predict_proba, axis=0)[0]
-
-        # Initialize a matplotlib subplot
-        fig, ax = plt.subplots(figsize=(5, 2))
-
-        # Run the following code unchanged
-        ax.barh([''], [pred])
-        ax.set_xlim(0, 1)
-        ax.set_title('Predicted Recruitment Risk', fontsize=20)
-
-        # pass the axis variable
-        # to the `.set_axis_styling`
-        # method
-        self.set_axis_styling(ax)
+        return np.mean(predict_proba, axis=0)[self.risk_column]
 
 
 # Create a subclass of combined_components/CombinedComponent
@@ -212,9 +316,12 @@ class Visualizations(CombinedComponent):
     # class attribute to a list
     # containing an initialized
     # instance of `LineChart` and `BarChart`
+    # The charts are served from the `/chart` route
+    # rather than inlined, so the page is sent before
+    # they are drawn and the browser loads them in parallel
     children = [
-        LineChart(),
-        BarChart()
+        LineChart(inline=False),
+        BarChart(inline=False)
     ]
 
     # Leave this line unchanged
@@ -225,6 +332,10 @@ class Visualizations(CombinedComponent):
 # called `NotesTable`
 class NotesTable(DataTable):
 
+    # Notes per page, and the columns shown
+    limit = 20
+    columns = ['note_date', 'note']
+
     # Overwrite the `component_data` method
     # using the same parameters as the parent class
     def component_data(  # type: ignore
@@ -235,8 +346,113 @@ class NotesTable(DataTable):
 
         # Using the model and entity_id arguments
         # pass the entity_id to the model's .notes
-        # method. Return the output
-        return model.notes(entity_id)
+        # method. Return the output.
+        # The window of rows is selected in SQL
+        return model.notes(
+            entity_id,
+            limit=kwargs.get('limit'),
+            offset=kwargs.get('offset', 0),
+        )
+
+    # The report shows one page of notes, with a search box
+    # and a button that appends the next page. Both fetch
+    # rows from the `/notes/.../rows` route with HTMX
+    def build_component(self, entity_id, model):
+
+        url = f'/notes/{model.name}/{entity_id}/rows'
+        page = model.paged_notes(entity_id, limit=self.limit)
+
+        return Div(  # noqa: F405
+            Input(  # noqa: F405
+                type='search',
+                name='q',
+                placeholder='Search notes',
+                hx_get=url,
+                hx_trigger='input changed delay:300ms, search',
+                hx_target='#notes-rows',
+            ),
+            Table(  # noqa: F405
+                Thead(self.header_row(page.notes[self.columns])),  # noqa: F405
+                Tbody(  # noqa: F405
+                    *self.page_rows(page, url),
+                    id='notes-rows',
+                ),
+            ),
+        )
+
+    # The rows of a page of notes, followed by a row
+    # holding the button that loads the next page
+    def page_rows(self, page, url, text=''):
+
+        rows = self.table_rows(page.notes[self.columns])
+
+        if page.after is not None:
+            after_date, after_id = page.after
+            query = urlencode(
+                {'q': text, 'after_date': after_date, 'after_id': after_id}
+            )
+            rows.append(Tr(Td(  # noqa: F405
+                Button(  # noqa: F405
+                    'Load more',
+                    hx_get=f'{url}?{query}',
+                    hx_target='closest tr',
+                    hx_swap='outerHTML',
+                ),
+                colspan=len(self.columns),
+            )))
+
+        return rows
+
+    # The rows for one request of the search box or
+    # the load more button: the first page matching `text`,
+    # or the page after `after` when one is given.
+    # The query is awaited, so it does not block the server
+    async def rows(self, entity_id, model, text='', after=None):
+
+        url = f'/notes/{model.name}/{entity_id}/rows'
+
+        if text.strip():
+            page = await model.asearch_notes(
+                entity_id, text, limit=self.limit, after=after
+            )
+        else:
+            page = await model.apaged_notes(
+                entity_id, limit=self.limit, after=after
+            )
+
+        return self.page_rows(page, url, text)
+
+
+# A table of every employee or team,
+# ranked by predicted recruitment risk
+class RiskLeaderboard(DataTable):
+
+    def component_data(  # type: ignore
+            self,
+            entity_id: int,
+            model: QueryBase,
+            **kwargs):
+
+        names = {id: name for name, id in model.names()}
+        ranking = BarChart.scores.current().ranking(model.name)
+
+        offset = kwargs.get('offset', 0)
+        limit = kwargs.get('limit')
+        stop = None if limit is None else offset + limit
+        ranking = ranking[offset:stop]
+
+        return pd.DataFrame(
+            [(names.get(id, id), round(score, 3)) for id, score in ranking],
+            columns=[model.name.title(), 'Predicted Recruitment Risk'],
+        )
+
+
+class Leaderboard(CombinedComponent):
+
+    children = [
+        Header(),
+        RiskLeaderboard()
+    ]
 
 
 class DashboardFilters(FormGroup):
@@ -245,6 +461,10 @@ class DashboardFilters(FormGroup):
     action = "/update_data"
     method = "POST"
 
+    # The form around the filters never changes,
+    # only the dropdown inside it does
+    static_shell = True
+
     children = [
         Radio(
             values=["Employee", "Team"],
@@ -274,24 +494,151 @@ class Report(CombinedComponent):
         NotesTable()
     ]
 
+    # The children query the database independently,
+    # so render them at the same time
+    concurrent = True
+    child_timeout = 10
+
+    # The container around the children is the same
+    # for every page, render it to HTML once
+    static_shell = True
+
+
+# Importing the dashboard loads no model, no matplotlib
+# and no database schema; each loads on first use.
+# `warm_up` loads them all ahead of the first request
+def warm_up():
+
+    # The database schema and data version
+    database_tables()
+    data_version()
 
-# Initialize a fasthtml app
-app = FastHTML()  # noqa: F405
+    # The model, and its scores for every employee and team
+    BarChart.scores.current()
+
+    # matplotlib, and this thread's figure for each chart
+    for chart in Visualizations.children:
+        chart.figure_template()
+
+
+# Run every request in its own query memoization scope,
+# so each query a page repeats runs once per request
+class QueryScope:
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        with request_scope():
+            await self.app(scope, receive, send)
+
+
+# Results are also shared between requests for
+# QUERY_CACHE_TTL seconds, e.g. across the redirect
+# of `update_data`. Their keys include the data
+# version, which every committed write changes,
+# so a write is seen at once regardless. The memo is
+# process-wide, so this runs when the server starts
+# rather than whenever the dashboard is imported.
+# Returns the previous memo settings
+def configure_query_cache():
+    return configure_memo(ttl=float(os.environ.get('QUERY_CACHE_TTL', 30)))
+
+
+# Initialize a fasthtml app. Set DASHBOARD_WARM_UP=1
+# to warm up when the server starts instead of
+# during the first requests
+startup = [configure_query_cache]
+if os.environ.get('DASHBOARD_WARM_UP'):
+    startup.append(warm_up)
+
+app = FastHTML(  # noqa: F405
+    on_startup=startup,
+    middleware=[Middleware(QueryScope)],  # noqa: F405
+)
 
 # Initialize the `Report` class
 report = Report()
+leaderboard = Leaderboard()
+
+
+# Rendered report pages by model, id and data version,
+# so a repeated view is a lookup until the data changes.
+# Set PAGE_CACHE_ENTRIES and PAGE_CACHE_BYTES to bound it
+page_cache = LRUCache(
+    max_entries=int(os.environ.get('PAGE_CACHE_ENTRIES', 1024)),
+    max_bytes=int(os.environ.get('PAGE_CACHE_BYTES', 32 * 2**20)),
+)
+
+# Changes whenever this file does, so pages cached by
+# browsers are not reused after a deploy changes them
+page_revision = Path(__file__).stat().st_mtime_ns
+
+
+# Return the report for `model` and `id` from the page
+# cache, with an ETag so browsers can revalidate it,
+# or a 304 if the browser already has this version
+def cached_report(r, id, model):
+
+    key = ('report', model.name, id, data_version(), page_revision)
+
+    # fasthtml sends htmx requests the report alone and
+    # other requests a whole page around it: the two are
+    # different responses and need different ETags
+    variant = 'fragment' if r.headers.get('hx-request') else 'page'
+    digest = hashlib.sha256(repr((*key, variant)).encode()).hexdigest()[:32]
+    etag = f'"{digest}"'
+
+    headers = {
+        'ETag': etag,
+        'Cache-Control': 'no-cache',
+        'Vary': 'HX-Request',
+    }
+
+    if etag in r.headers.get('if-none-match', '').replace(' ', '').split(','):
+        return Response(status_code=304, headers=headers)  # noqa: F405
+
+    body = page_cache.get(key)
+    if body is None:
+        with placeholder_scope() as replaced, timed('render'):
+            page = report(id, model)
+        with timed('serialization'):
+            body = to_xml(page).encode()  # noqa: F405
+
+        # A child that timed out left a placeholder. Serve
+        # this page once, but neither keep it nor let the
+        # browser revalidate it, so the next request
+        # renders the page again
+        if replaced:
+            headers = {'Cache-Control': 'no-store', 'Vary': 'HX-Request'}
+        else:
+            page_cache.set(key, body)
+
+    # fasthtml still wraps the body in the page's head,
+    # scripts and styles, which only costs a string join
+    return (
+        NotStr(body.decode()),  # noqa: F405
+        *(
+            HttpHeader(name, value)  # noqa: F405
+            for name, value in headers.items()
+        ),
+    )
 
 
 # Create a route for a get request
 # Set the route's path to the root
 @app.get('/')  # type: ignore
-def index():
+def index(r):
 
     # Call the initialized report
     # pass the integer 1 and an instance
     # of the Employee class as arguments
     # Return the result
-    return report(1, Employee())
+    return cached_report(r, 1, Employee())
 
 
 # Create a route for a get request
@@ -308,7 +655,7 @@ def employee(r, id: int):
     # pass the ID and an instance
     # of the Employee SQL class as arguments
     # Return the result
-    return report(id, Employee())
+    return cached_report(r, id, Employee())
 
 
 # Create a route for a get request
@@ -325,7 +672,123 @@ def team(r, id: int):
     # pass the id and an instance
     # of the Team SQL class as arguments
     # Return the result
-    return report(id, Team())
+    return cached_report(r, id, Team())
+
+
+# Rank every employee or team by risk,
+# e.g. /leaderboard/team
+@app.get('/leaderboard/{model_name}')  # type: ignore
+def risk_leaderboard(r, model_name: str):
+
+    if model_name == 'employee':
+        return leaderboard(None, Employee())
+    elif model_name == 'team':
+        return leaderboard(None, Team())
+
+    return Response(status_code=404)  # noqa: F405
+
+
+# The charts in `Visualizations`, by the
+# name used for them in image urls
+charts = {chart.kind: chart for chart in Visualizations.children}
+models = {'employee': Employee, 'team': Team}
+
+
+# Serve a chart's image for the urls emitted by
+# `MatplotlibViz.chart_url`, e.g. /chart/linechart/team/2.png
+@app.get('/chart/{kind}/{model_name}/{id:int}.{ext}')  # type: ignore
+def chart(r, kind: str, model_name: str, id: int, ext: str):
+
+    if kind not in charts or model_name not in models:
+        return Response(status_code=404)  # noqa: F405
+
+    component = charts[kind]
+    if ext != component.image_format:
+        return Response(status_code=404)  # noqa: F405
+
+    model = models[model_name]()
+    version = component.content_version(id, model)
+    etag = f'"{version}"'
+
+    # A url carrying the chart's current content version
+    # never changes content; any other must be revalidated
+    if r.query_params.get('v') == version:
+        cache_control = 'public, max-age=86400, immutable'
+    else:
+        cache_control = 'no-cache'
+    headers = {'ETag': etag, 'Cache-Control': cache_control}
+
+    if etag in r.headers.get('if-none-match', '').replace(' ', '').split(','):
+        return Response(status_code=304, headers=headers)  # noqa: F405
+
+    return Response(  # noqa: F405
+        component.render(id, model),
+        media_type=component.media_type,
+        headers=headers,
+    )
+
+
+# Stream every note of an employee or team as one
+# HTML table, e.g. /notes/team/2. Rows are read and
+# sent in chunks, so long histories start arriving
+# at once and are never held in memory whole
+@app.get('/notes/{model_name}/{id:int}')  # type: ignore
+def all_notes(r, model_name: str, id: int):
+
+    if model_name not in models:
+        return Response(status_code=404)  # noqa: F405
+
+    notes_table = Report.children[-1]
+    return StreamingResponse(  # noqa: F405
+        notes_table.stream(id, models[model_name]()),
+        media_type='text/html',
+    )
+
+
+# Rows of the notes table for its HTMX controls:
+# the first page matching the search box text `q`,
+# or the page after the key `after_date`, `after_id`
+@app.get('/notes/{model_name}/{id:int}/rows')  # type: ignore
+async def notes_rows(r, model_name: str, id: int):
+
+    if model_name not in models:
+        return Response(status_code=404)  # noqa: F405
+
+    params = r.query_params
+    after = None
+    if params.get('after_date') is not None:
+        try:
+            after = (params['after_date'], int(params.get('after_id', 0)))
+        except ValueError:
+            return Response(status_code=400)  # noqa: F405
+
+    notes_table = Report.children[-1]
+    rows = await notes_table.rows(
+        id, models[model_name](), text=params.get('q', ''), after=after
+    )
+
+    with timed('serialization'):
+        html = ''.join(to_xml(row) for row in rows)  # noqa: F405
+
+    return Response(html, media_type='text/html')  # noqa: F405
+
+
+# Type-ahead for the dropdown: the <option>s of the
+# names with a word starting with `q`, e.g. /names/team?q=sh
+@app.get('/names/{model_name}')  # type: ignore
+def name_options(r, model_name: str):
+
+    if model_name not in models:
+        return Response(status_code=404)  # noqa: F405
+
+    directory = name_directory(models[model_name]())
+    matches = directory.search(r.query_params.get('q', ''), limit=20)
+    dropdown = DashboardFilters.children[1]
+
+    return Response(  # noqa: F405
+        dropdown.options_html(matches, None),
+        media_type='text/html',
+    )
 
 
 # Keep the below code unchanged!
@@ -0,0 +1,365 @@
+"""
+Load test the dashboard in-process.
+
+Requests go straight to the ASGI app through httpx's ASGI
+transport, so no server, port or network is involved. A
+fixed number of requests is replayed from a seeded mix of
+routes and ids, --concurrency at a time, and the throughput
+and latency percentiles of each route are printed with a
+histogram, along with where the time went: database queries,
+the model, chart drawing, building page components, HTML
+serialization, and the rest (routing and the framework).
+
+    python load_test.py --requests 2000 --concurrency 8
+    python load_test.py --database big.db --cold --json result.json
+
+Popular ids are requested more often than others, so the
+page, chart and query caches see a realistic hit rate.
+--cold instead empties the page, chart and dropdown option
+caches, the name directories and the model scores before
+every request, and turns the process-wide query memo off.
+Queries a request repeats still run once per request, and
+the static markup compiled once per model stays compiled.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import sys
+import time
+
+import httpx
+import numpy as np
+
+from employee_events import Employee, Team, configure_memo, configure_pool
+from employee_events import name_directory, timing_scope
+
+import dashboard
+
+# Relative frequency of each route. Every page view
+# also loads its two chart images
+MIX = {
+    'employee': 35,
+    'team': 15,
+    'chart': 30,
+    'update_dropdown': 10,
+    'update_data': 10,
+}
+
+# Where request time is spent, see employee_events.timing.
+# 'render' is building a page's components, less the
+# queries and the model calls made while building them
+CATEGORIES = ('query', 'model', 'chart', 'render', 'serialization')
+
+# Upper bounds of the latency histogram, in milliseconds
+BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+def popular_ids(model, rng, skew):
+    """
+    Return the ids of `model` in a random order
+    with Zipf-like weights: the first is requested
+    most often, the next half as often, and so on
+    """
+    ids = [id for _, id in model.names()]
+    rng.shuffle(ids)
+    weights = 1 / np.arange(1, len(ids) + 1) ** skew
+    return ids, weights / weights.sum()
+
+
+def plan_requests(count, mix, rng, skew=1.0):
+    """
+    Return `count` (route, method, url, form)
+    requests drawn from `mix`
+    """
+    routes = list(mix)
+    shares = np.array([mix[route] for route in routes], dtype=float)
+    shares /= shares.sum()
+
+    population = {
+        'Employee': popular_ids(Employee(), rng, skew),
+        'Team': popular_ids(Team(), rng, skew),
+    }
+
+    def pick(profile):
+        ids, weights = population[profile]
+        return int(rng.choice(ids, p=weights))
+
+    planned = []
+    for route in rng.choice(routes, size=count, p=shares):
+        profile = 'Employee' if rng.random() < .7 else 'Team'
+
+        if route == 'employee':
+            planned.append(
+                (route, 'GET', f'/employee/{pick("Employee")}', None)
+            )
+        elif route == 'team':
+            planned.append((route, 'GET', f'/team/{pick("Team")}', None))
+        elif route == 'chart':
+            chart = dashboard.charts[rng.choice(list(dashboard.charts))]
+            model = dashboard.models[profile.lower()]()
+            url = chart.chart_url(pick(profile), model)
+            planned.append((route, 'GET', url, None))
+        elif route == 'update_dropdown':
+            url = f'/update_dropdown?profile_type={profile}'
+            planned.append((route, 'GET', url, None))
+        elif route == 'update_data':
+            form = {'profile_type': profile, 'user-selection': pick(profile)}
+            planned.append((route, 'POST', '/update_data', form))
+
+    return planned
+
+
+# Everything the dashboard keeps between requests
+# that is derived from the database
+def clear_caches():
+    dashboard.page_cache.clear()
+    dashboard.MatplotlibViz.chart_cache.clear()
+    dashboard.ReportDropdown.option_cache.clear()
+    dashboard.BarChart.scores.clear()
+    for model in (Employee(), Team()):
+        name_directory(model).clear()
+
+
+async def replay(planned, concurrency, cold=False):
+    """
+    Send the planned requests, `concurrency` at a time.
+    Return the wall time and one (route, status, seconds,
+    {category: seconds}) sample per request
+    """
+    samples = []
+    pending = iter(planned)
+    transport = httpx.ASGITransport(app=dashboard.app)
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url='http://dashboard'
+    ) as client:
+
+        async def worker():
+            for route, method, url, form in pending:
+                if cold:
+                    clear_caches()
+
+                # Each task has its own context, so the
+                # timings are those of this request only
+                with timing_scope() as timings:
+                    started = time.perf_counter()
+                    try:
+                        response = await client.request(
+                            method, url, data=form
+                        )
+                        status = response.status_code
+                    except Exception:
+                        status = None
+                    elapsed = time.perf_counter() - started
+
+                samples.append((route, status, elapsed, dict(timings)))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+
+    return wall, samples
+
+
+def summarize(wall, samples):
+    """
+    Return the report for the samples of one run
+    """
+    routes = {}
+
+    for route in dict.fromkeys(route for route, *_ in samples):
+        rows = [sample for sample in samples if sample[0] == route]
+        latencies = np.array([elapsed for _, _, elapsed, _ in rows])
+        errors = sum(
+            1 for _, status, _, _ in rows if status is None or status >= 400
+        )
+
+        breakdown = {
+            category: np.mean([
+                timings.get(category, 0.0) for *_, timings in rows
+            ]) * 1000
+            for category in CATEGORIES
+        }
+        breakdown['other'] = max(
+            0.0, latencies.mean() * 1000 - sum(breakdown.values())
+        )
+
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+        counts = np.histogram(
+            latencies * 1000, bins=(0, *BUCKETS, np.inf)
+        )[0]
+
+        routes[route] = {
+            'requests': len(rows),
+            'errors': errors,
+            'requests_per_second': round(len(rows) / wall, 1),
+            'p50_ms': round(p50, 3),
+            'p95_ms': round(p95, 3),
+            'p99_ms': round(p99, 3),
+            'max_ms': round(latencies.max() * 1000, 3),
+            'breakdown_ms': {
+                category: round(value, 3)
+                for category, value in breakdown.items()
+            },
+            'histogram': {
+                f'<={bound}ms' if bound != np.inf else f'>{BUCKETS[-1]}ms':
+                int(count)
+                for bound, count in zip((*BUCKETS, np.inf), counts)
+                if count
+            },
+        }
+
+    return {
+        'requests': len(samples),
+        'seconds': round(wall, 3),
+        'requests_per_second': round(len(samples) / wall, 1),
+        'routes': routes,
+    }
+
+
+def run_load_test(
+    requests=2000,
+    concurrency=8,
+    mix=MIX,
+    seed=0,
+    skew=1.0,
+    warmup=50,
+    cold=False,
+):
+    """
+    Warm the dashboard up, replay the planned requests
+    and return the summary
+    """
+    rng = np.random.default_rng(seed)
+
+    # The memo is set up as the server would set it, or off
+    # for a cold run, and put back after the run
+    if cold:
+        previous = configure_memo(ttl=0)
+    else:
+        previous = dashboard.configure_query_cache()
+
+    try:
+        # The first requests would otherwise pay for loading
+        # the model, matplotlib and each thread's figures
+        dashboard.warm_up()
+
+        # update_dropdown prints every request
+        with contextlib.redirect_stdout(io.StringIO()):
+            asyncio.run(replay(
+                plan_requests(warmup, mix, rng, skew), concurrency, cold
+            ))
+            planned = plan_requests(requests, mix, rng, skew)
+            wall, samples = asyncio.run(replay(planned, concurrency, cold))
+
+    finally:
+        configure_memo(**previous)
+
+    return summarize(wall, samples)
+
+
+def print_summary(summary):
+
+    print(
+        f'{summary["requests"]:,} requests in {summary["seconds"]:.2f}s, '
+        f'{summary["requests_per_second"]:,.0f}/s'
+    )
+
+    print(
+        f'\n{"route":<17}{"requests":>9}{"errors":>7}{"req/s":>8}'
+        f'{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"max ms":>9}'
+    )
+    for route, stats in summary['routes'].items():
+        print(
+            f'{route:<17}{stats["requests"]:>9}{stats["errors"]:>7}'
+            f'{stats["requests_per_second"]:>8.0f}{stats["p50_ms"]:>9.2f}'
+            f'{stats["p95_ms"]:>9.2f}{stats["p99_ms"]:>9.2f}'
+            f'{stats["max_ms"]:>9.2f}'
+        )
+
+    columns = (*CATEGORIES, 'other')
+    print(f'\nmean ms per request\n{"route":<17}', end='')
+    print(''.join(f'{column:>14}' for column in columns))
+    for route, stats in summary['routes'].items():
+        print(f'{route:<17}', end='')
+        print(''.join(
+            f'{stats["breakdown_ms"][column]:>14.3f}' for column in columns
+        ))
+
+    print('\nlatency histogram')
+    for route, stats in summary['routes'].items():
+        total = stats['requests']
+        print(route)
+        for bucket, count in stats['histogram'].items():
+            bar = '#' * max(1, round(40 * count / total))
+            print(f'  {bucket:>9} {count:>6} {bar}')
+
+
+def parse_args(argv=None):
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--warmup', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--skew', type=float, default=1.0,
+        help='Zipf exponent of id popularity, 0 for uniform',
+    )
+    default_mix = ' '.join(f'{k}={v}' for k, v in MIX.items())
+    parser.add_argument(
+        '--mix', nargs='+', default=None, metavar='ROUTE=WEIGHT',
+        help=f'route weights, default {default_mix}',
+    )
+    parser.add_argument(
+        '--database', default=None,
+        help='database to serve, e.g. one from src/generate_data.py',
+    )
+    parser.add_argument(
+        '--cold', action='store_true',
+        help='empty the caches and turn the query memo off',
+    )
+    parser.add_argument('--json', default=None, help='write the summary')
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+
+    args = parse_args(argv)
+
+    mix = MIX
+    if args.mix:
+        mix = {}
+        for item in args.mix:
+            route, _, weight = item.partition('=')
+            if route not in MIX:
+                sys.exit(
+                    f'unknown route {route!r}, expected one of {list(MIX)}'
+                )
+            mix[route] = float(weight)
+
+    if args.database:
+        configure_pool(database=args.database)
+
+    summary = run_load_test(
+        requests=args.requests,
+        concurrency=args.concurrency,
+        mix=mix,
+        seed=args.seed,
+        skew=args.skew,
+        warmup=args.warmup,
+        cold=args.cold,
+    )
+
+    print_summary(summary)
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(summary, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,10 @@
+import hashlib
 import pickle
+import threading
 from pathlib import Path
 
+import numpy as np
+
 # Using the Path object, create a `project_root` variable
 # set to the absolute path for the root of this project directory
 project_root = Path(__file__).resolve().parent.parent
@@ -12,9 +16,169 @@ project_root = Path(__file__).resolve().parent.parent
 model_path = project_root / 'assets' / 'model.pkl'
 
 
-def load_model():
+class LinearScorer:
+    """
+    The `predict_proba` of a binary logistic regression,
+    computed with NumPy from its coefficients.
+
+    Accepts the same DataFrames as the scikit-learn model
+    (columns are selected by the fitted feature names)
+    or plain arrays. Like scikit-learn it raises ValueError
+    for missing values, but skips its other input validation.
+    """
+
+    def __init__(self, coef, intercept, classes, feature_names=None):
+        self.coef_ = np.asarray(coef, dtype=np.float64)
+        self.intercept_ = np.asarray(intercept, dtype=np.float64)
+        self.classes_ = np.asarray(classes)
+        self.feature_names_in_ = (
+            None if feature_names is None else np.asarray(feature_names)
+        )
+
+    def _matrix(self, X):
+        if self.feature_names_in_ is not None and hasattr(X, 'columns'):
+            X = X[list(self.feature_names_in_)]
+        X = np.asarray(X, dtype=np.float64)
+        if np.isnan(X).any():
+            raise ValueError('Input X contains NaN.')
+        return X
+
+    def decision_function(self, X):
+        return self._matrix(X) @ self.coef_[0] + self.intercept_[0]
+
+    def predict_proba(self, X):
+        # log(1 + exp(-z)) via logaddexp stays finite
+        # for large |z|, unlike 1 / (1 + exp(-z))
+        positive = np.exp(-np.logaddexp(0, -self.decision_function(X)))
+        return np.column_stack([1 - positive, positive])
+
+    def predict(self, X):
+        return self.classes_[(self.decision_function(X) > 0).astype(int)]
+
+
+def compile_model(model):
+    """
+    Return a LinearScorer equivalent to `model`,
+    or None if it is not a binary logistic regression
+    """
+    from sklearn.linear_model import LogisticRegression
+
+    if not isinstance(model, LogisticRegression):
+        return None
+    if len(model.classes_) != 2:
+        return None
+
+    return LinearScorer(
+        model.coef_,
+        model.intercept_,
+        model.classes_,
+        getattr(model, 'feature_names_in_', None),
+    )
+
+
+def _source_hash(path):
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def save_compiled_model(path=model_path):
+    """
+    Compile the pickled model at `path` and write its
+    coefficients next to it, tagged with the pickle's hash,
+    for `load_model` to read. Run by build_project_assets.py
+    whenever it writes the model. Return the written path,
+    or None if the model is not a binary logistic regression.
+    """
+    path = Path(path)
+
+    with path.open('rb') as file:
+        scorer = compile_model(pickle.load(file))
+    if scorer is None:
+        return None
 
-    with model_path.open('rb') as file:
+    compiled_path = path.with_suffix('.npz')
+    named = scorer.feature_names_in_ is not None
+    with compiled_path.open('wb') as file:
+        np.savez(
+            file,
+            source_sha256=_source_hash(path),
+            coef=scorer.coef_,
+            intercept=scorer.intercept_,
+            classes=scorer.classes_,
+            feature_names=(
+                scorer.feature_names_in_.astype(str) if named else []
+            ),
+            named=named,
+        )
+
+    return compiled_path
+
+
+def load_model(path=model_path):
+    """
+    Load the pickled model at `path`.
+
+    When `save_compiled_model` has written coefficients for
+    this pickle, they are returned as a LinearScorer without
+    importing scikit-learn. Otherwise the pickle is loaded,
+    and a binary logistic regression is compiled in memory;
+    nothing is written. Any other model is returned as the
+    unpickled object.
+    """
+    path = Path(path)
+
+    try:
+        with np.load(path.with_suffix('.npz'), allow_pickle=False) as compiled:
+            if str(compiled['source_sha256']) == _source_hash(path):
+                return LinearScorer(
+                    compiled['coef'],
+                    compiled['intercept'],
+                    compiled['classes'],
+                    compiled['feature_names'] if compiled['named'] else None,
+                )
+    except (OSError, KeyError, ValueError):
+        pass
+
+    with path.open('rb') as file:
         model = pickle.load(file)
 
-    return model
+    scorer = compile_model(model)
+
+    return model if scorer is None else scorer
+
+
+class lazy_attribute:
+    """
+    A class attribute computed the first time it is read.
+
+    `factory` is called with the class that defines the
+    attribute, once, and its result replaces the descriptor
+    on that class, so later reads are plain attribute reads.
+    Use it for attributes too expensive to build at import.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self._lock = threading.Lock()
+
+    def __set_name__(self, owner, name):
+        self.owner = owner
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+
+        with self._lock:
+            value = self.owner.__dict__[self.name]
+            if value is self:
+                value = self.factory(self.owner)
+                setattr(self.owner, self.name, value)
+
+        return value
+
+    # True once the attribute named `name` of `owner`
+    # has been computed
+    @staticmethod
+    def loaded(owner, name):
+        for cls in owner.__mro__:
+            if name in cls.__dict__:
+                return not isinstance(cls.__dict__[name], lazy_attribute)
+        return False
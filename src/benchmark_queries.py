@@ -0,0 +1,348 @@
+"""
+Benchmark every public query method of Employee and Team.
+
+Each size is a database from `generate_data.py`, built once
+and kept in --data-dir. Every method is called --repeat times
+per size, cycling over a fixed sample of ids, with the query
+memo off so each call reaches SQLite through the shared
+connection pool. The p50, p95 and p99 latencies and the rows
+returned per second are printed and can be saved as JSON.
+
+    python benchmark_queries.py --sizes 100 1000 10000
+
+Against a baseline, a method regresses when its p50 latency
+(or each of --metrics) grows by more than --tolerance, and by
+more than --min-delta milliseconds. The exit status is then 1.
+
+    python benchmark_queries.py --baseline benchmark_baseline.json
+    python benchmark_queries.py --save benchmark_baseline.json
+"""
+import argparse
+import gc
+import json
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from employee_events import Employee, Team, configure_memo, configure_pool
+from employee_events.query_base import CumulativeCounts, NotesPage, QueryBase
+from generate_data import generate
+
+default_data_dir = Path(tempfile.gettempdir()) / 'employee_events_benchmarks'
+
+# The arguments each query method is called with for an id.
+# Every method in QueryBase.memoized_methods needs an entry
+CALLS = {
+    'names': lambda id: (),
+    'username': lambda id: (id,),
+    'team_name': lambda id: (id,),
+    'model_data': lambda id: (id,),
+    'event_counts': lambda id: (id,),
+    'cumulative_event_counts': lambda id: (id,),
+    'notes': lambda id: (id,),
+    'paged_notes': lambda id: (id,),
+    'search_notes': lambda id: (id, 'team'),
+}
+
+# Every generated database ends on the same day,
+# so the same size is always the same data
+END = date(2024, 12, 31)
+
+
+def teams_for(employees):
+    return max(5, employees // 25)
+
+
+def database_for(employees, days, seed, data_dir):
+    """
+    Return the path of the generated database for
+    a size, generating it on first use
+    """
+    teams = teams_for(employees)
+    name = f'employees{employees}_teams{teams}_days{days}_seed{seed}.db'
+    path = Path(data_dir) / name
+
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_suffix('.partial')
+        generate(
+            partial, employees=employees, teams=teams,
+            days=days, end=END, seed=seed,
+        )
+        partial.rename(path)
+
+    return path
+
+
+def query_methods(model):
+    """
+    Return the names of `model`'s public query methods
+    """
+    return [
+        name for name in QueryBase.memoized_methods
+        if hasattr(model, name)
+    ]
+
+
+def count_rows(result):
+    if isinstance(result, NotesPage):
+        return len(result.notes)
+    if isinstance(result, CumulativeCounts):
+        return len(result.event_date)
+    if isinstance(result, (pd.DataFrame, list)):
+        return len(result)
+    return 1
+
+
+def summarize(timings, rows):
+    timings = np.asarray(timings)
+    p50, p95, p99 = np.percentile(timings, [50, 95, 99]) * 1000
+    return {
+        'calls': len(timings),
+        'p50_ms': round(p50, 4),
+        'p95_ms': round(p95, 4),
+        'p99_ms': round(p99, 4),
+        'mean_ms': round(timings.mean() * 1000, 4),
+        'rows_per_second': round(rows / timings.sum(), 1),
+    }
+
+
+def time_methods(cases, ids, repeat, rounds=5, warmup=10):
+    """
+    Call every (label, method, call) case `repeat` times,
+    cycling over `ids`, and return {label: timings}.
+
+    The calls are made in `rounds` interleaved rounds so a
+    slow spell of the machine is shared by every method
+    instead of landing on one. As in `timeit`, the garbage
+    collector is off while the calls are timed.
+    """
+    samples = {label: [] for label, _, _ in cases}
+    rows = dict.fromkeys(samples, 0)
+
+    for label, method, call in cases:
+        for index in range(warmup):
+            method(*call(ids[index % len(ids)]))
+
+    per_round = max(1, repeat // rounds)
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        for round in range(rounds):
+            for label, method, call in cases:
+                for index in range(per_round):
+                    args = call(ids[(round * per_round + index) % len(ids)])
+                    started = time.perf_counter()
+                    result = method(*args)
+                    samples[label].append(time.perf_counter() - started)
+                    rows[label] += count_rows(result)
+            gc.collect()
+    finally:
+        if collecting:
+            gc.enable()
+
+    return {
+        label: summarize(samples[label], rows[label]) for label in samples
+    }
+
+
+def benchmark_database(database, repeat=200, samples=50, seed=0):
+    """
+    Return {'Employee.names': timings, ...} for every
+    query method against `database`
+    """
+    rng = np.random.default_rng(seed)
+
+    # Put the caller's pool and memo settings back after
+    previous_memo = configure_memo(ttl=0)
+    previous_pool = configure_pool(database=database)
+    try:
+        results = {}
+        for model in (Employee(), Team()):
+            ids = [id for _, id in model.names()]
+            ids = rng.choice(ids, size=min(samples, len(ids)), replace=False)
+            ids = [int(id) for id in ids]
+
+            cases = [
+                (f'{type(model).__name__}.{name}', getattr(model, name),
+                 CALLS[name])
+                for name in query_methods(model)
+            ]
+            results.update(time_methods(cases, ids, repeat))
+        return results
+
+    finally:
+        configure_pool(**previous_pool)
+        configure_memo(**previous_memo)
+
+
+def run_benchmarks(
+    sizes=(100, 1000, 10000),
+    days=366,
+    repeat=200,
+    samples=50,
+    seed=0,
+    data_dir=default_data_dir,
+):
+    """
+    Benchmark every size and return the report as a dict
+    """
+    report = {
+        'environment': {
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'machine': platform.machine(),
+        },
+        'sizes': {},
+        'results': {},
+    }
+
+    for employees in sizes:
+        database = database_for(employees, days, seed, data_dir)
+        report['sizes'][str(employees)] = {
+            'employees': employees,
+            'teams': teams_for(employees),
+            'days': days,
+            'seed': seed,
+        }
+        report['results'][str(employees)] = benchmark_database(
+            database, repeat=repeat, samples=samples, seed=seed
+        )
+
+    return report
+
+
+def compare(
+    report, baseline, tolerance=0.5, min_delta=0.1, metrics=('p50_ms',)
+):
+    """
+    Return the regressions of `report` against `baseline`
+    as (size, method, metric, baseline ms, current ms).
+
+    The tail percentiles of sub-millisecond calls move by a
+    third between runs on a busy machine, so only the median
+    is compared unless `metrics` says otherwise
+    """
+    regressions = []
+
+    for size, results in report['results'].items():
+        previous = baseline.get('results', {}).get(size, {})
+
+        for method, timings in results.items():
+            if method not in previous:
+                continue
+
+            for metric in metrics:
+                before = previous[method][metric]
+                after = timings[metric]
+                if (after > before * (1 + tolerance)
+                        and after - before > min_delta):
+                    regressions.append((size, method, metric, before, after))
+
+    return regressions
+
+
+def print_report(report, baseline=None):
+
+    for size, results in report['results'].items():
+        previous = (baseline or {}).get('results', {}).get(size, {})
+
+        print(f'\n{size} employees')
+        print(
+            f'{"method":<32}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}'
+            f'{"rows/s":>13}{"vs p50":>9}'
+        )
+        for method, timings in results.items():
+            change = ''
+            if method in previous:
+                before = previous[method]['p50_ms']
+                change = f'{(timings["p50_ms"] - before) / before:+.0%}'
+            print(
+                f'{method:<32}{timings["p50_ms"]:>9.3f}'
+                f'{timings["p95_ms"]:>9.3f}{timings["p99_ms"]:>9.3f}'
+                f'{timings["rows_per_second"]:>13,.0f}{change:>9}'
+            )
+
+
+def parse_args(argv=None):
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[100, 1000, 10000],
+        help='employees in each generated database',
+    )
+    parser.add_argument('--days', type=int, default=366)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument(
+        '--samples', type=int, default=50,
+        help='ids each method cycles over',
+    )
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', type=Path, default=default_data_dir)
+    parser.add_argument(
+        '--baseline', type=Path, default=None,
+        help='JSON report to compare against',
+    )
+    parser.add_argument('--tolerance', type=float, default=0.5)
+    parser.add_argument(
+        '--metrics', nargs='+', default=['p50_ms'],
+        choices=['p50_ms', 'p95_ms', 'p99_ms', 'mean_ms'],
+        help='latencies compared with the baseline',
+    )
+    parser.add_argument(
+        '--min-delta', type=float, default=0.1,
+        help='ignore latency changes below this many milliseconds',
+    )
+    parser.add_argument(
+        '--save', type=Path, default=None,
+        help='write the report as JSON, e.g. a new baseline',
+    )
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+
+    args = parse_args(argv)
+
+    report = run_benchmarks(
+        sizes=args.sizes,
+        days=args.days,
+        repeat=args.repeat,
+        samples=args.samples,
+        seed=args.seed,
+        data_dir=args.data_dir,
+    )
+
+    baseline = None
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())
+
+    print_report(report, baseline)
+
+    if args.save is not None:
+        args.save.write_text(json.dumps(report, indent=2) + '\n')
+
+    if baseline is not None:
+        regressions = compare(
+            report, baseline, args.tolerance, args.min_delta, args.metrics
+        )
+        for size, method, metric, before, after in regressions:
+            print(
+                f'REGRESSION {size} employees {method} {metric}: '
+                f'{before:.3f} -> {after:.3f}'
+            )
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
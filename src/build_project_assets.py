@@ -2,10 +2,12 @@ import pandas as pd
 from pathlib import Path
 import numpy as np
 import random, pickle, json  # noqa: E401
+import sys
 from sqlite3 import connect
 from datetime import timedelta, date
 from sklearn.linear_model import LogisticRegression
 from scipy.stats import norm, expon, uniform, skewnorm  # noqa: F401
+from employee_events.schema import migrate, check_query_plans
 
 
 cwd = Path('.').resolve()
@@ -205,10 +207,22 @@ with model_path.open('wb') as file:
 
     pickle.dump(model, file)
 
+# The dashboard reads the model's coefficients from
+# model.npz, next to the pickle, so it starts without
+# importing scikit-learn. It never writes the file itself
+sys.path.insert(0, str(cwd.parent / 'report'))
+from utils import save_compiled_model  # noqa: E402
+
+save_compiled_model(model_path)
+
 
 db_path = cwd.parent / 'python-package'
 db_path = db_path / 'employee_events' / 'employee_events.db'
 
+# Start from an empty file so the schema
+# migrations below run against the new tables
+db_path.unlink(missing_ok=True)
+
 connection = connect(db_path)
 
 employee.to_sql('employee', connection, if_exists='replace')
@@ -217,3 +231,8 @@ notes.to_sql('notes', connection, if_exists='replace')
 events.to_sql('employee_events', connection, if_exists='replace')
 
 connection.close()
+
+# Create the indexes the query layer relies on
+# and make sure no registered query scans a table
+migrate(db_path)
+check_query_plans(db_path)
@@ -0,0 +1,342 @@
+"""
+Generate a synthetic employee_events database of any size.
+
+The events follow the same five employee profiles as
+`build_project_assets.py`, but each profile's counts are
+drawn with NumPy for a whole block of employees and days
+at once, and the rows are written to SQLite one block of
+days at a time, so memory stays flat however many years
+are generated. The same seed and options give the same data.
+
+    python generate_data.py --employees 100000 --teams 500 \\
+        --days 1826 --seed 7 --output /data/employee_events.db
+
+The model in assets/model.pkl is not retrained.
+"""
+import argparse
+import json
+import sqlite3
+import time
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+from scipy.stats import skewnorm
+
+from employee_events.schema import check_query_plans, migrate
+
+data_path = Path(__file__).resolve().parent / 'generated_data'
+
+
+def left_skew(rng, a, loc, size, samples=500):
+    # `left_skew` of build_project_assets.py for `size`
+    # draws: a heavily skewed sample scaled to [0, loc]
+    # and truncated, then sampled from with replacement
+    r = skewnorm.rvs(a=a, loc=loc, size=samples, random_state=rng)
+    r = r - r.min()
+    r = r / r.max()
+    r = (r * loc).astype(int)
+    return rng.choice(r, size=size)
+
+
+# The event distributions of the profiles in
+# build_project_assets.py. Each draw function
+# returns `size` event counts in one call
+profiles = {
+    'good': {
+        'positive': lambda rng, size: rng.normal(
+            rng.normal(4, size=size), 1
+        ).astype(int),
+        'negative': lambda rng, size: rng.exponential(
+            rng.choice([.5, 1], size=size)
+        ).astype(int)
+    },
+    'normal': {
+        'positive': lambda rng, size: rng.normal(
+            rng.normal(3, size=size), 1
+        ).astype(int),
+        'negative': lambda rng, size: rng.normal(
+            2, rng.choice([.5, 1, 2, 3], size=size)
+        ).astype(int)
+    },
+    'poor': {
+        'positive': lambda rng, size: rng.exponential(
+            .5, size=size
+        ).astype(int),
+        'negative': lambda rng, size: rng.normal(.5, size=size).astype(int)
+    },
+    'chaotic_good': {
+        'positive': lambda rng, size: left_skew(rng, -1000, 5, size),
+        'negative': lambda rng, size: np.where(
+            rng.random(size) < .02,
+            rng.choice([50, 200], size=size),
+            0,
+        )
+    },
+    'chotic_bad': {
+        'positive': lambda rng, size: rng.exponential(
+            5, size=size
+        ).astype(int),
+        'negative': lambda rng, size: left_skew(rng, -1000, 10, size)
+    }
+}
+
+# The tables as `build_project_assets.py` creates them,
+# without the pandas index column
+CREATE_TABLES = [
+    """
+    CREATE TABLE employee (
+        employee_id INTEGER,
+        first_name TEXT,
+        last_name TEXT,
+        team_id INTEGER
+    )
+    """,
+    """
+    CREATE TABLE team (
+        team_id INTEGER,
+        team_name TEXT,
+        shift TEXT,
+        manager_name TEXT
+    )
+    """,
+    """
+    CREATE TABLE notes (
+        employee_id INTEGER,
+        team_id INTEGER,
+        note TEXT,
+        note_date TEXT
+    )
+    """,
+    """
+    CREATE TABLE employee_events (
+        event_date TEXT,
+        employee_id INTEGER,
+        team_id INTEGER,
+        positive_events INTEGER,
+        negative_events INTEGER
+    )
+    """,
+]
+
+
+def load_json(name):
+    with (data_path / name).open('r') as file:
+        return json.load(file)
+
+
+def workdays(end, days):
+    """
+    Return the weekdays among the `days` days
+    ending on `end`, as an array of dates
+    """
+    start = np.datetime64(end) - np.timedelta64(days - 1, 'D')
+    dates = np.arange(start, np.datetime64(end) + 1, dtype='datetime64[D]')
+    return dates[np.is_busday(dates)]
+
+
+def generate_teams(rng, n_teams):
+
+    names = load_json('team_names.json')
+    shifts = load_json('shifts.json')
+    managers = load_json('managers.json')
+
+    team_ids = np.arange(1, n_teams + 1)
+
+    # The original names first, numbered
+    # once there are more teams than names
+    team_names = [
+        names[i % len(names)] if i < len(names)
+        else f'{names[i % len(names)]} {i // len(names) + 1}'
+        for i in range(n_teams)
+    ]
+
+    return {
+        'team_id': team_ids,
+        'team_name': team_names,
+        'shift': [shifts[i % len(shifts)] for i in range(n_teams)],
+        'manager_name': rng.choice(managers, size=n_teams),
+    }
+
+
+def generate_employees(rng, n_employees, n_teams):
+
+    people = load_json('employees.json')
+    first_names = [person['name'].split()[0] for person in people]
+    last_names = [person['name'].split()[1] for person in people]
+
+    profile = rng.integers(len(profiles), size=n_employees)
+
+    return {
+        'employee_id': np.arange(1, n_employees + 1),
+        'first_name': rng.choice(first_names, size=n_employees),
+        'last_name': rng.choice(last_names, size=n_employees),
+        'team_id': rng.integers(1, n_teams + 1, size=n_employees),
+        'profile': profile,
+    }
+
+
+def generate_events(rng, employees, dates):
+    """
+    Return the event columns for every employee on
+    every one of `dates`, drawn one profile at a time
+    """
+    n_employees = len(employees['employee_id'])
+    n_dates = len(dates)
+
+    positive = np.empty((n_employees, n_dates), dtype=np.int64)
+    negative = np.empty((n_employees, n_dates), dtype=np.int64)
+
+    for index, name in enumerate(profiles):
+        rows = employees['profile'] == index
+        size = (int(rows.sum()), n_dates)
+        if size[0]:
+            draws = size[0] * n_dates
+            profile = profiles[name]
+            positive[rows] = profile['positive'](rng, draws).reshape(size)
+            negative[rows] = profile['negative'](rng, draws).reshape(size)
+
+    # One row per day and employee, day by day
+    return {
+        'event_date': np.repeat(dates.astype(str), n_employees),
+        'employee_id': np.tile(employees['employee_id'], n_dates),
+        'team_id': np.tile(employees['team_id'], n_dates),
+        'positive_events': positive.T.ravel(),
+        'negative_events': negative.T.ravel(),
+    }
+
+
+def generate_notes(rng, employees, dates, notes_per_employee):
+
+    people = load_json('employees.json')
+    texts = [note for person in people for note in person['notes']]
+
+    n_employees = len(employees['employee_id'])
+    counts = rng.poisson(notes_per_employee, size=n_employees)
+    rows = np.repeat(np.arange(len(counts)), counts)
+
+    return {
+        'employee_id': employees['employee_id'][rows],
+        'team_id': employees['team_id'][rows],
+        'note': rng.choice(texts, size=len(rows)),
+        'note_date': rng.choice(dates, size=len(rows)).astype(str),
+    }
+
+
+def insert(connection, table, columns):
+    names = list(columns)
+    values = zip(*(np.asarray(columns[name]).tolist() for name in names))
+    connection.executemany(
+        f'INSERT INTO {table} ({", ".join(names)}) '
+        f'VALUES ({", ".join("?" * len(names))})',
+        values,
+    )
+
+
+def generate(
+    output,
+    employees=25,
+    teams=5,
+    days=366,
+    end=None,
+    seed=0,
+    chunk_days=20,
+    notes_per_employee=7,
+    run_migrations=True,
+    progress=None,
+):
+    """
+    Write a synthetic database to `output` and return
+    the number of event rows written.
+
+    `progress`, when given, is called after every chunk
+    with the last day written, as YYYY-MM-DD, the event
+    rows so far and the seconds spent writing them.
+    """
+    output = Path(output)
+    rng = np.random.default_rng(seed)
+
+    dates = workdays(end or date.today(), days)
+    team = generate_teams(rng, teams)
+    employee = generate_employees(rng, employees, teams)
+    notes = generate_notes(rng, employee, dates, notes_per_employee)
+
+    output.unlink(missing_ok=True)
+    connection = sqlite3.connect(output, isolation_level=None)
+
+    # The file is rebuilt from scratch on failure,
+    # so it does not need to survive a crash
+    connection.execute('PRAGMA journal_mode = OFF')
+    connection.execute('PRAGMA synchronous = OFF')
+
+    for create in CREATE_TABLES:
+        connection.execute(create)
+
+    connection.execute('BEGIN')
+    insert(connection, 'team', team)
+    insert(connection, 'employee', {
+        name: employee[name]
+        for name in ('employee_id', 'first_name', 'last_name', 'team_id')
+    })
+    insert(connection, 'notes', notes)
+    connection.execute('COMMIT')
+
+    rows = 0
+    started = time.perf_counter()
+
+    for start in range(0, len(dates), chunk_days):
+        chunk = dates[start:start + chunk_days]
+        connection.execute('BEGIN')
+        events = generate_events(rng, employee, chunk)
+        insert(connection, 'employee_events', events)
+        connection.execute('COMMIT')
+
+        rows += len(chunk) * employees
+        if progress is not None:
+            progress(str(chunk[-1]), rows, time.perf_counter() - started)
+
+    connection.close()
+
+    if run_migrations:
+        migrate(output)
+        check_query_plans(output)
+
+    return rows
+
+
+def print_progress(day, rows, seconds):
+    print(f'{day}: {rows:,} events ({rows / seconds:,.0f}/s)')
+
+
+def parse_args(argv=None):
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--output', type=Path, required=True)
+    parser.add_argument('--employees', type=int, default=25)
+    parser.add_argument('--teams', type=int, default=5)
+    parser.add_argument(
+        '--days', type=int, default=366,
+        help='calendar days of events, weekends have none',
+    )
+    parser.add_argument(
+        '--end', type=date.fromisoformat, default=None,
+        help='last day of events (YYYY-MM-DD), default today',
+    )
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--chunk-days', type=int, default=20,
+        help='workdays of events generated and written at a time',
+    )
+    parser.add_argument('--notes-per-employee', type=float, default=7)
+    parser.add_argument(
+        '--no-migrate', dest='run_migrations', action='store_false',
+        help='skip the indexes, summary tables and search index',
+    )
+
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    rows = generate(**vars(args), progress=print_progress)
+    print(f'Wrote {rows:,} events to {args.output}')
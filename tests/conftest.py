@@ -0,0 +1,43 @@
+import shutil
+import sys
+
+import pytest
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+
+# dashboard.py and the modules next to it import each
+# other as top-level modules, the way the dashboard is run
+sys.path.insert(0, str(project_root / 'report'))
+
+
+# The shipped database. Tests that write to it
+# work on a copy in their `tmp_path`
+@pytest.fixture
+def db_path():
+    db_file = project_root / 'python-package'
+    db_file = db_file / 'employee_events' / 'employee_events.db'
+
+    return db_file
+
+
+# A copy of the shipped database in the test's
+# `tmp_path`, for tests that write to it
+@pytest.fixture
+def db_copy(db_path, tmp_path):
+    copy = tmp_path / 'employee_events.db'
+    shutil.copy(db_path, copy)
+
+    return copy
+
+
+# Run with the process-wide query memo off,
+# whatever an earlier test set, and put the
+# previous setting back afterwards
+@pytest.fixture
+def no_ttl():
+    from employee_events import configure_memo
+
+    previous = configure_memo(ttl=0)
+    yield
+    configure_memo(**previous)
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+
+
+# The awaitable methods return what the blocking ones do
+def test_async_methods_match_blocking_ones():
+    from employee_events import Employee, Team
+
+    async def main():
+        results = []
+        for model in (Employee(), Team()):
+            results.append((
+                await model.anames(),
+                await model.aevent_counts(1),
+                await model.anotes(1),
+                await model.amodel_data(1),
+                await model.apaged_notes(1, limit=5),
+            ))
+        return results
+
+    results = asyncio.run(main())
+
+    for model, (names, counts, notes, data, page) in zip(
+        (Employee(), Team()), results
+    ):
+        assert names == model.names()
+        assert counts.equals(model.event_counts(1))
+        assert notes.equals(model.notes(1))
+        assert data.equals(model.model_data(1))
+        assert page.notes.equals(model.paged_notes(1, limit=5).notes)
+
+
+# Queries run off the event loop's thread, so
+# the loop keeps running while they wait
+def test_queries_do_not_block_the_event_loop():
+    from employee_events import Team, run_blocking
+
+    threads = set()
+    ticks = []
+    release = threading.Event()
+
+    def blocking_query():
+        threads.add(threading.get_ident())
+        release.wait(timeout=5)
+        return Team().names()
+
+    async def ticker():
+        for _ in range(3):
+            ticks.append(threading.get_ident())
+            await asyncio.sleep(0.01)
+        release.set()
+
+    async def main():
+        names, _ = await asyncio.gather(run_blocking(blocking_query), ticker())
+        return names
+
+    assert asyncio.run(main()) == Team().names()
+    assert len(ticks) == 3
+    assert threading.get_ident() not in threads
+
+
+def test_concurrent_awaits_run_on_the_query_threads():
+    from employee_events import Employee
+
+    async def main():
+        return await asyncio.gather(
+            *(Employee().aevent_counts(id) for id in range(1, 21))
+        )
+
+    results = asyncio.run(main())
+
+    assert [len(result) for result in results] == [
+        len(Employee().event_counts(id)) for id in range(1, 21)
+    ]
+
+
+# The query threads hold connections of their own, so
+# awaited queries run while every pooled one is taken
+def test_awaits_do_not_wait_for_the_pool():
+    from employee_events import (
+        Team, configure_pool, pool_stats, pooled_connection,
+    )
+
+    configure_pool(max_size=1, timeout=0.2)
+    try:
+        with pooled_connection():
+            names = asyncio.run(Team().anames())
+
+        assert names == Team().names()
+        assert pool_stats()['held'] == 1
+        assert pool_stats()['timeouts'] == 0
+    finally:
+        configure_pool()
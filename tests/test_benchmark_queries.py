@@ -0,0 +1,82 @@
+import sys
+
+import pytest
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+
+# The benchmark runner lives in src/ next
+# to the generator it builds databases with
+sys.path.insert(0, str(project_root / 'src'))
+
+
+@pytest.fixture(scope='module')
+def report(tmp_path_factory):
+    from benchmark_queries import run_benchmarks
+
+    return run_benchmarks(
+        sizes=[30],
+        days=20,
+        repeat=10,
+        samples=5,
+        data_dir=tmp_path_factory.mktemp('benchmarks'),
+    )
+
+
+def test_every_public_method_is_timed(report):
+    from employee_events import Employee, Team
+    from benchmark_queries import query_methods
+
+    expected = {
+        f'{type(model).__name__}.{name}'
+        for model in (Employee(), Team())
+        for name in query_methods(model)
+    }
+
+    assert set(report['results']['30']) == expected
+    assert {'Employee.username', 'Team.team_name'} <= expected
+
+
+def test_timings_are_ordered(report):
+
+    for timings in report['results']['30'].values():
+        assert timings['calls'] == 10
+        assert 0 < timings['p50_ms'] <= timings['p95_ms'] <= timings['p99_ms']
+        assert timings['rows_per_second'] > 0
+
+
+def test_compare_flags_only_large_slowdowns(report):
+    import copy
+    from benchmark_queries import compare
+
+    assert compare(report, report) == []
+
+    # A baseline where every call took a tenth of the time,
+    # but one method was within the minimum delta
+    baseline = copy.deepcopy(report)
+    for timings in baseline['results']['30'].values():
+        timings['p50_ms'] /= 10
+    baseline['results']['30']['Team.team_name']['p50_ms'] = 1000
+
+    regressions = compare(report, baseline, min_delta=0)
+    methods = {method for _, method, _, _, _ in regressions}
+
+    assert methods == set(report['results']['30']) - {'Team.team_name'}
+    assert compare(report, baseline, min_delta=1000) == []
+
+
+# The caller's pool and memo settings are put back
+def test_benchmark_restores_settings(db_path):
+    from employee_events import configure_memo, configure_pool, get_pool
+    from benchmark_queries import benchmark_database
+
+    memo = configure_memo(ttl=7, max_entries=10)
+    pool = configure_pool(database=db_path, max_size=3)
+    try:
+        benchmark_database(db_path, repeat=5, samples=3)
+
+        assert get_pool().max_size == 3
+        assert configure_memo(**memo) == {'ttl': 7, 'max_entries': 10}
+    finally:
+        configure_pool(**pool)
+        configure_memo(**memo)
@@ -0,0 +1,65 @@
+import pytest
+
+
+def test_lru_cache_evicts_least_recently_used():
+    from base_components.cache import LRUCache
+
+    cache = LRUCache(max_entries=2)
+    cache.set('a', b'1')
+    cache.set('b', b'2')
+    cache.get('a')
+    cache.set('c', b'3')
+
+    assert cache.get('b') is None
+    assert cache.get('a') == b'1'
+    assert cache.stats()['evictions'] == 1
+
+
+def test_lru_cache_is_bounded_by_bytes():
+    from base_components.cache import LRUCache
+
+    cache = LRUCache(max_bytes=10)
+    cache.set('a', b'x' * 6)
+    cache.set('b', b'x' * 6)
+
+    assert cache.get('a') is None
+    assert cache.stats()['bytes'] == 6
+
+
+def test_lru_cache_persists_to_disk(tmp_path):
+    from base_components.cache import LRUCache
+
+    LRUCache(directory=tmp_path).set(('chart', 1), b'png')
+
+    restarted = LRUCache(directory=tmp_path)
+    assert restarted.get(('chart', 1)) == b'png'
+    assert restarted.stats()['disk_hits'] == 1
+
+
+@pytest.fixture
+def counting_chart():
+    from base_components import MatplotlibViz
+    from base_components.cache import LRUCache
+
+    class CountingChart(MatplotlibViz):
+        chart_cache = LRUCache()
+        calls = 0
+
+        def visualization(self, entity_id, model):
+            CountingChart.calls += 1
+
+    return CountingChart()
+
+
+# A chart is drawn once per entity
+# until the data version changes
+def test_matplotlib_viz_renders_each_chart_once(counting_chart):
+    from employee_events import Employee
+
+    first = counting_chart(1, Employee())
+    second = counting_chart(1, Employee())
+    counting_chart(2, Employee())
+
+    assert type(counting_chart).calls == 2
+    assert first.src == second.src
+    assert counting_chart.chart_cache.stats()['hits'] == 1
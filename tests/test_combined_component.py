@@ -0,0 +1,128 @@
+import contextvars
+import threading
+import time
+
+import pytest
+
+
+request_name = contextvars.ContextVar('request_name', default=None)
+
+
+# A child that takes `delay` seconds and
+# renders as its label and the context variable
+class Slow:
+
+    def __init__(self, label, delay=0.0):
+        self.label = label
+        self.delay = delay
+
+    def __call__(self, userid, model):
+        time.sleep(self.delay)
+        return f'{self.label}:{request_name.get()}'
+
+
+@pytest.fixture
+def combined():
+    from combined_components import CombinedComponent
+
+    class Page(CombinedComponent):
+        concurrent = True
+
+        # Return the rendered children as a list
+        def outer_div(self, children, div_args):
+            return children
+
+    return Page
+
+
+def test_children_render_concurrently_in_order(combined):
+
+    class Page(combined):
+        children = [Slow('a', 0.3), Slow('b', 0.1), Slow('c', 0.2)]
+
+    token = request_name.set('req')
+    try:
+        start = time.monotonic()
+        rendered = Page()(1, None)
+        elapsed = time.monotonic() - start
+    finally:
+        request_name.reset(token)
+
+    assert rendered == ['a:req', 'b:req', 'c:req']
+    assert elapsed < 0.5
+
+
+def test_slow_child_is_replaced_by_placeholder(combined):
+
+    class Page(combined):
+        children = [Slow('fast'), Slow('slow', 1.0)]
+        child_timeout = 0.2
+
+        def placeholder(self, child, userid, model):
+            return f'placeholder:{child.label}'
+
+    rendered = Page()(1, None)
+
+    assert rendered[0] == 'fast:None'
+    assert rendered[1] == 'placeholder:slow'
+
+
+# Nested concurrent components render their children
+# in place, so they cannot exhaust the pool
+def test_nested_components_do_not_deadlock(combined, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    from combined_components import combined_component
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(combined_component, '_executor', executor)
+
+    class Inner(combined):
+        children = [Slow('x'), Slow('y')]
+
+    class Outer(combined):
+        children = [Inner(), Slow('z')]
+
+    result = []
+    worker = threading.Thread(target=lambda: result.append(Outer()(1, None)))
+    worker.start()
+    worker.join(timeout=5)
+    executor.shutdown()
+
+    assert result == [[['x:None', 'y:None'], 'z:None']]
+
+
+def test_child_errors_propagate(combined):
+
+    class Broken:
+        def __call__(self, userid, model):
+            raise ValueError('broken child')
+
+    class Page(combined):
+        children = [Slow('a'), Broken()]
+
+    with pytest.raises(ValueError, match='broken child'):
+        Page()(1, None)
+
+
+# More pages at once than the pool has workers: the
+# children queued behind the first pages still get
+# their full timeout once they start
+def test_queued_children_are_not_timed_out(combined, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    from combined_components import combined_component
+
+    executor = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(combined_component, '_executor', executor)
+
+    class Page(combined):
+        children = [Slow('a', 0.2), Slow('b', 0.2)]
+        child_timeout = 0.3
+
+        def placeholder(self, child, userid, model):
+            return f'placeholder:{child.label}'
+
+    with ThreadPoolExecutor(max_workers=4) as pages:
+        rendered = list(pages.map(lambda _: Page()(1, None), range(4)))
+    executor.shutdown()
+
+    assert rendered == [['a:None', 'b:None']] * 4
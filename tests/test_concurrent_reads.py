@@ -0,0 +1,108 @@
+import threading
+import time
+from datetime import date, timedelta
+
+import pytest
+
+
+# A copy of the database in WAL mode, shared by the
+# query layer for the test. Results are not memoized,
+# so every read reaches SQLite
+@pytest.fixture
+def wal_pool(db_copy):
+    from employee_events import configure_memo, configure_pool
+
+    previous = configure_memo(ttl=0)
+    configure_pool(database=db_copy, max_size=4, timeout=1, wal=True)
+    yield db_copy
+    configure_pool()
+    configure_memo(**previous)
+
+
+# Seconds any one read may take while the writer runs,
+# far above a read's usual few milliseconds
+READ_BOUND = 0.5
+
+
+# Days after the shipped events, one batch each
+def event_batches(employees):
+    day = date(2025, 1, 1)
+    while True:
+        yield [
+            {'event_date': day.isoformat(), 'employee_id': employee_id,
+             'positive_events': 1, 'negative_events': 0}
+            for employee_id in employees
+        ]
+        day += timedelta(days=1)
+
+
+# Dashboard queries run on four threads while an ingest job
+# commits a day of events at a time. No read fails with
+# `database is locked`, none takes longer than READ_BOUND,
+# and readers see the committed days. The bound catches a
+# reader stuck behind the writer's lock, not small waits.
+# Throughput and the slowest read and write are recorded
+# as properties of the test
+def test_readers_run_alongside_a_writer(wal_pool, record_property):
+    from employee_events import Employee, Team, data_version, ingest_events
+
+    employees = [id for _, id in Employee().names()]
+    duration = 1.0
+    stop = threading.Event()
+    errors = []
+    reads = []
+    latencies = []
+    versions = set()
+
+    def reader(index):
+        count = 0
+        try:
+            while not stop.is_set():
+                employee = employees[count % len(employees)]
+                for read, id in (
+                    (Employee().model_data, employee),
+                    (Employee().event_counts, employee),
+                    (Team().model_data, 1),
+                ):
+                    started = time.perf_counter()
+                    read(id)
+                    latencies.append(time.perf_counter() - started)
+                versions.add(data_version())
+                count += 3
+        except Exception as error:
+            errors.append(error)
+        reads.append(count)
+
+    threads = [
+        threading.Thread(target=reader, args=(index,)) for index in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+
+    written = batches = 0
+    writes = []
+    started = time.perf_counter()
+    try:
+        for batch in event_batches(employees):
+            stats = ingest_events(batch, wal_pool)
+            written += stats.rows
+            writes.append(stats.seconds)
+            batches += 1
+            if time.perf_counter() - started > duration:
+                break
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    elapsed = time.perf_counter() - started
+
+    record_property('reads_per_second', sum(reads) / elapsed)
+    record_property('events_per_second', written / elapsed)
+    record_property('slowest_read_seconds', max(latencies))
+    record_property('slowest_write_seconds', max(writes))
+
+    assert errors == []
+    assert all(count > 0 for count in reads)
+    assert batches > 1
+    assert len(versions) > 1
+    assert max(latencies) < READ_BOUND
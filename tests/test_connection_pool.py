@@ -0,0 +1,185 @@
+import sqlite3
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def pool(db_path):
+    from employee_events.connection_pool import ConnectionPool
+
+    pool = ConnectionPool(db_path, max_size=2, timeout=0.2)
+    yield pool
+    pool.close()
+
+
+# The second checkout should reuse the
+# connection opened by the first one
+def test_pool_reuses_connections(pool):
+
+    with pool.connection() as first:
+        pass
+
+    with pool.connection() as second:
+        pass
+
+    assert first is second
+    stats = pool.stats()
+    assert (stats['hits'], stats['misses'], stats['open']) == (1, 1, 1)
+
+
+def test_pool_connections_are_read_only(pool):
+
+    with pool.connection() as connection:
+        with pytest.raises(sqlite3.OperationalError):
+            connection.execute('CREATE TABLE should_fail (x INTEGER)')
+
+
+# Nested checkouts on one thread share a connection,
+# so they do not count against the pool size
+def test_nested_checkout_reuses_connection(pool):
+
+    with pool.connection() as outer:
+        with pool.connection() as inner:
+            assert inner is outer
+
+    assert pool.stats()['open'] == 1
+
+
+# A held connection belongs to its thread
+# and is not taken from the pool's limit
+def test_held_connection_is_outside_the_pool(db_path):
+    from employee_events.connection_pool import ConnectionPool
+
+    pool = ConnectionPool(db_path, max_size=1, timeout=0.2)
+    held = []
+
+    def worker():
+        pool.hold()
+        with pool.connection() as first, pool.connection() as second:
+            held.append((first, second))
+
+    with pool.connection():
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+    (first, second), = held
+    assert first is second
+    assert pool.stats()['held'] == 1
+    assert pool.stats()['timeouts'] == 0
+
+    pool.close()
+    assert pool.stats()['held'] == 0
+    with pytest.raises(sqlite3.ProgrammingError):
+        first.execute('SELECT 1')
+
+
+def test_pool_is_bounded(pool):
+    from employee_events.connection_pool import PoolTimeout
+
+    checked_out = threading.Event()
+    release = threading.Event()
+
+    def hold_connection():
+        with pool.connection():
+            checked_out.set()
+            release.wait()
+
+    holders = [threading.Thread(target=hold_connection) for _ in range(2)]
+    for holder in holders:
+        holder.start()
+        checked_out.wait()
+        checked_out.clear()
+
+    with pytest.raises(PoolTimeout):
+        with pool.connection():
+            pass
+
+    release.set()
+    for holder in holders:
+        holder.join()
+
+    assert pool.stats()['timeouts'] == 1
+    assert pool.stats()['open'] == 2
+
+
+# A connection that fails the health check
+# is replaced instead of being handed out
+def test_unhealthy_connection_is_replaced(pool):
+
+    with pool.connection() as first:
+        pass
+    first.close()
+
+    with pool.connection() as second:
+        assert second.execute('SELECT 1').fetchone() == (1,)
+
+    assert second is not first
+    assert pool.stats()['discarded'] == 1
+
+
+def test_query_mixin_uses_shared_pool(no_ttl):
+    from employee_events import Team, database_tables, pool_stats
+
+    # Probe the schema first, it is a checkout of its own
+    database_tables()
+
+    before = pool_stats()
+    Team().names()
+    Team().notes(1)
+    after = pool_stats()
+
+    assert (
+        after['hits'] + after['misses']
+        == before['hits'] + before['misses'] + 2
+    )
+    assert after['open'] <= after['max_size']
+
+
+def test_reader_connections_are_tuned(pool):
+    from employee_events.connection_pool import READER_PRAGMAS
+
+    with pool.connection() as connection:
+        settings = {
+            name: connection.execute(f'PRAGMA {name}').fetchone()[0]
+            for name in READER_PRAGMAS
+        }
+
+    assert settings == {
+        'mmap_size': READER_PRAGMAS['mmap_size'],
+        'cache_size': READER_PRAGMAS['cache_size'],
+        'temp_store': 2,
+        'query_only': 1,
+    }
+
+
+def test_writable_pool_is_not_query_only(db_copy):
+    from employee_events.connection_pool import ConnectionPool
+
+    pool = ConnectionPool(db_copy, read_only=False)
+
+    with pool.connection() as connection:
+        assert connection.execute('PRAGMA query_only').fetchone() == (0,)
+        assert connection.execute('PRAGMA temp_store').fetchone() == (2,)
+    pool.close()
+
+
+# The shipped file keeps its rollback journal;
+# a pool asked for WAL switches its own copy
+def test_pool_enables_wal(db_path, db_copy):
+    from employee_events.connection_pool import ConnectionPool
+
+    pool = ConnectionPool(db_copy, wal=True)
+
+    with pool.connection() as connection:
+        journal_mode = connection.execute('PRAGMA journal_mode').fetchone()
+        assert journal_mode == ('wal',)
+        with pytest.raises(sqlite3.OperationalError):
+            connection.execute('DELETE FROM notes')
+    pool.close()
+
+    connection = sqlite3.connect(db_path)
+    journal_mode = connection.execute('PRAGMA journal_mode').fetchone()
+    assert journal_mode == ('delete',)
+    connection.close()
@@ -0,0 +1,445 @@
+import re
+
+import pytest
+
+
+@pytest.fixture
+def client():
+    from starlette.testclient import TestClient
+    import dashboard
+
+    # Render every page afresh
+    dashboard.page_cache.clear()
+
+    return TestClient(dashboard.app)
+
+
+# Find the chart image urls in a rendered page
+def chart_urls(html):
+    return [
+        url.replace('&amp;', '&')
+        for url in re.findall(r'src="(/chart/[^"]+)"', html)
+    ]
+
+
+def test_report_pages_render(client):
+
+    for path in ('/', '/employee/2', '/team/2'):
+        response = client.get(path)
+        assert response.status_code == 200, path
+
+
+def test_charts_are_linked_not_inlined(client):
+
+    response = client.get('/team/2')
+
+    assert 'base64' not in response.text
+    assert len(chart_urls(response.text)) == 2
+
+
+def test_chart_route_serves_cacheable_png(client):
+
+    url = chart_urls(client.get('/employee/2').text)[0]
+    response = client.get(url)
+
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'image/png'
+    assert response.content.startswith(b'\x89PNG')
+    assert 'immutable' in response.headers['cache-control']
+
+    revalidated = client.get(
+        url,
+        headers={'If-None-Match': response.headers['etag']},
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.content == b''
+
+
+# The url changes with everything the ETag covers, here
+# the model file, so an immutable response never outlives
+# the model it was drawn with
+def test_chart_url_follows_the_model_file(client, monkeypatch, tmp_path):
+    import os
+    import shutil
+    import dashboard
+
+    model_copy = tmp_path / 'model.pkl'
+    shutil.copy(dashboard.model_path, model_copy)
+    monkeypatch.setattr(dashboard, 'model_path', model_copy)
+
+    url = chart_urls(client.get('/employee/2').text)[1]
+    assert url.startswith('/chart/barchart/')
+    etag = client.get(url).headers['etag']
+
+    os.utime(model_copy, ns=(0, model_copy.stat().st_mtime_ns + 10**9))
+    dashboard.page_cache.clear()
+
+    retrained = chart_urls(client.get('/employee/2').text)[1]
+    assert retrained != url
+
+    stale = client.get(url)
+    assert stale.headers['cache-control'] == 'no-cache'
+    assert stale.headers['etag'] != etag
+
+
+def test_chart_route_rejects_unknown_charts(client):
+
+    assert client.get('/chart/piechart/team/2.png').status_code == 404
+    assert client.get('/chart/linechart/office/2.png').status_code == 404
+
+
+# Charts drawn from many threads at once
+# match the ones drawn one at a time
+def test_charts_render_concurrently():
+    from concurrent.futures import ThreadPoolExecutor
+    from employee_events import Employee, Team
+    from dashboard import BarChart, LineChart
+
+    jobs = [
+        (chart, model, id)
+        for chart in (LineChart(), BarChart())
+        for model in (Employee(), Team())
+        for id in (1, 2, 3)
+    ]
+    expected = [chart.render_image(id, model) for chart, model, id in jobs]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        rendered = list(executor.map(
+            lambda job: job[0].render_image(job[2], job[1]),
+            jobs * 3,
+        ))
+
+    assert rendered == expected * 3
+
+
+def test_charts_render_svg():
+    from employee_events import Team
+    from dashboard import LineChart
+
+    class SvgLineChart(LineChart):
+        image_format = 'svg'
+
+    chart = SvgLineChart(inline=False)
+
+    assert chart.render_image(1, Team()).startswith(b'<?xml')
+    assert chart.chart_url(1, Team()).startswith(
+        '/chart/svglinechart/team/1.svg'
+    )
+    assert chart.media_type == 'image/svg+xml'
+
+
+# A chart without data looks the same whichever
+# chart its thread's figure showed before
+def test_empty_line_chart_resets_the_axes():
+    import numpy as np
+    from employee_events import Employee
+    from employee_events.query_base import CumulativeCounts
+    from dashboard import LineChart
+
+    class NoEvents(Employee):
+        def cumulative_event_counts(self, id):
+            empty = np.array([], dtype=np.int64)
+            return CumulativeCounts(
+                np.array([], dtype='datetime64[D]'), empty, empty
+            )
+
+    fresh = LineChart().render_image(1, NoEvents())
+
+    chart = LineChart()
+    chart.render_image(1, Employee())
+    reused = chart.render_image(1, NoEvents())
+
+    _, ax, _ = chart.figure_template()
+    assert ax.get_ylim() == (0, 1)
+    assert reused == fresh
+
+
+def test_leaderboard_lists_every_entity(client):
+
+    response = client.get('/leaderboard/team')
+
+    assert response.status_code == 200
+    assert response.text.count('<tr>') == 6
+    assert client.get('/leaderboard/office').status_code == 404
+
+
+# Streaming the notes table in small chunks
+# should send every note once
+def test_notes_table_streams_every_row(client):
+    import dashboard
+    from employee_events import Team
+
+    notes_table = dashboard.Report.children[-1]
+    notes = Team().notes(1)
+
+    response = client.get('/notes/team/1')
+
+    assert response.status_code == 200
+    assert response.text.count('<tr>') == len(notes) + 1
+
+    class SmallChunks(type(notes_table)):
+        chunk_size = 4
+
+    chunks = list(SmallChunks().stream(1, Team()))
+    assert len(chunks) > 4
+    assert ''.join(chunks) == response.text
+
+    assert client.get('/notes/office/1').status_code == 404
+
+
+def test_table_limit_selects_a_window():
+    import dashboard
+    from employee_events import Team
+    from fasthtml.common import to_xml
+
+    class TopThree(type(dashboard.leaderboard.children[-1])):
+        limit = 3
+
+    table = to_xml(TopThree()(None, Team()))
+
+    assert table.count('<tr>') == 4
+
+
+# Find the "load more" url in a fragment of the notes table
+def load_more_url(html):
+    urls = re.findall(r'hx-get="(/notes/[^"]+\?[^"]+)"', html)
+    return urls[0].replace('&amp;', '&') if urls else None
+
+
+# The report shows one page of notes; following the
+# load more buttons reads the rest, once each
+def test_notes_load_more(client):
+    from employee_events import Team
+
+    notes = Team().notes(1)
+    html = client.get('/team/1').text
+
+    assert html.count('<td>') - html.count('<td colspan') <= 2 * 20
+    dates = re.findall(r'<td>(\d{4}-\d\d-\d\d)</td>', html)
+
+    url = load_more_url(html)
+    while url is not None:
+        fragment = client.get(url).text
+        dates += re.findall(r'<td>(\d{4}-\d\d-\d\d)</td>', fragment)
+        url = load_more_url(fragment)
+
+    assert dates == notes.note_date.tolist()
+
+
+def test_notes_search(client):
+
+    response = client.get('/notes/team/1/rows', params={'q': 'shipm'})
+
+    assert response.status_code == 200
+    assert response.text.count('<tr>') == 4
+    assert 'shipment' in response.text
+
+    bad_key = {'after_date': '2024-01-01', 'after_id': 'x'}
+    response = client.get('/notes/team/1/rows', params=bad_key)
+    assert response.status_code == 400
+
+
+# The dropdown preselects the entity on its page
+# and reuses the rendered options on later views
+def test_dropdown_options_are_cached():
+    import dashboard
+    from employee_events import Team
+    from fasthtml.common import to_xml
+
+    dropdown = dashboard.DashboardFilters.children[1]
+    cache = dashboard.ReportDropdown.option_cache
+    cache.clear()
+
+    first = to_xml(dropdown(2, Team()))
+    hits = cache.stats()['hits']
+    second = to_xml(dropdown(2, Team()))
+
+    assert '<option value="2" selected>' in first
+    assert cache.stats()['hits'] == hits + 1
+    assert first == second
+
+
+def test_large_directory_uses_type_ahead(client, monkeypatch):
+    import dashboard
+
+    monkeypatch.setattr(dashboard.ReportDropdown, 'max_options', 3)
+
+    html = client.get('/employee/2').text
+    select = re.findall('<select.*?</select>', html, re.S)[0]
+
+    assert select.count('<option') == 1
+    assert 'hx-get="/names/employee"' in html
+
+    response = client.get('/names/employee', params={'q': 'ch'})
+    assert response.status_code == 200
+    assert '<option value="3">' in response.text
+    assert client.get('/names/office').status_code == 404
+
+
+def test_report_pages_are_cached(client):
+    import dashboard
+
+    first = client.get('/employee/3')
+    second = client.get('/employee/3')
+
+    assert first.text == second.text
+    assert first.headers['etag'] == second.headers['etag']
+    assert dashboard.page_cache.stats()['entries'] == 1
+
+    revalidated = client.get(
+        '/employee/3', headers={'If-None-Match': first.headers['etag']}
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.content == b''
+
+    other = client.get('/employee/4')
+    assert other.headers['etag'] != first.headers['etag']
+
+
+# The htmx fragment and the full page are different
+# responses, so one's ETag never validates the other
+def test_page_and_fragment_have_different_etags(client):
+
+    page = client.get('/employee/3')
+    fragment = client.get('/employee/3', headers={'HX-Request': 'true'})
+
+    assert page.headers['etag'] != fragment.headers['etag']
+    assert page.headers['vary'] == 'HX-Request'
+
+    crossed = client.get(
+        '/employee/3',
+        headers={'HX-Request': 'true', 'If-None-Match': page.headers['etag']},
+    )
+    assert crossed.status_code == 200
+
+
+# A page with a child that timed out is served but
+# not cached, so the next request renders it again
+def test_pages_with_placeholders_are_not_cached(client, monkeypatch):
+    import threading
+    import dashboard
+
+    notes_table = dashboard.Report.children[-1]
+    render = notes_table.build_component
+    release = threading.Event()
+
+    def slow(*args, **kwargs):
+        release.wait(timeout=5)
+        return render(*args, **kwargs)
+
+    monkeypatch.setattr(dashboard.Report, 'child_timeout', 0.2)
+    monkeypatch.setattr(notes_table, 'build_component', slow)
+
+    first = client.get('/employee/5')
+    release.set()
+
+    assert 'taking longer than expected' in first.text
+    assert 'etag' not in first.headers
+    assert first.headers['cache-control'] == 'no-store'
+    assert dashboard.page_cache.stats()['entries'] == 0
+
+    second = client.get('/employee/5')
+
+    assert 'taking longer than expected' not in second.text
+    assert 'etag' in second.headers
+    assert dashboard.page_cache.stats()['entries'] == 1
+
+
+# A new data version gives every page a new key,
+# so nothing rendered before the change is served
+def test_page_cache_follows_data_version(client, monkeypatch):
+    import dashboard
+
+    first = client.get('/team/3')
+    monkeypatch.setattr(dashboard, 'data_version', lambda: 'changed')
+    second = client.get(
+        '/team/3', headers={'If-None-Match': first.headers['etag']}
+    )
+
+    assert second.status_code == 200
+    assert second.headers['etag'] != first.headers['etag']
+    assert dashboard.page_cache.stats()['entries'] == 2
+
+
+# Rendering from many threads at once must produce
+# exactly what rendering one page at a time does
+def test_concurrent_reports_are_identical():
+    from concurrent.futures import ThreadPoolExecutor
+    import dashboard
+    from employee_events import Employee, Team
+    from fasthtml.common import to_xml
+
+    pages = [
+        *((Employee, id) for id in (1, 2, 3)),
+        *((Team, id) for id in (1, 2)),
+    ]
+
+    def render(page):
+        model, id = page
+        return to_xml(dashboard.report(id, model()))
+
+    expected = [render(page) for page in pages]
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        rendered = list(executor.map(render, pages * 20))
+
+    assert rendered == expected * 20
+
+    # The shared wrapper templates are left untouched
+    assert dashboard.Report.outer_div_type.children == ()
+    assert dashboard.Visualizations.outer_div_type.children == ()
+    assert dashboard.DashboardFilters.children[1].label == ''
+
+
+# Collapse the whitespace between tags, which
+# differs between compiled and built fragments
+def normalized(html):
+    return re.sub(r'>\s+<', '><', html).strip()
+
+
+# Static parts are rendered once per model and
+# match what building them every time produces
+def test_static_fragments_are_compiled(monkeypatch):
+    import dashboard
+    from employee_events import Employee, Team
+    from fasthtml.common import to_xml
+
+    filters = dashboard.DashboardFilters()
+    compiled = {
+        model.name: to_xml(filters(1, model())) for model in (Employee, Team)
+    }
+
+    calls = []
+    radio = filters.children[0]
+    build = radio.build_component
+    monkeypatch.setattr(
+        radio, 'build_component',
+        lambda *args: calls.append(args) or build(*args),
+    )
+    assert to_xml(filters(1, Employee())) == compiled['employee']
+    assert calls == []
+
+    # Render again with the static parts built as before
+    monkeypatch.setattr(type(radio), 'static', False)
+    monkeypatch.setattr(dashboard.DashboardFilters, 'static_shell', False)
+    for model in (Employee, Team):
+        built = to_xml(dashboard.DashboardFilters()(1, model()))
+        assert normalized(built) == normalized(compiled[model.name])
+
+
+# The report's container is compiled once and
+# matches the container built on every call
+def test_report_shell_is_compiled(monkeypatch):
+    import dashboard
+    from employee_events import Employee
+    from fasthtml.common import to_xml
+
+    report = dashboard.Report()
+    compiled = to_xml(report(2, Employee()))
+    assert set(report._shells) == {'employee'}
+
+    monkeypatch.setattr(dashboard.Report, 'static_shell', False)
+    built = to_xml(dashboard.Report()(2, Employee()))
+
+    assert normalized(built) == normalized(compiled)
+    assert compiled.startswith('<div class="container">')
@@ -0,0 +1,68 @@
+import sqlite3
+
+
+def test_directory_lists_every_name():
+    from employee_events import Employee, name_directory
+
+    directory = name_directory(Employee())
+
+    assert directory.entries() == Employee().names()
+    assert name_directory(Employee()) is directory
+
+
+def test_directory_loads_names_once():
+    from employee_events import Team, name_directory, pool_stats
+
+    directory = name_directory(Team())
+    directory.entries()
+
+    before = pool_stats()
+    for _ in range(5):
+        directory.entries()
+        directory.search('a')
+    after = pool_stats()
+
+    assert (
+        after['hits'] + after['misses']
+        == before['hits'] + before['misses']
+    )
+
+
+def test_search_matches_any_word_prefix():
+    from employee_events import Employee, name_directory
+
+    directory = name_directory(Employee())
+    name, id = Employee().names()[0]
+    last_name = name.split()[-1]
+
+    assert (name, id) in directory.search(last_name[:3].upper())
+    assert all(
+        any(word.lower().startswith('ch') for word in match.split())
+        for match, _ in directory.search('ch')
+    )
+    assert directory.search('zzz') == []
+    assert len(directory.search('', limit=3)) == 3
+
+
+# No summary refresh: a new name alone is seen
+def test_directory_reloads_after_write(db_copy):
+    from employee_events import Team, configure_pool
+    from employee_events.directory import NameDirectory
+
+    configure_pool(database=db_copy)
+    try:
+        directory = NameDirectory(Team())
+        before = len(directory)
+
+        connection = sqlite3.connect(db_copy)
+        connection.execute(
+            "INSERT INTO team (team_id, team_name, shift, manager_name) "
+            "VALUES (99, 'Zulu Team', 'Night', 'Sam Doe')"
+        )
+        connection.commit()
+        connection.close()
+
+        assert len(directory) == before + 1
+        assert directory.search('zulu') == [('Zulu Team', 99)]
+    finally:
+        configure_pool()
@@ -86,7 +86,7 @@ def team_notes(db_conn):
         SELECT note_date, note
         FROM notes
         WHERE team_id = 1
-        ORDER BY note_date;
+        ORDER BY note_date, rowid;
     """
     result = db_conn.execute(query).fetchall()
 
@@ -201,3 +201,51 @@ def test_team_notes(db_conn, team_notes):
     # Assert that the data in the result matches the team_notes fixture
     for idx, row in enumerate(result.itertuples(index=False)):
         assert (row.note_date, row.note) == team_notes[idx], f"Row {idx} does not match expected values."  # noqa: E501
+
+
+# Define a test function for the cumulative
+# event counts of employees and teams
+def test_cumulative_event_counts():
+    import numpy as np
+    from employee_events import Employee, Team
+
+    for model, id in ((Employee(), 1), (Team(), 1)):
+
+        # Compute the running totals with pandas
+        # from the per-day event counts
+        expected = model.event_counts(id).set_index('event_date').cumsum()
+
+        result = model.cumulative_event_counts(id)
+
+        # Assert the arrays match the pandas cumulative sums
+        assert isinstance(result.positive_events, np.ndarray), \
+            "The result is not a NumPy array."
+        assert list(result.event_date.astype(str)) == list(expected.index), \
+            "The dates do not match the event counts."
+        assert np.array_equal(
+            result.positive_events, expected.positive_events
+        ), "The positive totals do not match."
+        assert np.array_equal(
+            result.negative_events, expected.negative_events
+        ), "The negative totals do not match."
+
+
+# Define a test function for windows of the notes
+def test_notes_window(db_conn, team_notes):
+    from employee_events.team import Team
+
+    team = Team()
+
+    # Pages of 4 notes, or of 1 so that notes sharing
+    # a date land on different pages, read one after
+    # the other, should cover every note exactly once
+    for limit in (4, 1):
+        pages = [team.notes(1, limit=limit, offset=offset)
+                 for offset in range(0, len(team_notes) + limit, limit)]
+        rows = [tuple(row) for page in pages
+                for row in page.itertuples(index=False)]
+
+        assert rows == team_notes, \
+            "The pages do not cover the notes in order."
+    assert len(team.notes(1, offset=2)) == len(team_notes) - 2, \
+        "An offset without a limit should return the remaining notes."
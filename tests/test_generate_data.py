@@ -0,0 +1,111 @@
+import sqlite3
+import sys
+
+import pytest
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+
+# The generator imports `utils` from src/,
+# the way it is run from that directory
+sys.path.insert(0, str(project_root / 'src'))
+
+
+@pytest.fixture
+def options():
+    return dict(
+        employees=60, teams=7, days=45, end='2024-03-29',
+        chunk_days=7, notes_per_employee=3,
+    )
+
+
+def generate(path, seed, options, **kwargs):
+    from datetime import date
+    from generate_data import generate
+
+    return generate(
+        path,
+        seed=seed,
+        **{**options, 'end': date.fromisoformat(options['end']), **kwargs},
+    )
+
+
+def rows(path, sql):
+    connection = sqlite3.connect(path)
+    result = connection.execute(sql).fetchall()
+    connection.close()
+    return result
+
+
+def test_generated_database_has_every_day_and_employee(tmp_path, options):
+    from generate_data import workdays
+
+    db = tmp_path / 'generated.db'
+    written = generate(db, 1, options)
+
+    n_days = len(workdays(options['end'], options['days']))
+    assert written == options['employees'] * n_days
+    assert rows(db, 'SELECT COUNT(*) FROM employee_events') == [(written,)]
+    assert rows(
+        db, 'SELECT COUNT(DISTINCT event_date) FROM employee_events'
+    ) == [(n_days,)]
+    assert rows(db, 'SELECT COUNT(*) FROM team') == [(options['teams'],)]
+    assert rows(
+        db, 'SELECT MAX(event_date) FROM employee_events'
+    ) == [(options['end'],)]
+
+    # Weekends have no events
+    assert rows(
+        db,
+        "SELECT COUNT(*) FROM employee_events "
+        "WHERE strftime('%w', event_date) IN ('0', '6')",
+    ) == [(0,)]
+
+
+# Nothing is printed; progress goes to the
+# callback, once per chunk of days
+def test_progress_is_reported_to_the_callback(tmp_path, options, capsys):
+    from generate_data import workdays
+
+    reported = []
+    written = generate(
+        tmp_path / 'generated.db', 3, options, run_migrations=False,
+        progress=lambda day, rows, seconds: reported.append((day, rows)),
+    )
+
+    n_days = len(workdays(options['end'], options['days']))
+    assert len(reported) == -(-n_days // options['chunk_days'])
+    assert reported[-1] == (options['end'], written)
+    assert capsys.readouterr().out == ''
+
+
+def test_same_seed_same_data(tmp_path, options):
+
+    first, second, other = (tmp_path / f'{name}.db' for name in 'abc')
+    generate(first, 5, options, run_migrations=False)
+    generate(second, 5, options, run_migrations=False)
+    generate(other, 6, options, run_migrations=False)
+
+    query = 'SELECT * FROM employee_events ORDER BY employee_id, event_date'
+    assert rows(first, query) == rows(second, query)
+    names = 'SELECT * FROM employee'
+    assert rows(first, names) == rows(second, names)
+    assert rows(first, query) != rows(other, query)
+
+
+# The query layer and its checks work on a generated file
+def test_generated_database_serves_queries(tmp_path, options):
+    from employee_events import Employee, Team, configure_pool
+
+    db = tmp_path / 'generated.db'
+    generate(db, 2, options)
+
+    configure_pool(database=db)
+    try:
+        assert len(Employee().names()) == options['employees']
+        assert len(Team().names()) == options['teams']
+        counts = Employee().cumulative_event_counts(1)
+        assert len(counts.event_date) > 0
+        assert len(Employee().model_data(1)) == 1
+    finally:
+        configure_pool()
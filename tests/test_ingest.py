@@ -0,0 +1,218 @@
+import json
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture
+def day_csv(tmp_path):
+    # The day after the shipped events. Employee 2
+    # has no team_id and is filed under their team
+    path = tmp_path / 'events.csv'
+    path.write_text(
+        'event_date,employee_id,team_id,positive_events,negative_events\n'
+        '2024-10-22,1,2,3,1\n'
+        '2024-10-22,2,,5,0\n'
+    )
+    return path
+
+
+def fetch(database, sql, *params):
+    connection = sqlite3.connect(database)
+    rows = connection.execute(sql, params).fetchall()
+    connection.close()
+    return rows
+
+
+def assert_summaries_match_events(database):
+    totals = fetch(
+        database,
+        'SELECT employee_id, team_id, positive_events, negative_events '
+        'FROM employee_event_totals ORDER BY 1, 2',
+    )
+    events = fetch(
+        database,
+        'SELECT employee_id, team_id, SUM(positive_events), '
+        'SUM(negative_events) FROM employee_events '
+        'GROUP BY 1, 2 ORDER BY 1, 2',
+    )
+    assert totals == events
+
+
+def test_ingest_appends_a_day(db_copy, day_csv):
+    from employee_events import ingest_events, read_events
+
+    before = fetch(db_copy, 'SELECT COUNT(*) FROM employee_events')[0][0]
+    stats = ingest_events(read_events(day_csv), db_copy)
+
+    assert stats.rows == 2
+    assert fetch(db_copy, 'SELECT COUNT(*) FROM employee_events') == [
+        (before + 2,)
+    ]
+    assert fetch(
+        db_copy,
+        "SELECT employee_id, team_id, positive_events FROM employee_events "
+        "WHERE event_date = '2024-10-22' ORDER BY employee_id",
+    ) == [(1, 2, 3), (2, 2, 5)]
+    assert fetch(
+        db_copy,
+        "SELECT value FROM summary_state WHERE key = 'high_water_mark'",
+    ) == [('2024-10-22',)]
+    assert fetch(db_copy, 'PRAGMA journal_mode') == [('wal',)]
+    assert_summaries_match_events(db_copy)
+
+
+# The events are counted once per ingest, by the summary
+# refresh, rather than by a trigger for every row
+def test_ingest_changes_the_data_version_once(db_copy, day_csv):
+    from employee_events import configure_pool, data_version
+    from employee_events import ingest_events, read_events
+
+    revision = 'SELECT revision FROM data_revision WHERE id = 0'
+    before = fetch(db_copy, revision)
+
+    configure_pool(database=db_copy)
+    try:
+        version = data_version()
+        ingest_events(read_events(day_csv), db_copy)
+        assert data_version() != version
+    finally:
+        configure_pool()
+
+    assert fetch(db_copy, revision) == before
+
+
+def test_ingest_replaces_an_existing_day(db_copy, tmp_path):
+    from employee_events import ingest_events, read_events
+
+    before = fetch(db_copy, 'SELECT COUNT(*) FROM employee_events')
+    (day,), = fetch(
+        db_copy,
+        'SELECT event_date FROM employee_events '
+        'WHERE employee_id = 1 ORDER BY event_date LIMIT 1 OFFSET 10',
+    )
+
+    # An earlier day, restated twice in one batch:
+    # the last record of the day is the one kept
+    records = [
+        {'event_date': day, 'employee_id': 1,
+         'positive_events': 40, 'negative_events': 0},
+        {'event_date': day, 'employee_id': 1,
+         'positive_events': 50, 'negative_events': 7},
+    ]
+    path = tmp_path / 'events.jsonl'
+    path.write_text('\n'.join(json.dumps(record) for record in records))
+
+    ingest_events(read_events(path), db_copy, batch_size=1)
+
+    assert fetch(db_copy, 'SELECT COUNT(*) FROM employee_events') == before
+    assert fetch(
+        db_copy,
+        'SELECT positive_events, negative_events FROM employee_events '
+        'WHERE employee_id = 1 AND event_date = ?',
+        day,
+    ) == [(50, 7)]
+    assert fetch(
+        db_copy,
+        'SELECT positive_events FROM employee_daily_events '
+        'WHERE employee_id = 1 AND event_date = ?',
+        day,
+    ) == [(50,)]
+    assert_summaries_match_events(db_copy)
+
+
+def test_bad_record_leaves_the_database_unchanged(db_copy):
+    from employee_events import IngestError, ingest_events
+
+    before = fetch(db_copy, 'SELECT COUNT(*) FROM employee_events')
+    records = [
+        {'event_date': '2024-10-22', 'employee_id': 1, 'team_id': 2,
+         'positive_events': 1, 'negative_events': 0},
+        {'event_date': '22/10/2024', 'employee_id': 2, 'team_id': 2,
+         'positive_events': 1, 'negative_events': 0},
+    ]
+
+    with pytest.raises(IngestError, match='record 2'):
+        ingest_events(records, db_copy)
+
+    assert fetch(db_copy, 'SELECT COUNT(*) FROM employee_events') == before
+
+
+# A record must name its team unless its employee
+# already has one, and every JSON line is an object
+@pytest.mark.parametrize('record, message', [
+    ({'event_date': '2024-10-22', 'employee_id': 999,
+      'positive_events': 1, 'negative_events': 0},
+     'record 2: no team_id, and employee 999 has no team'),
+    ([1, 2], 'record 2: expected an object, got list'),
+])
+def test_unusable_record_is_an_ingest_error(db_copy, record, message):
+    from employee_events import IngestError, ingest_events
+
+    before = fetch(db_copy, 'SELECT COUNT(*) FROM employee_events')
+    records = [
+        {'event_date': '2024-10-22', 'employee_id': 1, 'team_id': 2,
+         'positive_events': 1, 'negative_events': 0},
+        record,
+    ]
+
+    with pytest.raises(IngestError, match=message):
+        ingest_events(records, db_copy)
+
+    assert fetch(db_copy, 'SELECT COUNT(*) FROM employee_events') == before
+
+
+# The same from a JSON Lines file
+def test_jsonl_line_that_is_not_an_object(db_copy, tmp_path):
+    from employee_events import IngestError, ingest_events, read_events
+
+    path = tmp_path / 'events.jsonl'
+    path.write_text('[1, 2]\n')
+
+    with pytest.raises(IngestError, match='record 1'):
+        ingest_events(read_events(path), db_copy)
+
+
+def test_deferred_indexes_are_rebuilt(db_copy, day_csv):
+    from employee_events import check_query_plans, ingest_events, read_events
+
+    indexes = 'SELECT name, sql FROM sqlite_master WHERE type = ? ORDER BY 1'
+    before = fetch(db_copy, indexes, 'index')
+
+    ingest_events(read_events(day_csv), db_copy, defer_indexes=True)
+
+    assert fetch(db_copy, indexes, 'index') == before
+    check_query_plans(db_copy)
+    assert_summaries_match_events(db_copy)
+
+
+# A reader sees the previous data while an ingest
+# is still writing, and is not kept waiting
+def test_readers_are_not_blocked(db_copy, day_csv):
+    from employee_events import ingest_events, read_events
+
+    before = fetch(db_copy, 'SELECT COUNT(*) FROM employee_events')
+    seen = []
+
+    def read_during_ingest(stats):
+        reader = sqlite3.connect(db_copy, timeout=0)
+        seen.append(reader.execute(
+            'SELECT COUNT(*) FROM employee_events'
+        ).fetchall())
+        reader.close()
+
+    ingest_events(read_events(day_csv), db_copy, progress=read_during_ingest)
+
+    assert seen == [before]
+
+
+def test_ingest_command(db_copy, day_csv, capsys):
+    from employee_events.__main__ import main
+
+    main(['ingest', str(day_csv), '--database', str(db_copy)])
+
+    assert '2 events' in capsys.readouterr().out
+    assert fetch(
+        db_copy,
+        "SELECT COUNT(*) FROM employee_events WHERE event_date = '2024-10-22'",
+    ) == [(2,)]
@@ -0,0 +1,80 @@
+import pytest
+
+
+# One short run with every cache emptied before each request
+@pytest.fixture(scope='module')
+def cold_summary():
+    import load_test
+
+    return load_test.run_load_test(
+        requests=60, concurrency=4, warmup=5, seed=3, cold=True
+    )
+
+
+def test_every_route_is_replayed_without_errors(cold_summary):
+    import load_test
+
+    routes = cold_summary['routes']
+
+    assert set(routes) == set(load_test.MIX)
+    assert sum(stats['requests'] for stats in routes.values()) == 60
+    assert all(stats['errors'] == 0 for stats in routes.values())
+
+    for stats in routes.values():
+        assert stats['p50_ms'] <= stats['p95_ms'] <= stats['p99_ms']
+        assert sum(stats['histogram'].values()) == stats['requests']
+
+
+def test_latency_is_broken_down_by_component(cold_summary):
+
+    routes = cold_summary['routes']
+
+    # With the caches emptied, pages run queries and are
+    # rendered and serialized, and charts are drawn
+    for route in ('employee', 'team'):
+        breakdown = routes[route]['breakdown_ms']
+        assert breakdown['query'] > 0
+        assert breakdown['render'] > 0
+        assert breakdown['serialization'] > 0
+    assert routes['chart']['breakdown_ms']['chart'] > 0
+
+    # A redirect does no work of its own
+    assert routes['update_data']['breakdown_ms']['query'] == 0
+
+
+def test_plan_follows_the_mix():
+    import numpy as np
+    import load_test
+
+    planned = load_test.plan_requests(
+        200, {'team': 3, 'update_dropdown': 1}, np.random.default_rng(0)
+    )
+    routes = [route for route, *_ in planned]
+
+    assert set(routes) == {'team', 'update_dropdown'}
+    assert 120 < routes.count('team') < 180
+
+
+# --cold leaves no data-derived cache behind
+# and puts the memo setting back afterwards
+def test_cold_run_clears_caches_and_restores_the_memo():
+    import dashboard
+    import load_test
+    from employee_events import Employee, configure_memo, name_directory
+
+    name_directory(Employee()).entries()
+    dashboard.BarChart.scores.current()
+    load_test.clear_caches()
+
+    assert name_directory(Employee())._state is None
+    assert dashboard.BarChart.scores._scores is None
+    assert dashboard.ReportDropdown.option_cache.stats()['entries'] == 0
+
+    previous = configure_memo(ttl=7)
+    try:
+        load_test.run_load_test(
+            requests=5, concurrency=1, warmup=0, cold=True
+        )
+        assert configure_memo(**previous)['ttl'] == 7
+    finally:
+        configure_memo(**previous)
@@ -0,0 +1,130 @@
+import sqlite3
+
+
+# Queries sent to the pool while running `func`
+def pool_checkouts(func):
+    from employee_events import data_version, database_tables, pool_stats
+
+    # Load what a new pool reads once, so
+    # only the calls of `func` are counted
+    database_tables()
+    data_version()
+    before = pool_stats()
+    func()
+    after = pool_stats()
+
+    return (
+        (after['hits'] + after['misses'])
+        - (before['hits'] + before['misses'])
+    )
+
+
+def test_request_scope_runs_each_query_once(no_ttl):
+    from employee_events import Employee, memo_stats, request_scope
+
+    def render():
+        with request_scope():
+            for _ in range(3):
+                Employee().names()
+                Employee().model_data(1)
+                Employee().notes(1)
+
+    before = memo_stats()
+    assert pool_checkouts(render) == 3
+
+    after = memo_stats()
+    assert after['request_hits'] - before['request_hits'] == 6
+    assert after['misses'] - before['misses'] == 3
+
+
+def test_no_scope_no_memoization(no_ttl):
+    from employee_events import Team
+
+    def calls():
+        Team().names()
+        Team().names()
+
+    assert pool_checkouts(calls) == 2
+
+
+def test_ttl_shares_results_between_requests(no_ttl):
+    from employee_events import Team, configure_memo, request_scope
+
+    configure_memo(ttl=60)
+
+    def two_requests():
+        for _ in range(2):
+            with request_scope():
+                Team().event_counts(1)
+
+    assert pool_checkouts(two_requests) == 1
+
+
+def test_memoized_results_are_copies(no_ttl):
+    from employee_events import Employee, request_scope
+
+    with request_scope():
+        first = Employee().notes(1)
+        first.loc[0, 'note'] = 'changed'
+        second = Employee().notes(1)
+
+    assert second.loc[0, 'note'] != 'changed'
+
+
+# A write changes the data version,
+# which misses every memoized result
+def test_write_invalidates_results(db_copy, no_ttl):
+    from employee_events import Employee, configure_memo, configure_pool
+    from employee_events import refresh_summaries, request_scope
+
+    configure_memo(ttl=60)
+    configure_pool(database=db_copy)
+    try:
+        with request_scope():
+            before = Employee().event_counts(1)
+
+            connection = sqlite3.connect(db_copy)
+            connection.execute(
+                'INSERT INTO employee_events '
+                '(event_date, employee_id, team_id, '
+                'positive_events, negative_events) '
+                "VALUES ('9999-01-01', 1, 1, 1, 1)"
+            )
+            refresh_summaries(connection)
+            connection.commit()
+            connection.close()
+
+            after = Employee().event_counts(1)
+    finally:
+        configure_pool()
+
+    assert len(after) == len(before) + 1
+
+
+# Notes and names are read without the summaries,
+# and a write to them alone misses the results too
+def test_note_and_name_writes_invalidate_results(db_copy, no_ttl):
+    from employee_events import Employee, configure_memo, configure_pool
+
+    configure_memo(ttl=60)
+    configure_pool(database=db_copy)
+    try:
+        notes = len(Employee().notes(1))
+        names = dict(Employee().names())
+
+        connection = sqlite3.connect(db_copy)
+        connection.execute(
+            "INSERT INTO notes (employee_id, team_id, note, note_date) "
+            "VALUES (1, 1, 'A new note', '2024-10-21')"
+        )
+        connection.execute(
+            "UPDATE employee SET first_name = 'Renamed' "
+            "WHERE employee_id = 1"
+        )
+        connection.commit()
+        connection.close()
+
+        assert len(Employee().notes(1)) == notes + 1
+        assert dict(Employee().names()) != names
+    finally:
+        configure_pool()
@@ -0,0 +1,151 @@
+import pickle
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def model_file(tmp_path):
+    copy = tmp_path / 'model.pkl'
+    shutil.copy(project_root / 'assets' / 'model.pkl', copy)
+
+    return copy
+
+
+@pytest.fixture
+def sklearn_model(model_file):
+    with model_file.open('rb') as file:
+        return pickle.load(file)
+
+
+# Event totals spanning the range the dashboard sees
+@pytest.fixture
+def model_data():
+    rng = np.random.default_rng(0)
+
+    return pd.DataFrame({
+        'positive_events': rng.integers(0, 5000, size=200),
+        'negative_events': rng.integers(0, 5000, size=200),
+    })
+
+
+def test_linear_scorer_matches_sklearn(model_file, sklearn_model, model_data):
+    from utils import LinearScorer, load_model
+
+    scorer = load_model(model_file)
+
+    assert isinstance(scorer, LinearScorer)
+    np.testing.assert_allclose(
+        scorer.predict_proba(model_data),
+        sklearn_model.predict_proba(model_data),
+        rtol=1e-12,
+        atol=1e-15,
+    )
+    np.testing.assert_array_equal(
+        scorer.predict(model_data),
+        sklearn_model.predict(model_data),
+    )
+
+
+# Columns are matched by name, like scikit-learn
+def test_linear_scorer_selects_columns_by_name(model_file, model_data):
+    from utils import load_model
+
+    scorer = load_model(model_file)
+    reordered = model_data[['negative_events', 'positive_events']]
+
+    np.testing.assert_array_equal(
+        scorer.predict_proba(reordered),
+        scorer.predict_proba(model_data),
+    )
+
+
+# Missing values are refused, as scikit-learn does,
+# instead of turning into a NaN score
+def test_linear_scorer_rejects_missing_values(
+    model_file, sklearn_model, model_data
+):
+    from utils import load_model
+
+    scorer = load_model(model_file)
+    model_data.iloc[0, 0] = np.nan
+
+    with pytest.raises(ValueError):
+        sklearn_model.predict_proba(model_data)
+    with pytest.raises(ValueError, match='NaN'):
+        scorer.predict_proba(model_data)
+
+
+def test_compiled_model_is_read_not_written(model_file, model_data):
+    from sklearn.tree import DecisionTreeClassifier
+    from utils import LinearScorer, load_model, save_compiled_model
+
+    # Without a compiled file the model is compiled in memory
+    in_memory = load_model(model_file)
+    assert isinstance(in_memory, LinearScorer)
+    assert not model_file.with_suffix('.npz').exists()
+
+    assert save_compiled_model(model_file) == model_file.with_suffix('.npz')
+    compiled = load_model(model_file)
+    np.testing.assert_array_equal(
+        in_memory.predict_proba(model_data),
+        compiled.predict_proba(model_data),
+    )
+
+    # The compiled file only applies while it matches the pickle
+    tree = DecisionTreeClassifier().fit(model_data, model_data.index % 2)
+    model_file.write_bytes(pickle.dumps(tree))
+
+    assert not isinstance(load_model(model_file), LinearScorer)
+
+
+# The dashboard's model loads from the shipped
+# compiled file, without scikit-learn
+def test_shipped_model_is_compiled():
+    from utils import _source_hash, model_path
+
+    with np.load(model_path.with_suffix('.npz')) as compiled:
+        assert str(compiled['source_sha256']) == _source_hash(model_path)
+
+
+def test_non_linear_models_are_not_compiled(tmp_path, model_data):
+    from sklearn.tree import DecisionTreeClassifier
+    from utils import load_model, save_compiled_model
+
+    tree = DecisionTreeClassifier().fit(model_data, model_data.index % 2)
+    path = tmp_path / 'tree.pkl'
+    path.write_bytes(pickle.dumps(tree))
+
+    assert isinstance(load_model(path), DecisionTreeClassifier)
+    assert save_compiled_model(path) is None
+    assert not path.with_suffix('.npz').exists()
+
+
+# An entity without events scores 0 instead of NaN
+def test_bar_chart_scores_entities_without_events():
+    from employee_events import Employee, Team
+    from dashboard import BarChart
+
+    class NoEvents(Employee):
+        def model_data(self, id):
+            return pd.DataFrame({
+                'positive_events': [None],
+                'negative_events': [None],
+            })
+
+    class EmptyTeam(Team):
+        def model_data(self, id):
+            return pd.DataFrame(
+                columns=['positive_events', 'negative_events']
+            )
+
+    chart = BarChart()
+
+    assert chart.predict(1, NoEvents()) == 0.0
+    assert chart.predict(1, EmptyTeam()) == 0.0
+    assert 0 < chart.predict(1, Employee()) < 1
@@ -0,0 +1,84 @@
+import sqlite3
+
+import pytest
+
+
+# A copy of the shipped database as
+# `build_project_assets.py` writes it, before
+# any migration: no summary tables, no search
+# index and no indexes except the pandas ones
+@pytest.fixture
+def unindexed_db(db_copy):
+    from employee_events.summaries import SUMMARY_TABLES
+
+    connection = sqlite3.connect(db_copy)
+    for table in SUMMARY_TABLES:
+        connection.execute(f'DROP TABLE {table}')
+    for trigger in ('insert', 'delete', 'update'):
+        connection.execute(f'DROP TRIGGER notes_fts_{trigger}')
+    connection.execute('DROP TABLE notes_fts')
+    triggers = connection.execute(
+        "SELECT name FROM sqlite_master "
+        "WHERE type = 'trigger' AND name LIKE '%_revision_%'"
+    ).fetchall()
+    for (name,) in triggers:
+        connection.execute(f'DROP TRIGGER {name}')
+    connection.execute('DROP TABLE data_revision')
+    indexes = connection.execute(
+        "SELECT name FROM sqlite_master "
+        "WHERE type = 'index' AND name NOT LIKE 'ix_%_index' "
+        "AND sql IS NOT NULL"
+    ).fetchall()
+    for (name,) in indexes:
+        connection.execute(f'DROP INDEX {name}')
+    connection.execute('PRAGMA user_version = 0')
+    connection.commit()
+    connection.close()
+
+    return db_copy
+
+
+def test_shipped_db_is_migrated(db_path):
+    from employee_events.schema import MIGRATIONS, schema_version
+
+    connection = sqlite3.connect(db_path)
+    assert schema_version(connection) == len(MIGRATIONS)
+    connection.close()
+
+
+def test_shipped_db_query_plans_use_indexes(db_path):
+    from employee_events import check_query_plans
+
+    check_query_plans(db_path)
+
+
+def test_unindexed_db_fails_query_plan_check(unindexed_db):
+    from employee_events.schema import QueryPlanError, check_query_plans
+
+    with pytest.raises(QueryPlanError, match='employee.event_counts'):
+        check_query_plans(unindexed_db)
+
+
+def test_migrate_is_idempotent(unindexed_db):
+    from employee_events.schema import MIGRATIONS, check_query_plans, migrate
+
+    assert migrate(unindexed_db) == len(MIGRATIONS)
+    assert migrate(unindexed_db) == len(MIGRATIONS)
+
+    check_query_plans(unindexed_db)
+
+
+def test_query_plan_check_reports_unplannable_statements(
+    db_path, monkeypatch
+):
+    from employee_events import statements
+    from employee_events.schema import QueryPlanError, check_query_plans
+
+    monkeypatch.setitem(
+        statements._statements,
+        'employee.broken',
+        'SELECT no_such_column FROM employee WHERE employee_id = ?',
+    )
+
+    with pytest.raises(QueryPlanError, match='employee.broken: cannot be'):
+        check_query_plans(db_path)
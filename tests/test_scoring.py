@@ -0,0 +1,81 @@
+import pickle
+import sqlite3
+
+import numpy as np
+import pytest
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def predictor():
+    with (project_root / 'assets' / 'model.pkl').open('rb') as file:
+        return pickle.load(file)
+
+
+# The batch scores match scoring each
+# employee and team's model data on its own
+def test_score_all_matches_per_entity_predictions(predictor):
+    from employee_events import Employee, Team, score_all
+
+    scores = score_all(predictor)
+
+    for model, ids in ((Employee(), range(1, 26)), (Team(), range(1, 6))):
+        for id in ids:
+            expected = np.mean(
+                predictor.predict_proba(model.model_data(id)), axis=0
+            )[1]
+            assert scores.score(model.name, id) == pytest.approx(expected)
+
+
+def test_ranking_is_sorted_by_score(predictor):
+    from employee_events import score_all
+
+    ranking = score_all(predictor).ranking('employee')
+    risks = [score for id, score in ranking]
+
+    assert len(ranking) == 25
+    assert risks == sorted(risks, reverse=True)
+
+
+def test_unknown_entity_has_no_score(predictor):
+    from employee_events import score_all
+
+    assert score_all(predictor).score('team', 999) is None
+
+
+def test_score_table_reuses_scores(predictor):
+    from employee_events import ScoreTable
+
+    table = ScoreTable(predictor)
+
+    assert table.current() is table.current()
+
+
+# Switching the pool to another database gives
+# that database's scores, not the cached ones
+def test_score_table_follows_the_pool(predictor, db_copy):
+    from employee_events import ScoreTable, configure_pool
+    from employee_events import refresh_summaries
+
+    connection = sqlite3.connect(db_copy)
+    connection.execute(
+        'UPDATE employee_events SET negative_events = negative_events + 50 '
+        'WHERE employee_id = 1'
+    )
+    refresh_summaries(connection, since='')
+    connection.commit()
+    connection.close()
+
+    table = ScoreTable(predictor)
+    shipped = table.current().score('employee', 1)
+
+    configure_pool(database=db_copy)
+    try:
+        copied = table.current().score('employee', 1)
+    finally:
+        configure_pool()
+
+    assert copied != shipped
+    assert table.current().score('employee', 1) == shipped
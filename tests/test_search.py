@@ -0,0 +1,122 @@
+import sqlite3
+
+import pytest
+
+
+# The notes of team 1 in (note_date, rowid) order
+@pytest.fixture
+def team_notes(db_path):
+    connection = sqlite3.connect(db_path)
+    rows = connection.execute(
+        'SELECT note_date, note FROM notes '
+        'WHERE team_id = 1 ORDER BY note_date, rowid'
+    ).fetchall()
+    connection.close()
+
+    return rows
+
+
+# Read every page of a NotesPage query
+def read_pages(query, **kwargs):
+    rows, after = [], None
+
+    while True:
+        page = query(after=after, **kwargs)
+        rows += list(page.notes[['note_date', 'note']].itertuples(
+            index=False, name=None
+        ))
+        after = page.after
+        if after is None:
+            return rows
+
+
+def test_paged_notes_cover_every_note_once(team_notes):
+    from employee_events import Team
+
+    rows = read_pages(lambda **kwargs: Team().paged_notes(1, **kwargs),
+                      limit=4)
+
+    assert rows == team_notes
+
+
+def test_last_page_has_no_next_key(team_notes):
+    from employee_events import Team
+
+    assert Team().paged_notes(1, limit=len(team_notes)).after is None
+    first_page = Team().paged_notes(1, limit=len(team_notes) - 1)
+    assert first_page.after is not None
+
+
+def test_search_terms_quote_every_word():
+    from employee_events.search import search_terms
+
+    assert search_terms('late shipm') == '"late" "shipm"*'
+    assert search_terms('"AND" (OR') == '"AND" "OR"*'
+    assert search_terms(' -- ') is None
+
+
+def test_search_notes_uses_full_text_index(team_notes):
+    from employee_events import Team, database_tables
+
+    assert 'notes_fts' in database_tables()
+
+    rows = read_pages(
+        lambda **kwargs: Team().search_notes(1, 'shipm', **kwargs),
+        limit=2,
+    )
+
+    expected = [row for row in team_notes if 'shipm' in row[1].lower()]
+    assert rows == expected
+    assert len(expected) > 2
+
+
+# Without the index, the same search
+# scans the entity's notes instead
+def test_search_notes_without_index(db_copy, team_notes):
+    from employee_events import Team, configure_pool
+
+    connection = sqlite3.connect(db_copy)
+    for trigger in ('insert', 'delete', 'update'):
+        connection.execute(f'DROP TRIGGER notes_fts_{trigger}')
+    connection.execute('DROP TABLE notes_fts')
+    connection.commit()
+    connection.close()
+
+    configure_pool(database=db_copy)
+    try:
+        rows = Team().search_notes(1, 'shipm', limit=100).notes
+    finally:
+        configure_pool()
+
+    expected = [row for row in team_notes if 'shipm' in row[1].lower()]
+    assert list(rows[['note_date', 'note']].itertuples(
+        index=False, name=None
+    )) == expected
+
+
+# The triggers keep the index in step with the notes
+def test_index_follows_note_changes(db_copy):
+    connection = sqlite3.connect(db_copy)
+
+    def matches(term):
+        return connection.execute(
+            'SELECT COUNT(*) FROM notes_fts WHERE notes_fts MATCH ?',
+            (term,),
+        ).fetchone()[0]
+
+    connection.execute(
+        "INSERT INTO notes (employee_id, team_id, note, note_date) "
+        "VALUES (1, 1, 'Zanzibar offsite', '2030-01-01')"
+    )
+    assert matches('zanzibar') == 1
+
+    connection.execute(
+        "UPDATE notes SET note = 'Quokka offsite' "
+        "WHERE note_date = '2030-01-01'"
+    )
+    assert (matches('zanzibar'), matches('quokka')) == (0, 1)
+
+    connection.execute("DELETE FROM notes WHERE note_date = '2030-01-01'")
+    assert matches('quokka') == 0
+
+    connection.close()
@@ -0,0 +1,122 @@
+import os
+import subprocess
+import sys
+
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+
+# Seconds a cold `import dashboard` may take. The
+# import measures about 0.8s here, almost all of it
+# fasthtml; set DASHBOARD_IMPORT_BUDGET on slower machines
+import_budget = float(os.environ.get('DASHBOARD_IMPORT_BUDGET', 3.0))
+
+# Modules that must only load on first use
+deferred_modules = ('sklearn', 'matplotlib')
+
+
+# Import the dashboard in a fresh interpreter under
+# `-X importtime` and return {module: cumulative seconds}
+# and the output of `code`, run after the import
+def cold_import(tmp_path, code='pass'):
+
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [str(project_root / 'report'), env.get('PYTHONPATH', '')]
+    )
+
+    # Run from a scratch directory, fasthtml
+    # writes its session key to the working directory
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c',
+         f'import dashboard\n{code}'],
+        cwd=tmp_path, env=env, capture_output=True, text=True, check=True,
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative) / 1e6
+
+    return times, result.stdout
+
+
+def test_import_defers_heavy_modules(tmp_path):
+
+    times, _ = cold_import(tmp_path)
+
+    loaded = [
+        name for name in times
+        if name.split('.')[0] in deferred_modules
+    ]
+    assert loaded == []
+
+
+def test_import_is_within_budget(tmp_path):
+
+    times, _ = cold_import(tmp_path)
+
+    assert times['dashboard'] < import_budget, (
+        f"import dashboard took {times['dashboard']:.2f}s, "
+        f"budget {import_budget:.2f}s"
+    )
+
+
+# Neither the model nor the database
+# is touched until the first request
+def test_import_loads_no_model_or_database(tmp_path):
+
+    _, output = cold_import(tmp_path, code='\n'.join([
+        'from employee_events import sql_execution',
+        'from utils import lazy_attribute',
+        "print(lazy_attribute.loaded(dashboard.BarChart, 'predictor'))",
+        'print(sql_execution._pool is None)',
+    ]))
+
+    assert output.split() == ['False', 'True']
+
+
+def test_warm_up_loads_everything():
+    import dashboard
+    from utils import lazy_attribute
+
+    dashboard.warm_up()
+
+    assert lazy_attribute.loaded(dashboard.BarChart, 'predictor')
+    assert lazy_attribute.loaded(dashboard.BarChart, 'scores')
+    assert 'matplotlib.figure' in sys.modules
+
+
+def test_lazy_attribute_computes_once():
+    from utils import lazy_attribute
+
+    calls = []
+
+    class Owner:
+        value = lazy_attribute(lambda cls: calls.append(cls) or len(calls))
+
+    class Child(Owner):
+        pass
+
+    assert not lazy_attribute.loaded(Owner, 'value')
+    assert Child().value == 1
+    assert Owner.value == 1
+    assert calls == [Owner]
+    assert lazy_attribute.loaded(Child, 'value')
+
+
+# The process-wide query memo is left alone by the
+# import and set up when the server starts
+def test_memo_is_configured_at_startup(tmp_path):
+
+    _, output = cold_import(tmp_path, code='\n'.join([
+        'from employee_events import memo',
+        'from starlette.testclient import TestClient',
+        'print(memo._ttl)',
+        'with TestClient(dashboard.app):',
+        '    print(memo._ttl)',
+    ]))
+
+    assert output.split() == ['0', '30.0']
@@ -0,0 +1,52 @@
+import re
+
+import pytest
+
+
+# Every query method should run one of the
+# statements declared in the registry
+def test_query_methods_are_registered():
+    from employee_events import registered_statements
+
+    statements = registered_statements()
+
+    for entity in ('employee', 'team'):
+        for key in ('names', 'event_counts', 'notes', 'model_data'):
+            assert f'{entity}.{key}' in statements
+
+    assert 'employee.username' in statements
+    assert 'team.team_name' in statements
+
+
+# Statements bind ids through placeholders
+# instead of splicing them into the sql text
+def test_statements_use_placeholders():
+    from employee_events import registered_statements
+
+    for name, sql in registered_statements().items():
+        assert '{' not in sql, f'{name} contains an unformatted template'
+        if re.search(r'WHERE \w+\.?\w*_id', sql):
+            assert '?' in sql, f'{name} does not use a placeholder'
+
+
+def test_conflicting_registration_is_rejected():
+    from employee_events.statements import register
+
+    with pytest.raises(ValueError):
+        register('employee.names', 'SELECT 1')
+
+
+# The same prepared statement should serve
+# every id, not just the first one
+def test_parameterized_queries_return_each_entity():
+    from employee_events import Employee, Team
+
+    employee = Employee()
+    names = dict((id, name) for name, id in employee.names())
+
+    for id in (1, 2, 3):
+        first_name, last_name = employee.username(id)
+        assert names[id] == f'{first_name} {last_name}'
+        assert len(employee.model_data(id)) == 1
+
+    assert Team().team_name(1) != Team().team_name(2)
@@ -0,0 +1,178 @@
+import sqlite3
+
+
+# Run a registered statement and its raw-table
+# fallback and return both results
+def both_variants(connection, name, id):
+    from employee_events.statements import statement
+
+    summary = connection.execute(statement(name), (id,)).fetchall()
+    raw = connection.execute(statement(f'{name}.fallback'), (id,)).fetchall()
+
+    return summary, raw
+
+
+def assert_summaries_match_raw(connection):
+    import employee_events  # noqa: F401
+
+    for entity, ids in (('employee', range(1, 26)), ('team', range(1, 6))):
+        for id in ids:
+            for key in ('event_counts', 'model_data'):
+                summary, raw = both_variants(connection, f'{entity}.{key}', id)
+                assert summary == raw, f'{entity}.{key}({id}) differs'
+
+
+def test_shipped_summaries_match_raw_events(db_path):
+
+    connection = sqlite3.connect(db_path)
+    assert_summaries_match_raw(connection)
+    connection.close()
+
+
+# Change the events of the last summarized day and append
+# a new day, then check the incremental refresh catches up
+# with both. There is one row per employee and day, so the
+# last day's events are restated rather than appended
+def test_incremental_refresh(db_copy):
+    from employee_events import refresh_summaries
+    from employee_events.summaries import high_water_mark
+
+    connection = sqlite3.connect(db_copy)
+    mark = high_water_mark(connection)
+
+    team_of = dict(
+        connection.execute('SELECT employee_id, team_id FROM employee')
+    )
+
+    connection.execute(
+        'UPDATE employee_events '
+        'SET positive_events = positive_events + 3, '
+        'negative_events = negative_events + 1 '
+        'WHERE employee_id = 1 AND event_date = ?',
+        (mark,),
+    )
+    connection.executemany(
+        'INSERT INTO employee_events '
+        '(event_date, employee_id, team_id, positive_events, negative_events) '
+        'VALUES (?, ?, ?, ?, ?)',
+        [
+            ('9999-01-01', 1, team_of[1], 5, 2),
+            ('9999-01-01', 2, team_of[2], 1, 7),
+        ]
+    )
+
+    refresh_summaries(connection)
+    connection.commit()
+
+    assert high_water_mark(connection) == '9999-01-01'
+    assert_summaries_match_raw(connection)
+    connection.close()
+
+
+def test_query_methods_read_summaries():
+    from employee_events import Employee, Team
+    from employee_events.statements import statement
+
+    assert 'employee_daily_events' in statement('employee.event_counts')
+    assert 'employee_event_totals' in Employee().statement('model_data')
+    assert 'team_daily_events' in Team().statement('event_counts')
+
+
+# The data version seen by the query layer
+# changes when another connection refreshes
+def test_data_version_changes_after_refresh(db_copy):
+    from employee_events import configure_pool, data_version
+    from employee_events import refresh_summaries
+
+    configure_pool(database=db_copy)
+    try:
+        before = data_version()
+        assert data_version() == before
+
+        connection = sqlite3.connect(db_copy)
+        connection.execute(
+            'INSERT INTO employee_events '
+            '(event_date, employee_id, team_id, '
+            'positive_events, negative_events) '
+            "VALUES ('9999-01-01', 1, 1, 1, 1)"
+        )
+        refresh_summaries(connection)
+        connection.commit()
+        connection.close()
+
+        assert data_version() != before
+    finally:
+        configure_pool()
+
+
+# Notes and names are read without the summaries,
+# so writing them changes the version too
+def test_data_version_changes_after_any_write(db_copy):
+    from employee_events import configure_pool, data_version
+
+    writes = [
+        "INSERT INTO notes (employee_id, team_id, note, note_date) "
+        "VALUES (1, 1, 'A new note', '2024-10-21')",
+        "UPDATE employee SET first_name = 'Renamed' WHERE employee_id = 1",
+        "DELETE FROM team WHERE team_id = 5",
+    ]
+
+    configure_pool(database=db_copy)
+    try:
+        for sql in writes:
+            before = data_version()
+
+            connection = sqlite3.connect(db_copy)
+            connection.execute(sql)
+            connection.commit()
+            connection.close()
+
+            assert data_version() != before, sql
+    finally:
+        configure_pool()
+
+
+# Before migration 5 there is no revision counter,
+# and the version follows `PRAGMA data_version`
+def test_data_version_without_revision_triggers(db_copy):
+    from employee_events import configure_pool, data_version
+
+    from employee_events.schema import TRACKED_TABLES
+
+    connection = sqlite3.connect(db_copy)
+    for table in TRACKED_TABLES:
+        for operation in ('insert', 'update', 'delete'):
+            connection.execute(f'DROP TRIGGER {table}_revision_{operation}')
+    connection.execute('DROP TABLE data_revision')
+    connection.commit()
+    connection.close()
+
+    configure_pool(database=db_copy)
+    try:
+        before = data_version()
+        assert data_version() == before
+
+        connection = sqlite3.connect(db_copy)
+        connection.execute("UPDATE notes SET note = 'Edited' WHERE rowid = 1")
+        connection.commit()
+        connection.close()
+
+        assert data_version() != before
+    finally:
+        configure_pool()
+
+
+# Two databases with the same content, here copies
+# of one file, never share a data version
+def test_data_version_differs_between_databases(db_path, db_copy):
+    from employee_events import configure_pool, data_version
+
+    tokens = []
+    for database in (db_path, db_copy):
+        configure_pool(database=database)
+        try:
+            tokens.append(data_version())
+        finally:
+            configure_pool()
+
+    assert tokens[0] != tokens[1]
@@ -0,0 +1,68 @@
+import contextvars
+import threading
+import time
+
+
+def test_nested_blocks_count_under_their_own_category():
+    from employee_events import timed, timing_scope
+
+    with timing_scope() as timings:
+        with timed('render'):
+            time.sleep(0.02)
+            with timed('query'):
+                time.sleep(0.03)
+
+    assert 0.03 <= timings['query'] < 0.045
+    assert 0.02 <= timings['render'] < 0.035
+
+
+def test_decorated_functions_are_timed_only_in_a_scope():
+    from employee_events import timed, timing_scope
+
+    @timed('query')
+    def query():
+        time.sleep(0.01)
+        return 'rows'
+
+    assert query() == 'rows'
+
+    with timing_scope() as timings:
+        assert query() == 'rows'
+        assert query() == 'rows'
+
+    assert timings.keys() == {'query'}
+    assert timings['query'] >= 0.02
+
+
+# Threads started with a copy of the context add to the
+# scope's totals, as the concurrently rendered children
+# of a CombinedComponent do
+def test_threads_share_the_scope():
+    from employee_events import timed, timing_scope
+
+    @timed('chart')
+    def draw():
+        time.sleep(0.01)
+
+    with timing_scope() as timings:
+        threads = [
+            threading.Thread(target=contextvars.copy_context().run,
+                             args=(draw,))
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert timings['chart'] >= 0.03
+
+
+def test_query_methods_are_timed(no_ttl):
+    from employee_events import Employee, timing_scope
+
+    with timing_scope() as timings:
+        Employee().names()
+        Employee().model_data(1)
+
+    assert timings['query'] > 0